@@ -27,6 +27,8 @@ def create_app(test_config=None, testing=False):
         app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
         app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'default-secret-key')
         app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'default-jwt-secret')
+        # Month (1-12) fiscal years start in; cohort reports group gifts by fiscal year
+        app.config['FISCAL_YEAR_START_MONTH'] = int(os.environ.get('FISCAL_YEAR_START_MONTH', 1))
     else:
         # Override config for testing
         app.config.update(test_config)
@@ -40,16 +42,20 @@ def create_app(test_config=None, testing=False):
     # Import models and routes after initializing db
     with app.app_context():
         # Import specific models instead of using wildcard import
-        from models import Donor, Donation, Campaign, User
+        from models import (Donor, Donation, Campaign, User, DailyDonationSummary, DonorScore,
+                            SentimentSource, SentimentRecord, Topic, DailySentimentSummary,
+                            CollectionCheckpoint, ContentFingerprint, DailyTopicCount)
         from routes import register_routes
+        from commands import register_commands
         
         # Set up user loader for Flask-Login
         @login_manager.user_loader
         def load_user(user_id):
             return User.query.get(int(user_id))
         
-        # Register routes
+        # Register routes and CLI commands
         register_routes(app)
+        register_commands(app)
         
         # Add health check route
         @app.route('/health', methods=['GET'])
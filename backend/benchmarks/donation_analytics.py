@@ -0,0 +1,111 @@
+"""Compare the columnar analytics path with per-row Python over ORM objects.
+
+Seeds a throwaway SQLite database with synthetic donations, then times
+each report both ways and checks they agree:
+
+    python benchmarks/donation_analytics.py --donations 1000000 --runs 3
+
+"orm" loads Donation objects and loops over them in Python, as the reports
+did before; "columnar" is services.donation_analytics.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND_DIR)
+
+from app import create_app
+from models import db, Donor, Donation
+from services.donation_analytics import PERCENTILES, amount_distribution, donation_frame, lapsed_donors
+
+YEAR = 2024
+BATCH = 50000
+
+def seed(donations, donors):
+    rng = random.Random(42)
+    db.session.execute(Donor.__table__.insert(), [
+        {'first_name': f'Donor{i}', 'last_name': 'Bench', 'email': f'donor{i}@example.com'}
+        for i in range(donors)
+    ])
+    start = datetime(YEAR - 5, 1, 1)
+    span = (datetime(YEAR, 12, 31) - start).total_seconds()
+    for offset in range(0, donations, BATCH):
+        db.session.execute(Donation.__table__.insert(), [{
+            'donor_id': rng.randint(1, donors),
+            'amount': round(rng.lognormvariate(3.5, 1.0), 2),
+            'donation_date': start + timedelta(seconds=rng.random() * span)
+        } for _ in range(min(BATCH, donations - offset))])
+    db.session.commit()
+
+def orm_reports():
+    """The per-row path: every Donation as an ORM object, reduced in Python loops"""
+    donations = Donation.query.filter(Donation.donation_date < datetime(YEAR + 1, 1, 1)).all()
+
+    amounts = sorted(float(donation.amount) for donation in donations)
+    cuts = statistics.quantiles(amounts, n=100, method='inclusive')
+    percentiles = {f'p{p}': round(cuts[p - 1], 2) for p in PERCENTILES}
+
+    last_gift = {}
+    for donation in donations:
+        if donation.donor_id not in last_gift or donation.donation_date > last_gift[donation.donor_id]:
+            last_gift[donation.donor_id] = donation.donation_date
+    lybunt = sum(1 for day in last_gift.values() if day.year == YEAR - 1)
+
+    db.session.expunge_all()
+    return percentiles, lybunt
+
+def columnar_reports():
+    frame = donation_frame({'end_date': f'{YEAR}-12-31'})
+    percentiles = amount_distribution(frame['amount'].to_numpy())['percentiles']
+    lybunt = lapsed_donors(frame, YEAR)['lybunt']['count']
+    return percentiles, lybunt
+
+def best_of(function, runs):
+    timings, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--donations', type=int, default=1000000, help='Donations to seed')
+    parser.add_argument('--donors', type=int, default=100000, help='Donors to spread them over')
+    parser.add_argument('--runs', type=int, default=3, help='Timed runs per path (best is reported)')
+    args = parser.parse_args()
+
+    handle, path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    flask_app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'SECRET_KEY': 'benchmark',
+        'JWT_SECRET_KEY': 'benchmark'
+    })
+
+    try:
+        with flask_app.app_context():
+            db.create_all()
+            started = time.perf_counter()
+            seed(args.donations, args.donors)
+            print(f'Seeded {args.donations} donations in {time.perf_counter() - started:.1f} s')
+
+            orm_time, orm_result = best_of(orm_reports, args.runs)
+            columnar_time, columnar_result = best_of(columnar_reports, args.runs)
+            print(f'{"orm":<10} {orm_time * 1000:10.1f} ms')
+            print(f'{"columnar":<10} {columnar_time * 1000:10.1f} ms')
+            print(f'Speedup: {orm_time / columnar_time:.1f}x')
+            if orm_result != columnar_result:
+                print('Results differ:', orm_result, columnar_result, sep='\n  ')
+    finally:
+        os.remove(path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Time the donor cohort report over the per-donor fiscal-year table.
+
+Seeds a throwaway SQLite database with synthetic donations, backfills
+DonorFiscalYear once, then times the cohort query and an uncached report
+request after a donation change:
+
+    python benchmarks/donor_cohorts.py --donations 1000000 --donors 500000 --runs 3
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND_DIR)
+
+from app import create_app
+from models import db, Donor, Donation
+from services.cache import invalidate_reports
+from services.donation_rollups import rebuild_donor_years, record_donation
+from services.donor_cohorts import compute_cohorts, donor_cohorts
+
+YEAR = 2024
+BATCH = 50000
+START_MONTH = 4
+
+def seed(donations, donors):
+    rng = random.Random(42)
+    db.session.execute(Donor.__table__.insert(), [
+        {'first_name': f'Donor{i}', 'last_name': 'Bench', 'email': f'donor{i}@example.com'}
+        for i in range(donors)
+    ])
+    start = datetime(YEAR - 9, 1, 1)
+    span = (datetime(YEAR, 12, 31) - start).total_seconds()
+    for offset in range(0, donations, BATCH):
+        db.session.execute(Donation.__table__.insert(), [{
+            'donor_id': rng.randint(1, donors),
+            'amount': round(rng.lognormvariate(3.5, 1.0), 2),
+            'donation_date': start + timedelta(seconds=rng.random() * span)
+        } for _ in range(min(BATCH, donations - offset))])
+    db.session.commit()
+
+def changed_report():
+    """A new gift followed by the first report request, which misses the cache"""
+    gift = Donation(donor_id=1, amount=25, donation_date=datetime(YEAR, 2, 1))
+    db.session.add(gift)
+    record_donation(gift)
+    db.session.commit()
+    invalidate_reports()
+    return donor_cohorts(YEAR)
+
+def best_of(function, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--donations', type=int, default=1000000, help='Donations to seed')
+    parser.add_argument('--donors', type=int, default=500000, help='Donors to spread them over')
+    parser.add_argument('--runs', type=int, default=3, help='Timed runs (best is reported)')
+    args = parser.parse_args()
+
+    handle, path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    flask_app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'SECRET_KEY': 'benchmark',
+        'JWT_SECRET_KEY': 'benchmark',
+        'FISCAL_YEAR_START_MONTH': START_MONTH
+    })
+
+    try:
+        with flask_app.app_context():
+            db.create_all()
+            started = time.perf_counter()
+            seed(args.donations, args.donors)
+            print(f'Seeded {args.donations} donations in {time.perf_counter() - started:.1f} s')
+
+            started = time.perf_counter()
+            rows = rebuild_donor_years()
+            db.session.commit()
+            print(f'Backfilled {rows} donor fiscal year rows in {time.perf_counter() - started:.1f} s')
+
+            query_time = best_of(lambda: compute_cohorts(YEAR, START_MONTH), args.runs)
+            report_time = best_of(changed_report, args.runs)
+            print(f'{"cohorts":<16} {query_time * 1000:10.1f} ms')
+            print(f'{"after a change":<16} {report_time * 1000:10.1f} ms')
+    finally:
+        os.remove(path)
+
+if __name__ == '__main__':
+    main()
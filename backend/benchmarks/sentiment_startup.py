@@ -0,0 +1,61 @@
+"""Measure what importing the sentiment analyzer costs a fresh process.
+
+Each scenario runs in a new interpreter so nothing is already imported:
+
+    python benchmarks/sentiment_startup.py --runs 5
+
+"import" is what every gunicorn worker and test process now pays; "import +
+warm_up" is the full NLTK/TextBlob load, which module import used to do
+unconditionally.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+SCENARIOS = {
+    'import': 'import services.sentiment_analyzer',
+    'import + warm_up': 'import services.sentiment_analyzer as s; s.warm_up()',
+}
+
+TIMER = """
+import time
+started = time.perf_counter()
+{code}
+print(time.perf_counter() - started)
+"""
+
+def time_scenario(code, runs):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', TIMER.format(code=code)],
+            cwd=BACKEND_DIR, capture_output=True, text=True
+        )
+        if output.returncode != 0:
+            raise RuntimeError(output.stderr.strip().splitlines()[-1])
+        timings.append(float(output.stdout.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes per scenario')
+    args = parser.parse_args()
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        try:
+            results[name] = time_scenario(code, args.runs)
+            print(f'{name:<18} {results[name] * 1000:8.1f} ms (median of {args.runs})')
+        except RuntimeError as e:
+            print(f'{name:<18} failed: {e}')
+
+    if len(results) == len(SCENARIOS):
+        saved = results['import + warm_up'] - results['import']
+        print(f'Startup saved per process that never analyzes text: {saved * 1000:.1f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+import click
+from models import db
+from services.donation_rollups import rebuild_donor_years, rebuild_rollups
+from services.sentiment_rollups import rebuild_summaries
+from services.donation_import import CHUNK_SIZE, IMPORT_FORMATS, detect_format, import_donations, open_text, read_rows
+from services.donor_import import upsert_donors
+from services.donor_scores import score_donors
+from services.sentiment_analyzer import download_nltk_data, warm_up
+from services.fingerprint import INDEX_CHUNK_SIZE, index_unfingerprinted
+
+DATE = click.DateTime(formats=['%Y-%m-%d'])
+
+def register_commands(app):
+    """Register maintenance CLI commands with the app"""
+
+    @app.cli.command('rollup-donations')
+    @click.option('--start', type=DATE, help='First day to rebuild (YYYY-MM-DD); defaults to the earliest donation')
+    @click.option('--end', type=DATE, help='Last day to rebuild (YYYY-MM-DD); defaults to the latest donation')
+    def rollup_donations(start, end):
+        """Backfill or repair the daily donation rollup from raw donations"""
+        count = rebuild_rollups(
+            start_date=start.date() if start else None,
+            end_date=end.date() if end else None
+        )
+        db.session.commit()
+        click.echo(f'Wrote {count} daily donation summary rows')
+
+    @app.cli.command('rollup-donor-years')
+    def rollup_donor_years():
+        """Backfill or repair each donor's fiscal-year giving used by the cohort report"""
+        count = rebuild_donor_years()
+        db.session.commit()
+        click.echo(f'Wrote {count} donor fiscal year rows')
+
+    @app.cli.command('rollup-sentiment')
+    @click.option('--start', type=DATE, help='First day to rebuild (YYYY-MM-DD); defaults to the earliest record')
+    @click.option('--end', type=DATE, help='Last day to rebuild (YYYY-MM-DD); defaults to the latest record')
+    def rollup_sentiment(start, end):
+        """Backfill or repair the daily sentiment summaries and topic counts from raw records"""
+        count = rebuild_summaries(
+            start_date=start.date() if start else None,
+            end_date=end.date() if end else None
+        )
+        db.session.commit()
+        click.echo(f'Wrote {count} daily sentiment summary rows')
+
+    @app.cli.command('import-donations')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'import_format', type=click.Choice(IMPORT_FORMATS), help='Defaults to the file extension')
+    @click.option('--chunk-size', default=CHUNK_SIZE, show_default=True, help='Rows per transaction')
+    def import_donations_command(path, import_format, chunk_size):
+        """Bulk import donations from a CSV or JSON-lines file"""
+        with open(path, 'rb') as raw:
+            try:
+                stream = open_text(raw)
+            except ValueError as e:
+                raise click.ClickException(str(e))
+            result = import_donations(read_rows(stream, detect_format(path, import_format)), chunk_size=chunk_size)
+
+        click.echo(f"Imported {result['imported']} of {result['total_rows']} rows "
+                   f"in {result['elapsed_seconds']}s ({result['rows_per_second']} rows/s)")
+        _echo_errors(result)
+
+    @app.cli.command('import-donors')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'import_format', type=click.Choice(IMPORT_FORMATS), help='Defaults to the file extension')
+    @click.option('--chunk-size', default=CHUNK_SIZE, show_default=True, help='Rows per transaction')
+    def import_donors_command(path, import_format, chunk_size):
+        """Create or update donors from a CSV or JSON-lines file, matching on email"""
+        with open(path, 'rb') as raw:
+            try:
+                stream = open_text(raw)
+            except ValueError as e:
+                raise click.ClickException(str(e))
+            result = upsert_donors(read_rows(stream, detect_format(path, import_format)), chunk_size=chunk_size)
+
+        click.echo(f"Created {result['created']}, updated {result['updated']}, skipped {result['skipped']} "
+                   f"of {result['total_rows']} rows in {result['elapsed_seconds']}s")
+        _echo_errors(result)
+
+    @app.cli.command('score-donors')
+    @click.option('--full', is_flag=True, help='Rescore every donor and refresh the quintile boundaries')
+    def score_donors_command(full):
+        """Recompute RFM scores for donors whose donations changed since the last run"""
+        count = score_donors(full=full)
+        db.session.commit()
+        click.echo(f'Scored {count} donors')
+
+    @app.cli.command('warm-sentiment')
+    @click.option('--download', is_flag=True, help='Fetch missing NLTK data first (needs network access)')
+    def warm_sentiment(download):
+        """Load the sentiment analyzer's NLTK/TextBlob data and report how long it took"""
+        if download:
+            fetched = download_nltk_data()
+            click.echo(f"Downloaded NLTK data: {', '.join(fetched)}" if fetched else 'NLTK data already installed')
+        try:
+            elapsed = warm_up()
+        except LookupError as e:
+            raise click.ClickException(str(e))
+        click.echo(f'Sentiment analyzer ready in {elapsed:.2f}s')
+
+    @app.cli.command('index-fingerprints')
+    @click.option('--chunk-size', default=INDEX_CHUNK_SIZE, show_default=True, help='Records per transaction')
+    def index_fingerprints(chunk_size):
+        """Add sentiment records stored before deduplication to the fingerprint index"""
+        count = index_unfingerprinted(chunk_size=chunk_size)
+        click.echo(f'Indexed {count} sentiment records')
+
+def _echo_errors(result):
+    for error in result['errors']:
+        click.echo(f"  row {error['row']}: {error['error']}", err=True)
+    if result['failed'] > len(result['errors']):
+        click.echo(f"  ... {result['failed'] - len(result['errors'])} more errors", err=True)
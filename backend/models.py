@@ -1,8 +1,12 @@
+import json
 from datetime import datetime
 from app import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 
+# Donation stats for a donor with no donations: (total_donated, donation_count, last_donation_date)
+EMPTY_DONATION_STATS = (0, 0, None)
+
 class Donor(db.Model):
     """Model for tracking donors"""
     id = db.Column(db.Integer, primary_key=True)
@@ -21,8 +25,45 @@ class Donor(db.Model):
     
     # Relationship
     donations = db.relationship('Donation', backref='donor', lazy=True)
-    
-    def to_dict(self):
+    score = db.relationship('DonorScore', uselist=False, lazy=True, cascade='all, delete-orphan')
+
+    __table_args__ = (
+        # Keyset pagination order for the donor list
+        db.Index('ix_donor_name', 'last_name', 'first_name', 'id'),
+        # Case-insensitive prefix search; text_pattern_ops lets PostgreSQL use them for LIKE 'abc%'
+        db.Index('ix_donor_first_name_lower', db.func.lower(first_name).label('first_name_lower'),
+                 postgresql_ops={'first_name_lower': 'text_pattern_ops'}),
+        db.Index('ix_donor_last_name_lower', db.func.lower(last_name).label('last_name_lower'),
+                 postgresql_ops={'last_name_lower': 'text_pattern_ops'}),
+        db.Index('ix_donor_email_lower', db.func.lower(email).label('email_lower'),
+                 postgresql_ops={'email_lower': 'text_pattern_ops'}),
+    )
+
+    @staticmethod
+    def donation_stats(donor_ids):
+        """Aggregate donation totals for many donors in one grouped query.
+
+        Returns {donor_id: (total_donated, donation_count, last_donation_date)};
+        donors without donations are absent from the result.
+        """
+        if not donor_ids:
+            return {}
+
+        rows = db.session.query(
+            Donation.donor_id,
+            db.func.sum(Donation.amount),
+            db.func.count(Donation.id),
+            db.func.max(Donation.donation_date)
+        ).filter(Donation.donor_id.in_(donor_ids)).group_by(Donation.donor_id).all()
+
+        return {donor_id: (total, count, last) for donor_id, total, count, last in rows}
+
+    def to_dict(self, stats=None):
+        """Serialize the donor; pass `stats` from donation_stats to avoid a query per donor"""
+        if stats is None:
+            stats = Donor.donation_stats([self.id]).get(self.id)
+        total, count, last = stats or EMPTY_DONATION_STATS
+
         return {
             'id': self.id,
             'first_name': self.first_name,
@@ -37,7 +78,10 @@ class Donor(db.Model):
             'notes': self.notes,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
-            'total_donated': sum(donation.amount for donation in self.donations)
+            'total_donated': float(total or 0),
+            'donation_count': count,
+            'last_donation_date': last.isoformat() if last else None,
+            'rfm': self.score.to_dict() if self.score and self.score.rfm_score is not None else None
         }
 
 class Donation(db.Model):
@@ -52,7 +96,14 @@ class Donation(db.Model):
     campaign = db.Column(db.String(100))
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
+
+    __table_args__ = (
+        # Date-range scans and keyset pagination of the donation list
+        db.Index('ix_donation_date', 'donation_date', 'id'),
+        db.Index('ix_donation_donor_date', 'donor_id', 'donation_date'),
+        db.Index('ix_donation_campaign_date', 'campaign', 'donation_date'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -68,6 +119,96 @@ class Donation(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+class DailyDonationSummary(db.Model):
+    """Per-day donation totals by campaign and payment method.
+
+    Maintained incrementally by services.donation_rollups whenever donations
+    change. A missing campaign or payment method is stored as '' so the
+    unique key also covers them.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    campaign = db.Column(db.String(100), nullable=False, default='')
+    payment_method = db.Column(db.String(50), nullable=False, default='')
+    total_amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    donation_count = db.Column(db.Integer, nullable=False, default=0)
+    recurring_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('date', 'campaign', 'payment_method', name='uq_daily_donation_summary_key'),
+    )
+
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'campaign': self.campaign or None,
+            'payment_method': self.payment_method or None,
+            'total_amount': float(self.total_amount),
+            'donation_count': self.donation_count,
+            'recurring_count': self.recurring_count
+        }
+
+class DonorFiscalYear(db.Model):
+    """Per-donor giving in each fiscal year, for the cohort report.
+
+    Maintained incrementally by services.donation_rollups alongside the daily
+    summary. cohort_year is the donor's first fiscal year with gifts and
+    previous_year their last one before this row's, so the report is a
+    single GROUP BY over the covering index. Years follow
+    FISCAL_YEAR_START_MONTH, so the table is rebuilt after that setting
+    changes. A donor whose gifts in a year were all removed keeps a row
+    with donation_count 0.
+    """
+    donor_id = db.Column(db.Integer, db.ForeignKey('donor.id'), primary_key=True)
+    fiscal_year = db.Column(db.Integer, primary_key=True)
+    total_amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    donation_count = db.Column(db.Integer, nullable=False, default=0)
+    cohort_year = db.Column(db.Integer)
+    previous_year = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_donor_fiscal_year_cohort', 'cohort_year', 'fiscal_year', 'previous_year',
+                 'donation_count', 'total_amount'),
+    )
+
+class DonorScore(db.Model):
+    """Persisted RFM (recency, frequency, monetary) scores per donor.
+
+    Written by services.donor_scores. Each score is a quintile from 1 to 5
+    and rfm_score is their sum, so the donor list can filter and sort on an
+    index. Donation changes set `stale`; the next scoring run recomputes
+    those donors only.
+    """
+    donor_id = db.Column(db.Integer, db.ForeignKey('donor.id'), primary_key=True)
+    last_donation_date = db.Column(db.DateTime)
+    donation_count = db.Column(db.Integer, nullable=False, default=0)
+    total_amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    recency_score = db.Column(db.SmallInteger)
+    frequency_score = db.Column(db.SmallInteger)
+    monetary_score = db.Column(db.SmallInteger)
+    rfm_score = db.Column(db.SmallInteger)
+    stale = db.Column(db.Boolean, nullable=False, default=False)
+    changed_at = db.Column(db.DateTime)
+    scored_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        # Filtering and keyset-sorting the donor list by score
+        db.Index('ix_donor_score_rfm', 'rfm_score', 'donor_id'),
+        db.Index('ix_donor_score_stale', 'stale'),
+    )
+
+    def to_dict(self):
+        return {
+            'recency': self.recency_score,
+            'frequency': self.frequency_score,
+            'monetary': self.monetary_score,
+            'score': self.rfm_score,
+            'segment': f'{self.recency_score}{self.frequency_score}{self.monetary_score}',
+            'scored_at': self.scored_at.isoformat() if self.scored_at else None
+        }
+
 class Campaign(db.Model):
     """Model for tracking fundraising campaigns"""
     id = db.Column(db.Integer, primary_key=True)
@@ -112,3 +253,181 @@ class User(db.Model, UserMixin):
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
+
+# Topics extracted from each sentiment record
+record_topics = db.Table(
+    'record_topics',
+    db.Column('record_id', db.Integer, db.ForeignKey('sentiment_record.id'), primary_key=True),
+    db.Column('topic_id', db.Integer, db.ForeignKey('topic.id'), primary_key=True),
+    # The primary key serves record -> topics; this serves topic -> records
+    db.Index('ix_record_topics_topic_record', 'topic_id', 'record_id')
+)
+
+class SentimentSource(db.Model):
+    """A feed that sentiment records are collected from (Twitter, Reddit, news)"""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    type = db.Column(db.String(50), nullable=False)  # twitter, reddit, news
+    description = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    records = db.relationship('SentimentRecord', backref='source', lazy=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('name', 'type', name='uq_sentiment_source_name_type'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'type': self.type,
+            'description': self.description
+        }
+
+class Topic(db.Model):
+    """A keyword extracted from sentiment records"""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name
+        }
+
+class SentimentRecord(db.Model):
+    """One analyzed post, comment or article"""
+    id = db.Column(db.Integer, primary_key=True)
+    source_id = db.Column(db.Integer, db.ForeignKey('sentiment_source.id'), nullable=False)
+    content_text = db.Column(db.Text, nullable=False)
+    content_url = db.Column(db.String(500), unique=True)  # Re-collected posts are recognized by URL
+    sentiment_score = db.Column(db.Float)
+    sentiment_magnitude = db.Column(db.Float)
+    sentiment_label = db.Column(db.String(20))  # positive, negative, neutral
+    published_date = db.Column(db.DateTime)
+    analyzed_date = db.Column(db.DateTime, default=datetime.utcnow)
+    # Near-duplicates reuse the sentiment of the record they repeat instead of being analyzed
+    canonical_id = db.Column(db.Integer, db.ForeignKey('sentiment_record.id'), index=True)
+
+    topics = db.relationship('Topic', secondary=record_topics, lazy=True,
+                             backref=db.backref('records', lazy='dynamic'))
+    canonical = db.relationship('SentimentRecord', remote_side=[id],
+                                backref=db.backref('duplicates', lazy='dynamic'))
+
+    __table_args__ = (
+        # Source-scoped time ranges and bucketed aggregates
+        db.Index('ix_sentiment_record_source_analyzed', 'source_id', 'analyzed_date'),
+        db.Index('ix_sentiment_record_analyzed', 'analyzed_date'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'source_id': self.source_id,
+            'source_name': self.source.name if self.source else None,
+            'content_text': self.content_text,
+            'content_url': self.content_url,
+            'sentiment_score': self.sentiment_score,
+            'sentiment_magnitude': self.sentiment_magnitude,
+            'sentiment_label': self.sentiment_label,
+            'published_date': self.published_date.isoformat() if self.published_date else None,
+            'analyzed_date': self.analyzed_date.isoformat() if self.analyzed_date else None,
+            'canonical_id': self.canonical_id,
+            'topics': [topic.name for topic in self.topics]
+        }
+
+class ContentFingerprint(db.Model):
+    """Dedup index entry for a canonical sentiment record.
+
+    content_hash matches texts that are identical once normalized; the
+    MinHash signature is split into bands so near-duplicates can be found
+    with indexed equality lookups.
+    """
+    record_id = db.Column(db.Integer, db.ForeignKey('sentiment_record.id'), primary_key=True)
+    content_hash = db.Column(db.String(32), nullable=False, index=True)
+    signature = db.Column(db.String(192))  # 24 hex-encoded minhashes; NULL for texts too short to compare loosely
+    band_0 = db.Column(db.Integer, index=True)
+    band_1 = db.Column(db.Integer, index=True)
+    band_2 = db.Column(db.Integer, index=True)
+    band_3 = db.Column(db.Integer, index=True)
+    band_4 = db.Column(db.Integer, index=True)
+    band_5 = db.Column(db.Integer, index=True)
+
+    record = db.relationship('SentimentRecord')
+
+class CollectionCheckpoint(db.Model):
+    """How far collection has got for one source and query (keyword or subreddit/keyword).
+
+    Collectors only ask their APIs for content newer than this mark.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    source_id = db.Column(db.Integer, db.ForeignKey('sentiment_source.id'), nullable=False)
+    query_key = db.Column(db.String(200), nullable=False)
+    since_id = db.Column(db.String(50))  # Newest item id seen, for APIs that page by id
+    last_published = db.Column(db.DateTime)
+    last_url = db.Column(db.String(500))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('source_id', 'query_key', name='uq_collection_checkpoint_source_query'),
+    )
+
+    def to_dict(self):
+        return {
+            'source_id': self.source_id,
+            'query_key': self.query_key,
+            'since_id': self.since_id,
+            'last_published': self.last_published.isoformat() if self.last_published else None,
+            'last_url': self.last_url,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class DailySentimentSummary(db.Model):
+    """Per-day sentiment counts, average score and most frequent topics.
+
+    Maintained incrementally by services.sentiment_rollups as records are
+    written; score_sum keeps the average mergeable.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, unique=True, nullable=False)
+    average_sentiment = db.Column(db.Float, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0)
+    positive_count = db.Column(db.Integer, default=0)
+    negative_count = db.Column(db.Integer, default=0)
+    neutral_count = db.Column(db.Integer, default=0)
+    record_count = db.Column(db.Integer, default=0)
+    top_topics = db.Column(db.Text)  # JSON object of topic name -> count
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'average_sentiment': self.average_sentiment,
+            'positive_count': self.positive_count,
+            'negative_count': self.negative_count,
+            'neutral_count': self.neutral_count,
+            'record_count': self.record_count,
+            'top_topics': json.loads(self.top_topics) if self.top_topics else {}
+        }
+
+class DailyTopicCount(db.Model):
+    """Per-day count and sentiment of the canonical records mentioning a topic.
+
+    Maintained with DailySentimentSummary; long topic histories are read
+    from here instead of from raw records.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    topic_id = db.Column(db.Integer, db.ForeignKey('topic.id'), nullable=False)
+    record_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0)
+    positive_count = db.Column(db.Integer, nullable=False, default=0)
+    negative_count = db.Column(db.Integer, nullable=False, default=0)
+    neutral_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('date', 'topic_id', name='uq_daily_topic_count_key'),
+        db.Index('ix_daily_topic_count_topic_date', 'topic_id', 'date'),
+    )
@@ -1,10 +1,26 @@
-from flask import jsonify, request, Blueprint, url_for, redirect, current_app
-from models import db, Donor, Donation, Campaign, User
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask import jsonify, request, Blueprint, url_for, redirect, current_app, Response, stream_with_context
+from models import db, Donor, Donation, Campaign, User, SentimentSource, Topic, EMPTY_DONATION_STATS
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, verify_jwt_in_request
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash
 from datetime import datetime, timedelta
 import json
+from services.pagination import parse_limit, parse_page
+from services.donor_queries import DONOR_SORTS, search_donors
+from services.donation_queries import normalize_params, search_donations
+from services.donation_reports import summarize_donations
+from services.donation_rollups import donation_snapshot, record_donation, retract_donation, revise_donation
+from services.donor_scores import mark_scores_stale
+from services.cache import invalidate_reports
+from services.dashboard import get_dashboard
+from services.exports import export_stream
+from services.report_engine import DEFAULT_REPORT, PERIODS, generate_report
+from services.donation_import import IMPORT_FORMATS, detect_format, import_donations, open_text, read_rows
+from services.donor_import import upsert_donors
+from services.sentiment_queries import (MAX_RECORD_LIMIT, DEFAULT_RECORD_LIMIT, active_topics, all_sources,
+                                        latest_summaries, parse_bucket, parse_days, source_records,
+                                        source_series, topic_records, topic_series)
+from services.time_series import SERIES, build_trend, is_public
 
 # Create blueprints for different route groups
 api = Blueprint('api', __name__)
@@ -15,11 +31,36 @@ auth = Blueprint('auth', __name__)
 @api.route('/donors', methods=['GET'])
 @jwt_required()
 def get_donors():
-    """Get all donors"""
-    donors = Donor.query.all()
+    """Get a page of donors, optionally filtered by a name/email prefix search or RFM score range"""
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        page = parse_page(request.args.get('page'))
+        sort = request.args.get('sort', 'name')
+        if sort not in DONOR_SORTS:
+            raise ValueError(f'sort must be one of: {", ".join(DONOR_SORTS)}')
+        donors, total, next_cursor = search_donors(
+            search=request.args.get('search'),
+            donor_type=request.args.get('donor_type'),
+            sort=sort,
+            min_rfm=request.args.get('min_rfm'),
+            max_rfm=request.args.get('max_rfm'),
+            cursor=request.args.get('cursor'),
+            limit=limit,
+            page=page
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+
+    stats = Donor.donation_stats([donor.id for donor in donors])
     return jsonify({
         'success': True,
-        'data': [donor.to_dict() for donor in donors]
+        'donors': [donor.to_dict(stats.get(donor.id, EMPTY_DONATION_STATS)) for donor in donors],
+        'total': total,
+        'limit': limit,
+        'next_cursor': next_cursor
     })
 
 @api.route('/donors/<int:donor_id>', methods=['GET'])
@@ -77,6 +118,47 @@ def create_donor():
         'data': new_donor.to_dict()
     }), 201
 
+@api.route('/donors/import', methods=['POST'])
+@jwt_required()
+def import_donors_route():
+    """Create or update donors in bulk, matching existing donors by email.
+
+    Accepts an uploaded CSV/JSON-lines file in 'file' or a JSON body of the
+    form {"donors": [...]}.
+    """
+    upload = request.files.get('file')
+    if upload:
+        import_format = detect_format(upload.filename, request.values.get('format'))
+        if import_format not in IMPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'message': f"Unknown format '{import_format}'. Use one of: {', '.join(IMPORT_FORMATS)}"
+            }), 400
+        try:
+            rows = read_rows(open_text(upload.stream), import_format)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+    else:
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data.get('donors'), list):
+            return jsonify({
+                'success': False,
+                'message': 'Upload a file or send a JSON body with a donors list'
+            }), 400
+        rows = ((number, row if isinstance(row, dict) else 'Each donor must be a JSON object')
+                for number, row in enumerate(data['donors'], 1))
+    
+    result = upsert_donors(rows)
+    
+    return jsonify({
+        'success': True,
+        'message': f"Created {result['created']}, updated {result['updated']}, skipped {result['skipped']} donors",
+        'data': result
+    })
+
 @api.route('/donors/<int:donor_id>', methods=['PUT'])
 @jwt_required()
 def update_donor(donor_id):
@@ -122,7 +204,7 @@ def delete_donor(donor_id):
     donor = Donor.query.get_or_404(donor_id)
     
     # Check if donor has donations
-    if donor.donations:
+    if db.session.query(Donation.id).filter_by(donor_id=donor.id).first():
         return jsonify({
             'success': False,
             'message': 'Cannot delete donor with existing donations'
@@ -140,11 +222,61 @@ def delete_donor(donor_id):
 @api.route('/donations', methods=['GET'])
 @jwt_required()
 def get_donations():
-    """Get all donations"""
-    donations = Donation.query.all()
+    """Get a page of donations matching the list view's filters"""
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        page = parse_page(request.args.get('page'))
+        donations, total, next_cursor = search_donations(
+            request.args,
+            cursor=request.args.get('cursor'),
+            limit=limit,
+            page=page
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+
+    return jsonify({
+        'success': True,
+        'donations': [donation.to_dict() for donation in donations],
+        'total': total,
+        'limit': limit,
+        'next_cursor': next_cursor
+    })
+
+@api.route('/donations/import', methods=['POST'])
+@jwt_required()
+def import_donations_route():
+    """Bulk import donations from an uploaded CSV or JSON-lines file"""
+    upload = request.files.get('file')
+    if not upload:
+        return jsonify({
+            'success': False,
+            'message': 'Upload a CSV or JSON-lines file in the \'file\' field'
+        }), 400
+    
+    import_format = detect_format(upload.filename, request.values.get('format'))
+    if import_format not in IMPORT_FORMATS:
+        return jsonify({
+            'success': False,
+            'message': f"Unknown format '{import_format}'. Use one of: {', '.join(IMPORT_FORMATS)}"
+        }), 400
+    
+    try:
+        stream = open_text(upload.stream)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    result = import_donations(read_rows(stream, import_format))
+    
     return jsonify({
         'success': True,
-        'data': [donation.to_dict() for donation in donations]
+        'message': f"Imported {result['imported']} of {result['total_rows']} donations",
+        'data': result
     })
 
 @api.route('/donations/<int:donation_id>', methods=['GET'])
@@ -201,7 +333,10 @@ def create_donation():
     )
     
     db.session.add(new_donation)
+    record_donation(new_donation)
+    mark_scores_stale([new_donation.donor_id])
     db.session.commit()
+    invalidate_reports()
     
     return jsonify({
         'success': True,
@@ -215,6 +350,7 @@ def update_donation(donation_id):
     """Update a donation"""
     donation = Donation.query.get_or_404(donation_id)
     data = request.get_json()
+    before = donation_snapshot(donation)
     
     # Update donation fields
     if 'amount' in data:
@@ -232,7 +368,10 @@ def update_donation(donation_id):
     if 'notes' in data:
         donation.notes = data['notes']
     
+    revise_donation(before, donation)
+    mark_scores_stale([donation.donor_id])
     db.session.commit()
+    invalidate_reports()
     
     return jsonify({
         'success': True,
@@ -246,8 +385,11 @@ def delete_donation(donation_id):
     """Delete a donation"""
     donation = Donation.query.get_or_404(donation_id)
     
+    retract_donation(donation)
+    mark_scores_stale([donation.donor_id])
     db.session.delete(donation)
     db.session.commit()
+    invalidate_reports()
     
     return jsonify({
         'success': True,
@@ -275,6 +417,222 @@ def get_campaign(campaign_id):
         'data': campaign.to_dict()
     })
 
+# Report Routes
+@api.route('/reports/dashboard', methods=['GET'])
+@jwt_required()
+def dashboard_report():
+    """Get dashboard metrics for the last `days` days"""
+    try:
+        days = int(request.args.get('days', 30))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': 'days must be an integer'
+        }), 400
+    
+    # Cached per window; donation and campaign changes invalidate it
+    data = get_dashboard(max(1, min(days, 3650)))
+    
+    return jsonify({
+        'success': True,
+        **data
+    })
+
+@api.route('/reports/generate', methods=['GET'])
+@jwt_required()
+def generate_report_route():
+    """Generate a registered report; the reports screen's reportType selects the trend period"""
+    params = normalize_params(request.args)
+    report_type = params.get('report_type')
+    name = params.get('report', DEFAULT_REPORT)
+    if report_type in PERIODS:
+        params.setdefault('period', report_type)
+    elif report_type:
+        name = report_type
+    
+    try:
+        data = generate_report(name, params)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'report': name,
+        **data
+    })
+
+@api.route('/reports/export', methods=['GET'])
+@jwt_required()
+def export_report():
+    """Stream donations, donors or campaign performance as CSV or JSON lines"""
+    params = normalize_params(request.args)
+    dataset = params.get('dataset', 'donations')
+    export_format = params.get('format', 'csv')
+    
+    try:
+        chunks, mimetype, extension = export_stream(dataset, export_format, params)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    filename = f"{dataset}-{datetime.utcnow().strftime('%Y-%m-%d')}.{extension}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+# Sentiment Routes
+# Public like the sentiment dashboard that reads them: collected posts are public content
+@api.route('/sentiment/latest', methods=['GET'])
+def get_latest_sentiment():
+    """Get the daily sentiment summaries for the last `days` days"""
+    try:
+        days = parse_days(request.args.get('days'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'data': [summary.to_dict() for summary in latest_summaries(days)]
+    })
+
+@api.route('/sentiment/sources', methods=['GET'])
+def get_sentiment_sources():
+    """Get all sentiment sources"""
+    return jsonify({
+        'success': True,
+        'data': [source.to_dict() for source in all_sources()]
+    })
+
+@api.route('/sentiment/topics', methods=['GET'])
+def get_sentiment_topics():
+    """Get the topics mentioned in the last `days` days, most mentioned first"""
+    try:
+        days = parse_days(request.args.get('days'), default=30)
+        limit = parse_limit(request.args.get('limit'), default=100, maximum=MAX_RECORD_LIMIT)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'data': active_topics(days, limit)
+    })
+
+@api.route('/sentiment/by-source/<int:source_id>', methods=['GET'])
+def get_sentiment_by_source(source_id):
+    """Get the newest records from a source in the last `days` days"""
+    SentimentSource.query.get_or_404(source_id)
+    try:
+        days = parse_days(request.args.get('days'))
+        limit = parse_limit(request.args.get('limit'), default=DEFAULT_RECORD_LIMIT, maximum=MAX_RECORD_LIMIT)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'data': [record.to_dict() for record in source_records(source_id, days, limit)]
+    })
+
+@api.route('/sentiment/by-source/<int:source_id>/series', methods=['GET'])
+def get_sentiment_series_by_source(source_id):
+    """Get a source's sentiment in hourly or daily buckets over the last `days` days"""
+    SentimentSource.query.get_or_404(source_id)
+    try:
+        days = parse_days(request.args.get('days'))
+        bucket = parse_bucket(request.args.get('bucket'), days)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'bucket': bucket,
+        'data': source_series(source_id, days, bucket)
+    })
+
+@api.route('/sentiment/by-topic/<int:topic_id>', methods=['GET'])
+def get_sentiment_by_topic(topic_id):
+    """Get the newest records mentioning a topic in the last `days` days"""
+    Topic.query.get_or_404(topic_id)
+    try:
+        days = parse_days(request.args.get('days'))
+        limit = parse_limit(request.args.get('limit'), default=DEFAULT_RECORD_LIMIT, maximum=MAX_RECORD_LIMIT)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'data': [record.to_dict() for record in topic_records(topic_id, days, limit)]
+    })
+
+@api.route('/sentiment/by-topic/<int:topic_id>/series', methods=['GET'])
+def get_sentiment_series_by_topic(topic_id):
+    """Get a topic's sentiment in hourly or daily buckets over the last `days` days"""
+    Topic.query.get_or_404(topic_id)
+    try:
+        days = parse_days(request.args.get('days'))
+        bucket = parse_bucket(request.args.get('bucket'), days)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'bucket': bucket,
+        'data': topic_series(topic_id, days, bucket)
+    })
+
+# Trend Routes
+@api.route('/trends/<name>', methods=['GET'])
+def get_trend(name):
+    """Get a downsampled daily series with optional moving average and period comparison.
+
+    Sentiment series are public like the other sentiment routes; donation
+    series require a login.
+    """
+    if name not in SERIES:
+        return jsonify({
+            'success': False,
+            'message': f'Unknown series: {name}'
+        }), 404
+    if not is_public(name):
+        verify_jwt_in_request()
+    
+    try:
+        data = build_trend(name, request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        **data
+    })
+
 # Authentication Routes
 @auth.route('/login', methods=['POST'])
 def login():
@@ -406,6 +764,7 @@ def create_campaign():
     
     db.session.add(new_campaign)
     db.session.commit()
+    invalidate_reports()
     
     return jsonify({
         'success': True,
@@ -443,6 +802,7 @@ def update_campaign(campaign_id):
         campaign.goal_amount = data['goal_amount']
     
     db.session.commit()
+    invalidate_reports()
     
     return jsonify({
         'success': True,
@@ -468,6 +828,7 @@ def delete_campaign(campaign_id):
     
     db.session.delete(campaign)
     db.session.commit()
+    invalidate_reports()
     
     return jsonify({
         'success': True,
@@ -509,35 +870,13 @@ def donation_reports():
             'message': 'Invalid date format. Use ISO format (YYYY-MM-DD)'
         }), 400
     
-    # Query donations in date range
-    donations = Donation.query.filter(
-        Donation.donation_date >= start_date,
-        Donation.donation_date <= end_date
-    ).all()
-    
-    # Calculate statistics
-    total_amount = sum(float(donation.amount) for donation in donations)
-    avg_amount = total_amount / len(donations) if donations else 0
-    donor_count = len(set(donation.donor_id for donation in donations))
-    recurring_count = sum(1 for donation in donations if donation.is_recurring)
-    
-    # Group by payment method
-    payment_methods = {}
-    for donation in donations:
-        method = donation.payment_method or 'Unknown'
-        if method not in payment_methods:
-            payment_methods[method] = 0
-        payment_methods[method] += float(donation.amount)
+    # Aggregate in the database; amounts are summed exactly and rounded to cents
+    summary = summarize_donations(start_date, end_date)
     
     return jsonify({
         'success': True,
         'data': {
-            'total_amount': total_amount,
-            'donation_count': len(donations),
-            'average_amount': avg_amount,
-            'donor_count': donor_count,
-            'recurring_count': recurring_count,
-            'payment_methods': payment_methods,
+            **summary,
             'date_range': {
                 'start_date': start_date.isoformat(),
                 'end_date': end_date.isoformat()
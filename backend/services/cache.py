@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    Each worker process has its own instance. Writes that change the cached
+    data call clear() so the worker that handled them serves fresh results
+    immediately; other workers catch up once their entries expire.
+    """
+    def __init__(self, maxsize=128, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """Return the cached value for key, computing and storing it on a miss"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses}
+
+class PersistentCache:
+    """Thread-safe cache of JSON values kept in a local SQLite file.
+
+    Entries survive restarts. `version` describes how the values were
+    computed: opening the file with a different version discards every stored
+    entry. A path of ':memory:' gives a cache that lives as long as the process.
+    At most `maxsize` entries are kept: each write evicts entries stored
+    before the last `maxsize` writes, oldest first.
+    """
+    # Stay under SQLite's bound-parameter limit in IN lookups
+    LOOKUP_BATCH = 500
+    DEFAULT_MAXSIZE = 100000
+
+    def __init__(self, path, version, maxsize=DEFAULT_MAXSIZE):
+        self.path = path
+        self.version = version
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        # sqlite connections must not be shared across fork; reopen in child processes
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache_entries (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            stored = conn.execute("SELECT value FROM cache_meta WHERE name = 'version'").fetchone()
+            if stored is None or stored[0] != self.version:
+                conn.execute('DELETE FROM cache_entries')
+                conn.execute("INSERT OR REPLACE INTO cache_meta (name, value) VALUES ('version', ?)", (self.version,))
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get_many(self, keys):
+        """{key: value} for the keys that are cached"""
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            for i in range(0, len(keys), self.LOOKUP_BATCH):
+                batch = keys[i:i + self.LOOKUP_BATCH]
+                placeholders = ', '.join('?' * len(batch))
+                for key, value in conn.execute(
+                        f'SELECT key, value FROM cache_entries WHERE key IN ({placeholders})', batch):
+                    found[key] = json.loads(value)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def set_many(self, items):
+        """Store (key, value) pairs in one transaction, then evict the oldest entries past maxsize"""
+        rows = [(key, json.dumps(value)) for key, value in items]
+        with self._lock:
+            conn = self._connection()
+            conn.executemany('INSERT OR REPLACE INTO cache_entries (key, value) VALUES (?, ?)', rows)
+            # REPLACE deletes and reinserts, so rowid order is the order entries were last stored.
+            # MAX(rowid) is one index seek and the range delete only visits evicted rows, so
+            # writes stay cheap however full the cache is; rewritten keys leave rowid gaps, which
+            # can only make it keep fewer than maxsize entries, never more.
+            conn.execute(
+                'DELETE FROM cache_entries WHERE rowid <= (SELECT MAX(rowid) FROM cache_entries) - ?',
+                (self.maxsize,)
+            )
+            conn.commit()
+
+    def set(self, key, value):
+        self.set_many([(key, value)])
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute('DELETE FROM cache_entries')
+            conn.commit()
+
+    def stats(self):
+        with self._lock:
+            size = self._connection().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+            return {'size': size, 'hits': self.hits, 'misses': self.misses}
+
+# Dashboard and report results derived from donations and campaigns
+report_cache = TTLCache(maxsize=256, ttl=300)
+
+def invalidate_reports():
+    """Drop cached report results after donations or campaigns change"""
+    report_cache.clear()
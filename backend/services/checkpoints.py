@@ -0,0 +1,47 @@
+from datetime import datetime
+from models import db, CollectionCheckpoint
+from services.donation_rollups import dialect_insert
+
+CHECKPOINT_FIELDS = ('since_id', 'last_published', 'last_url')
+
+def load_checkpoints(source_id):
+    """{query: {'since_id', 'last_published', 'last_url'}} for a source, in one query.
+
+    Plain dicts so fetch threads can read them without touching the session.
+    """
+    rows = db.session.query(
+        CollectionCheckpoint.query_key, *(getattr(CollectionCheckpoint, field) for field in CHECKPOINT_FIELDS)
+    ).filter(CollectionCheckpoint.source_id == source_id)
+    return {row[0]: dict(zip(CHECKPOINT_FIELDS, row[1:])) for row in rows}
+
+def advance_mark(mark, since_id=None, published=None, url=None):
+    """Move a high-water mark forward to include one item; never moves it back"""
+    mark = dict(mark or dict.fromkeys(CHECKPOINT_FIELDS))
+    if since_id is not None and (mark['since_id'] is None or int(since_id) > int(mark['since_id'])):
+        mark['since_id'] = str(since_id)
+    if published is not None and (mark['last_published'] is None or published > mark['last_published']):
+        mark['last_published'] = published
+        mark['last_url'] = url
+    return mark
+
+def save_checkpoints(source_id, marks):
+    """Upsert {query: mark} for a source with one statement.
+
+    Call only after the records the marks cover are committed, so a failed
+    run is fetched again rather than skipped.
+    """
+    if not marks:
+        return
+
+    table = CollectionCheckpoint.__table__
+    now = datetime.utcnow()
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['source_id', 'query_key'],
+        set_={**{field: stmt.excluded[field] for field in CHECKPOINT_FIELDS}, 'updated_at': stmt.excluded.updated_at}
+    )
+    db.session.execute(stmt, [
+        {'source_id': source_id, 'query_key': query, **{field: mark.get(field) for field in CHECKPOINT_FIELDS},
+         'updated_at': now}
+        for query, mark in sorted(marks.items())
+    ])
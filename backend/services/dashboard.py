@@ -0,0 +1,118 @@
+from datetime import datetime, time, timedelta
+from sqlalchemy import distinct, func
+from sqlalchemy.orm import contains_eager
+from models import db, Donor, Donation, Campaign, DailyDonationSummary
+from services.cache import report_cache
+
+TOP_DONOR_LIMIT = 5
+RECENT_DONATION_LIMIT = 5
+
+def _daily_series(first_day, last_day):
+    """Per-day totals from the rollup, one row per day"""
+    rows = db.session.query(
+        DailyDonationSummary.date,
+        func.sum(DailyDonationSummary.total_amount),
+        func.sum(DailyDonationSummary.donation_count)
+    ).filter(
+        DailyDonationSummary.date >= first_day,
+        DailyDonationSummary.date <= last_day
+    ).group_by(DailyDonationSummary.date).order_by(DailyDonationSummary.date).all()
+
+    return [(day, float(amount or 0), int(count or 0)) for day, amount, count in rows]
+
+def _by_payment_method(first_day, last_day):
+    method = DailyDonationSummary.payment_method
+    rows = db.session.query(method, func.sum(DailyDonationSummary.total_amount)).filter(
+        DailyDonationSummary.date >= first_day,
+        DailyDonationSummary.date <= last_day
+    ).group_by(method).having(func.sum(DailyDonationSummary.donation_count) > 0).all()
+
+    return [{'type': name or 'Unknown', 'amount': float(amount or 0)} for name, amount in rows]
+
+def _top_donors(start):
+    total = func.sum(Donation.amount)
+    rows = db.session.query(
+        Donor.id, Donor.first_name, Donor.last_name, total, func.count(Donation.id)
+    ).join(Donation, Donation.donor_id == Donor.id).filter(
+        Donation.donation_date >= start
+    ).group_by(Donor.id, Donor.first_name, Donor.last_name).order_by(total.desc()).limit(TOP_DONOR_LIMIT).all()
+
+    return [{
+        'id': donor_id,
+        'name': f'{first_name} {last_name}',
+        'total_amount': float(amount or 0),
+        'donation_count': count
+    } for donor_id, first_name, last_name, amount, count in rows]
+
+def _recent_donations():
+    donations = Donation.query.join(Donation.donor).options(
+        contains_eager(Donation.donor)
+    ).order_by(Donation.donation_date.desc(), Donation.id.desc()).limit(RECENT_DONATION_LIMIT).all()
+
+    return [{**donation.to_dict(), 'campaign_name': donation.campaign} for donation in donations]
+
+def _campaign_progress(today):
+    campaigns = Campaign.query.order_by(Campaign.start_date.desc(), Campaign.id.desc()).all()
+    raised = dict(db.session.query(
+        DailyDonationSummary.campaign,
+        func.sum(DailyDonationSummary.total_amount)
+    ).filter(
+        DailyDonationSummary.campaign.in_([c.name for c in campaigns])
+    ).group_by(DailyDonationSummary.campaign).all()) if campaigns else {}
+
+    progress = []
+    for campaign in campaigns:
+        raised_amount = float(raised.get(campaign.name) or 0)
+        goal_amount = float(campaign.goal_amount) if campaign.goal_amount else None
+        progress.append({
+            'id': campaign.id,
+            'name': campaign.name,
+            'goal_amount': goal_amount,
+            'raised_amount': raised_amount,
+            'percent_of_goal': round(raised_amount / goal_amount * 100, 1) if goal_amount else None,
+            'active': (campaign.start_date is None or campaign.start_date <= today)
+                      and (campaign.end_date is None or campaign.end_date >= today)
+        })
+    return progress
+
+def compute_dashboard(days, today=None):
+    """Build the dashboard metrics for the last `days` days, including today.
+
+    Totals and series come from the daily rollup; only distinct donors, top
+    donors and the recent donations list read raw donations, through the
+    donation_date indexes.
+    """
+    today = today or datetime.utcnow().date()
+    first_day = today - timedelta(days=days - 1)
+    start = datetime.combine(first_day, time.min)
+
+    daily = _daily_series(first_day, today)
+    months = {}
+    for day, amount, _ in daily:
+        label = day.strftime('%Y-%m')
+        months[label] = months.get(label, 0) + amount
+
+    campaigns = _campaign_progress(today)
+
+    return {
+        'days': days,
+        'totalDonations': sum(count for _, _, count in daily),
+        'totalAmount': round(sum(amount for _, amount, _ in daily), 2),
+        'totalDonors': db.session.query(func.count(distinct(Donation.donor_id))).filter(
+            Donation.donation_date >= start
+        ).scalar(),
+        'activeCampaigns': sum(1 for c in campaigns if c['active']),
+        'recentDonations': _recent_donations(),
+        'donationsByDay': [
+            {'date': day.isoformat(), 'amount': amount, 'count': count} for day, amount, count in daily
+        ],
+        'donationsByMonth': [{'month': month, 'amount': round(amount, 2)} for month, amount in months.items()],
+        'donationsByType': _by_payment_method(first_day, today),
+        'topDonors': _top_donors(start),
+        'campaignProgress': campaigns
+    }
+
+def get_dashboard(days):
+    """Cached dashboard metrics; recomputed only after a change or when the entry expires"""
+    today = datetime.utcnow().date()
+    return report_cache.get_or_compute(('dashboard', days, today), lambda: compute_dashboard(days, today))
@@ -1,12 +1,19 @@
 import os
+import threading
 import tweepy
 import praw
-import requests
 from datetime import datetime, timedelta
-import json
 from dotenv import load_dotenv
+from sqlalchemy.exc import SQLAlchemyError
 from models import db, SentimentSource, SentimentRecord, Topic, DailySentimentSummary
 from services.sentiment_analyzer import analyze_text, batch_analyze
+from services.sentiment_identity import attach_topics, resolve_source_id, resolve_topics
+from services.record_writer import RecordWriter
+from services.fetching import RATE_LIMITS, fetch_all
+from services.http_client import CachedHTTPClient
+from services.checkpoints import advance_mark, load_checkpoints, save_checkpoints
+from services.fingerprint import fingerprint, index_record, load_index
+from services.sentiment_rollups import rebuild_summaries, record_sentiment
 
 # Load environment variables
 load_dotenv()
@@ -23,38 +30,37 @@ CANADIAN_TIRE_KEYWORDS = [
 
 def get_or_create_source(name, source_type, description=None):
     """Get or create a sentiment source"""
-    source = SentimentSource.query.filter_by(name=name, type=source_type).first()
-    
-    if not source:
-        source = SentimentSource(
-            name=name,
-            type=source_type,
-            description=description or f"{source_type.capitalize()} source for {name}"
-        )
-        db.session.add(source)
-        db.session.commit()
-        
-    return source
+    return db.session.get(SentimentSource, resolve_source_id(name, source_type, description))
 
 def get_or_create_topic(topic_name):
     """Get or create a topic"""
-    topic = Topic.query.filter_by(name=topic_name).first()
-    
-    if not topic:
-        topic = Topic(name=topic_name)
-        db.session.add(topic)
-        db.session.commit()
-        
-    return topic
+    return db.session.get(Topic, resolve_topics([topic_name])[topic_name])
 
 def save_sentiment_record(source, content_text, content_url=None, published_date=None):
     """Analyze and save a sentiment record"""
     # Skip if content is too short
     if not content_text or len(content_text) < 5:
         return None
+    
+    # Skip posts already collected, before spending time on analysis
+    if content_url and db.session.query(SentimentRecord.id).filter_by(content_url=content_url).first():
+        return None
         
+    # Repeats of stored content reuse its sentiment instead of being analyzed
+    fp = fingerprint(content_text)
+    canonical_id = load_index([fp]).match(fp)
+    canonical = db.session.get(SentimentRecord, canonical_id) if canonical_id else None
+    
     # Analyze sentiment
-    analysis = analyze_text(content_text)
+    if canonical:
+        analysis = {
+            'sentiment_score': canonical.sentiment_score,
+            'sentiment_magnitude': canonical.sentiment_magnitude,
+            'sentiment_label': canonical.sentiment_label,
+            'topics': []
+        }
+    else:
+        analysis = analyze_text(content_text)
     
     # Create record
     record = SentimentRecord(
@@ -65,80 +71,91 @@ def save_sentiment_record(source, content_text, content_url=None, published_date
         sentiment_magnitude=analysis['sentiment_magnitude'],
         sentiment_label=analysis['sentiment_label'],
         published_date=published_date or datetime.utcnow(),
-        analyzed_date=datetime.utcnow()
+        analyzed_date=datetime.utcnow(),
+        canonical=canonical
     )
     
-    # Add topics
-    for topic_name in analysis['topics']:
-        topic = get_or_create_topic(topic_name)
-        record.topics.append(topic)
+    # Add topics: resolved through the identity cache and linked in one insert
+    db.session.add(record)
+    if canonical is None:
+        index_record(record, fp)
+        attach_topics([(record, analysis['topics'])])
+        record_sentiment([(record, analysis['topics'])])
     
     # Save to database
-    db.session.add(record)
     db.session.commit()
     
     return record
 
 def update_daily_summary(date=None):
-    """Update the daily sentiment summary"""
+    """Recompute one day's sentiment summary from its records.
+
+    Summaries are kept up to date as records are written; this is only
+    needed to repair a day. Use rebuild_summaries for ranges.
+    """
     if not date:
         date = datetime.utcnow().date()
     
-    # Get all records for the day
-    start_datetime = datetime.combine(date, datetime.min.time())
-    end_datetime = datetime.combine(date, datetime.max.time())
-    
-    records = SentimentRecord.query.filter(
-        SentimentRecord.analyzed_date >= start_datetime,
-        SentimentRecord.analyzed_date <= end_datetime
-    ).all()
-    
-    if not records:
-        return None
-    
-    # Calculate metrics
-    record_count = len(records)
-    positive_count = sum(1 for r in records if r.sentiment_label == 'positive')
-    negative_count = sum(1 for r in records if r.sentiment_label == 'negative')
-    neutral_count = sum(1 for r in records if r.sentiment_label == 'neutral')
-    
-    average_sentiment = sum(r.sentiment_score for r in records) / record_count if record_count > 0 else 0
-    
-    # Collect all topics
-    all_topics = {}
-    for record in records:
-        for topic in record.topics:
-            if topic.name in all_topics:
-                all_topics[topic.name] += 1
-            else:
-                all_topics[topic.name] = 1
-    
-    # Get top topics
-    top_topics = sorted(all_topics.items(), key=lambda x: x[1], reverse=True)[:10]
-    top_topics_json = json.dumps(dict(top_topics))
-    
-    # Get or create summary
-    summary = DailySentimentSummary.query.filter_by(date=date).first()
-    
-    if not summary:
-        summary = DailySentimentSummary(date=date)
-    
-    # Update summary
-    summary.average_sentiment = average_sentiment
-    summary.record_count = record_count
-    summary.positive_count = positive_count
-    summary.negative_count = negative_count
-    summary.neutral_count = neutral_count
-    summary.top_topics = top_topics_json
-    
-    # Save to database
-    db.session.add(summary)
+    rebuild_summaries(date, date)
     db.session.commit()
     
-    return summary
+    return DailySentimentSummary.query.filter_by(date=date).first()
+
+NEWS_API_URL = os.environ.get('NEWS_API_URL', 'https://newsapi.org/v2/everything')
+_news_client = None
+
+# Subreddits to search
+REDDIT_SUBREDDITS = ['PersonalFinanceCanada', 'CanadianInvestor', 'canada', 'investing', 'stocks']
 
-def collect_twitter_data():
-    """Collect data from Twitter/X"""
+def _ingest(source, tasks, fetch, describe_error, query_key=str):
+    """Fetch tasks concurrently and feed each result to a chunked writer as it arrives.
+
+    Network calls run on the fetch_all thread pool; analysis and database
+    writes stay on the calling thread, which owns the app context and session.
+    `fetch(task, checkpoint)` gets the task's stored high-water mark (None on
+    the first run) and returns (items, mark). A chunk the database rejects is
+    reported like a fetch error for every task with posts in it; those tasks
+    keep their old marks so they are fetched again, while the marks of tasks
+    whose records were all committed are saved.
+    """
+    # Commit a source created for this run so a rejected chunk's rollback cannot undo it
+    source_id = source.id
+    db.session.commit()
+    checkpoints = load_checkpoints(source_id)
+    marks = {}
+    failed = set()
+    buffered = {}  # query key -> task, for tasks with posts in the writer's unflushed chunk
+    writer = RecordWriter(source_id)
+
+    def write(action):
+        try:
+            action()
+        except SQLAlchemyError as e:
+            # The writer rolled the chunk back; every task with posts in it lost them
+            for key, buffered_task in buffered.items():
+                print(describe_error(buffered_task, e))
+                failed.add(key)
+            buffered.clear()
+            return
+        if not writer.pending:
+            buffered.clear()
+
+    for task, result, error in fetch_all(tasks, lambda task: fetch(task, checkpoints.get(query_key(task)))):
+        if error is not None:
+            print(describe_error(task, error))
+            continue
+        items, mark = result
+        for item in items:
+            buffered[query_key(task)] = task
+            write(lambda: writer.add(**item))
+        if mark and mark != checkpoints.get(query_key(task)):
+            marks[query_key(task)] = mark
+    write(writer.flush)
+    save_checkpoints(source_id, {key: mark for key, mark in marks.items() if key not in failed})
+    db.session.commit()
+    return writer
+
+def _twitter_client():
     # Twitter API credentials
     consumer_key = os.environ.get('TWITTER_CONSUMER_KEY')
     consumer_secret = os.environ.get('TWITTER_CONSUMER_SECRET')
@@ -151,56 +168,65 @@ def collect_twitter_data():
     # Initialize Twitter API client
     auth = tweepy.OAuthHandler(consumer_key, consumer_secret)
     auth.set_access_token(access_token, access_token_secret)
-    api = tweepy.API(auth)
+    return tweepy.API(auth)
+
+def fetch_tweets(api, keyword, checkpoint=None):
+    """Search tweets for one keyword newer than the checkpoint's since_id.
+
+    Returns (record fields for each original tweet, advanced mark).
+    """
+    since_id = checkpoint and checkpoint['since_id']
+    RATE_LIMITS['twitter'].wait()
+    params = {'q': keyword, 'count': 100, 'tweet_mode': "extended", 'lang': "en"}
+    if since_id:
+        params['since_id'] = since_id
+    tweets = api.search_tweets(**params)
+    
+    items = []
+    mark = checkpoint
+    for tweet in tweets:
+        if since_id and int(tweet.id) <= int(since_id):
+            continue
+        mark = advance_mark(mark, since_id=tweet.id)
+        
+        # Skip retweets
+        if hasattr(tweet, 'retweeted_status'):
+            continue
+        
+        items.append({
+            'content_text': tweet.full_text if hasattr(tweet, 'full_text') else tweet.text,
+            'content_url': f"https://twitter.com/{tweet.user.screen_name}/status/{tweet.id}",
+            'published_date': tweet.created_at
+        })
+    return items, mark
+
+def collect_twitter_data(api=None):
+    """Collect data from Twitter/X
+
+    `api` defaults to a tweepy client built from the environment; tests pass
+    a stub with the same search_tweets method.
+    """
+    if api is None:
+        api = _twitter_client()
     
     # Get source
     source = get_or_create_source("Twitter", "twitter", "Twitter/X posts about Canadian Tire")
     
-    # Collect tweets for each keyword
-    collected_tweets = []
-    for keyword in CANADIAN_TIRE_KEYWORDS:
-        try:
-            tweets = api.search_tweets(q=keyword, count=100, tweet_mode="extended", lang="en")
-            
-            for tweet in tweets:
-                # Skip retweets
-                if hasattr(tweet, 'retweeted_status'):
-                    continue
-                
-                # Get full text
-                if hasattr(tweet, 'full_text'):
-                    text = tweet.full_text
-                else:
-                    text = tweet.text
-                
-                # Create URL
-                tweet_url = f"https://twitter.com/{tweet.user.screen_name}/status/{tweet.id}"
-                
-                # Save record
-                record = save_sentiment_record(
-                    source=source,
-                    content_text=text,
-                    content_url=tweet_url,
-                    published_date=tweet.created_at
-                )
-                
-                if record:
-                    collected_tweets.append(record.to_dict())
-        
-        except Exception as e:
-            print(f"Error collecting tweets for keyword '{keyword}': {str(e)}")
-    
-    # Update daily summary
-    update_daily_summary()
+    # Search all keywords concurrently; records are analyzed and committed in chunks
+    writer = _ingest(
+        source,
+        CANADIAN_TIRE_KEYWORDS,
+        lambda keyword, checkpoint: fetch_tweets(api, keyword, checkpoint),
+        lambda keyword, e: f"Error collecting tweets for keyword '{keyword}': {str(e)}"
+    )
     
     return {
-        "count": len(collected_tweets),
+        "count": writer.written,
         "source": "Twitter",
-        "records": collected_tweets[:10]  # Return only first 10 for brevity
+        "records": writer.sample  # Return only first 10 for brevity
     }
 
-def collect_reddit_data():
-    """Collect data from Reddit"""
+def _reddit_credentials():
     # Reddit API credentials
     client_id = os.environ.get('REDDIT_CLIENT_ID')
     client_secret = os.environ.get('REDDIT_CLIENT_SECRET')
@@ -209,82 +235,149 @@ def collect_reddit_data():
     if not all([client_id, client_secret]):
         raise ValueError("Reddit API credentials not found in environment variables")
     
-    # Initialize Reddit API client
-    reddit = praw.Reddit(
-        client_id=client_id,
-        client_secret=client_secret,
-        user_agent=user_agent
-    )
+    return {'client_id': client_id, 'client_secret': client_secret, 'user_agent': user_agent}
+
+def reddit_query_key(task):
+    """Checkpoint key for a (subreddit, keyword) task"""
+    subreddit_name, keyword = task
+    return f"r/{subreddit_name}:{keyword}"
+
+def fetch_reddit_posts(reddit, subreddit_name, keyword, checkpoint=None):
+    """Search one subreddit for one keyword, newest first, stopping at the checkpoint.
+
+    Returns (record fields for new posts and their top comments, advanced
+    mark); comments are only fetched for posts not seen before.
+    """
+    last_published = checkpoint and checkpoint['last_published']
+    limiter = RATE_LIMITS['reddit']
+    limiter.wait()
+    posts = reddit.subreddit(subreddit_name).search(keyword, sort='new', limit=25, time_filter='week')
+    
+    items = []
+    mark = checkpoint
+    for post in posts:
+        url = f"https://www.reddit.com{post.permalink}"
+        published = datetime.fromtimestamp(post.created_utc)
+        if last_published and (published < last_published or url == checkpoint['last_url']):
+            break
+        mark = advance_mark(mark, published=published, url=url)
+        
+        items.append({
+            'content_text': f"{post.title} {post.selftext}",
+            'content_url': url,
+            'published_date': published
+        })
+        
+        # Get top comments
+        limiter.wait()
+        post.comments.replace_more(limit=0)
+        for comment in post.comments.list()[:10]:
+            items.append({
+                'content_text': comment.body,
+                'content_url': f"https://www.reddit.com{comment.permalink}",
+                'published_date': datetime.fromtimestamp(comment.created_utc)
+            })
+    return items, mark
+
+def collect_reddit_data(reddit_factory=None):
+    """Collect data from Reddit
+
+    PRAW clients are not thread-safe, so each fetch thread gets its own from
+    `reddit_factory` (default: a praw.Reddit built from the environment).
+    """
+    if reddit_factory is None:
+        credentials = _reddit_credentials()
+        reddit_factory = lambda: praw.Reddit(**credentials)
     
     # Get source
     source = get_or_create_source("Reddit", "reddit", "Reddit posts and comments about Canadian Tire")
     
-    # Subreddits to search
-    subreddits = ['PersonalFinanceCanada', 'CanadianInvestor', 'canada', 'investing', 'stocks']
-    
-    # Collect posts and comments
-    collected_posts = []
+    clients = threading.local()
     
-    for subreddit_name in subreddits:
-        try:
-            subreddit = reddit.subreddit(subreddit_name)
-            
-            # Search for posts
-            for keyword in CANADIAN_TIRE_KEYWORDS:
-                posts = subreddit.search(keyword, limit=25, time_filter='week')
-                
-                for post in posts:
-                    # Save post
-                    record = save_sentiment_record(
-                        source=source,
-                        content_text=f"{post.title} {post.selftext}",
-                        content_url=f"https://www.reddit.com{post.permalink}",
-                        published_date=datetime.fromtimestamp(post.created_utc)
-                    )
-                    
-                    if record:
-                        collected_posts.append(record.to_dict())
-                    
-                    # Get top comments
-                    post.comments.replace_more(limit=0)
-                    for comment in post.comments.list()[:10]:
-                        comment_record = save_sentiment_record(
-                            source=source,
-                            content_text=comment.body,
-                            content_url=f"https://www.reddit.com{comment.permalink}",
-                            published_date=datetime.fromtimestamp(comment.created_utc)
-                        )
-                        
-                        if comment_record:
-                            collected_posts.append(comment_record.to_dict())
-        
-        except Exception as e:
-            print(f"Error collecting Reddit data from r/{subreddit_name}: {str(e)}")
+    def fetch(task, checkpoint):
+        if not hasattr(clients, 'reddit'):
+            clients.reddit = reddit_factory()
+        return fetch_reddit_posts(clients.reddit, *task, checkpoint=checkpoint)
     
-    # Update daily summary
-    update_daily_summary()
+    # Search every subreddit/keyword pair concurrently; records are analyzed and committed in chunks
+    writer = _ingest(
+        source,
+        [(subreddit_name, keyword) for subreddit_name in REDDIT_SUBREDDITS for keyword in CANADIAN_TIRE_KEYWORDS],
+        fetch,
+        lambda task, e: f"Error collecting Reddit data from r/{task[0]} for '{task[1]}': {str(e)}",
+        query_key=reddit_query_key
+    )
     
     return {
-        "count": len(collected_posts),
+        "count": writer.written,
         "source": "Reddit",
-        "records": collected_posts[:10]  # Return only first 10 for brevity
+        "records": writer.sample  # Return only first 10 for brevity
     }
 
-def collect_news_data():
-    """Collect data from News API"""
+def get_news_client():
+    """Process-wide News API client: pooled connections, retries and a response cache"""
+    global _news_client
+    if _news_client is None:
+        _news_client = CachedHTTPClient()
+    return _news_client
+
+def fetch_news_articles(client, keyword, api_key, from_date, to_date, checkpoint=None):
+    """Search News API for one keyword from its checkpoint (or `from_date` on the first run).
+
+    The request starts at the checkpoint's day, so re-runs within a day hit
+    the response cache; articles older than the mark are dropped here and
+    same-second repeats by URL in the writer. Returns (record fields, mark).
+    """
+    last_published = checkpoint and checkpoint['last_published']
+    if last_published:
+        from_date = last_published.strftime('%Y-%m-%d')
+    RATE_LIMITS['news'].wait()
+    data = client.get_json(NEWS_API_URL, params={
+        'q': keyword,
+        'from': from_date,
+        'to': to_date,
+        'language': 'en',
+        'sortBy': 'relevancy',
+        'apiKey': api_key
+    })
+    
+    if data.get('status') != 'ok':
+        return [], checkpoint
+    
+    items = []
+    mark = checkpoint
+    for article in data.get('articles', []):
+        published = datetime.strptime(article.get('publishedAt'), '%Y-%m-%dT%H:%M:%SZ') if article.get('publishedAt') else None
+        if last_published and published and published < last_published:
+            continue
+        mark = advance_mark(mark, published=published, url=article.get('url'))
+        items.append({
+            'content_text': f"{article.get('title')} {article.get('description')}",
+            'content_url': article.get('url'),
+            'published_date': published
+        })
+    return items, mark
+
+def collect_news_data(client=None):
+    """Collect data from News API
+
+    `client` defaults to the shared cached client; re-running collection for
+    the same date window is served from its cache. Tests pass a client
+    pointed at a local server.
+    """
     # News API key
     api_key = os.environ.get('NEWS_API_KEY')
     
     if not api_key:
         raise ValueError("News API key not found in environment variables")
     
+    if client is None:
+        client = get_news_client()
+    
     # Get source
     source = get_or_create_source("News Articles", "news", "News articles about Canadian Tire")
     
-    # Collect news articles
-    collected_articles = []
-    
-    # Date range (last 7 days)
+    # Date range (last 7 days) for keywords without a checkpoint
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=7)
     
@@ -292,36 +385,16 @@ def collect_news_data():
     from_date = start_date.strftime('%Y-%m-%d')
     to_date = end_date.strftime('%Y-%m-%d')
     
-    # Search for each keyword
-    for keyword in CANADIAN_TIRE_KEYWORDS:
-        try:
-            url = f"https://newsapi.org/v2/everything?q={keyword}&from={from_date}&to={to_date}&language=en&sortBy=relevancy&apiKey={api_key}"
-            response = requests.get(url)
-            data = response.json()
-            
-            if data.get('status') == 'ok':
-                articles = data.get('articles', [])
-                
-                for article in articles:
-                    # Save article
-                    record = save_sentiment_record(
-                        source=source,
-                        content_text=f"{article.get('title')} {article.get('description')}",
-                        content_url=article.get('url'),
-                        published_date=datetime.strptime(article.get('publishedAt'), '%Y-%m-%dT%H:%M:%SZ') if article.get('publishedAt') else None
-                    )
-                    
-                    if record:
-                        collected_articles.append(record.to_dict())
-        
-        except Exception as e:
-            print(f"Error collecting news data for keyword '{keyword}': {str(e)}")
-    
-    # Update daily summary
-    update_daily_summary()
+    # Search all keywords concurrently; records are analyzed and committed in chunks
+    writer = _ingest(
+        source,
+        CANADIAN_TIRE_KEYWORDS,
+        lambda keyword, checkpoint: fetch_news_articles(client, keyword, api_key, from_date, to_date, checkpoint),
+        lambda keyword, e: f"Error collecting news data for keyword '{keyword}': {str(e)}"
+    )
     
     return {
-        "count": len(collected_articles),
+        "count": writer.written,
         "source": "News",
-        "records": collected_articles[:10]  # Return only first 10 for brevity
+        "records": writer.sample  # Return only first 10 for brevity
     }
@@ -0,0 +1,146 @@
+from sqlalchemy import Float, type_coerce
+from models import db, Donor, Donation
+from services.donation_queries import build_donation_filters
+from services.donor_cohorts import fiscal_year_bounds
+
+# pandas is optional: without it the columnar reports are refused and
+# everything else keeps working
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = pd = None
+
+CHUNK_SIZE = 50000
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+# Lower edges of the gift-size bands; the last band is open-ended
+AMOUNT_BANDS = (0, 25, 50, 100, 250, 500, 1000, 5000)
+LAPSED_LIST_LIMIT = 100
+
+def analytics_available():
+    return pd is not None
+
+def _require_pandas():
+    if pd is None:
+        raise ValueError('This report requires pandas and numpy to be installed')
+
+def _empty_frame():
+    return pd.DataFrame({
+        'donor_id': np.array([], dtype=np.int64),
+        'amount': np.array([], dtype=np.float64),
+        'donation_date': np.array([], dtype='datetime64[us]')
+    })
+
+def donation_frame(params, chunk_size=CHUNK_SIZE):
+    """Donor id, amount and date of every matching donation, as a DataFrame.
+
+    One query streams the three columns through a server-side cursor and
+    each chunk of rows becomes NumPy arrays directly, so no ORM objects are
+    built and only one chunk of Python tuples is alive at a time.
+    """
+    _require_pandas()
+    clauses, needs_donor = build_donation_filters(params)
+    # Amounts arrive as floats rather than Decimals; NumPy would convert them anyway
+    query = db.session.query(Donation.donor_id, type_coerce(Donation.amount, Float), Donation.donation_date)
+    if needs_donor:
+        query = query.join(Donation.donor)
+    query = query.filter(Donation.donation_date.isnot(None), *clauses)
+
+    # Executed as Core on the session's connection, skipping ORM row loading
+    connection = db.session.connection().execution_options(stream_results=True)
+    result = connection.execute(query.statement)
+    chunks = []
+    for rows in result.partitions(chunk_size):
+        donor_ids, amounts, dates = zip(*rows)
+        chunks.append(pd.DataFrame({
+            'donor_id': np.fromiter(donor_ids, dtype=np.int64, count=len(rows)),
+            'amount': np.array(amounts, dtype=np.float64),
+            'donation_date': np.array(dates, dtype='datetime64[us]')
+        }))
+
+    if not chunks:
+        return _empty_frame()
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+def _band_label(i):
+    low = AMOUNT_BANDS[i]
+    return f'{low}+' if i == len(AMOUNT_BANDS) - 1 else f'{low}-{AMOUNT_BANDS[i + 1]}'
+
+def amount_distribution(amounts):
+    """Mean, percentiles and gift-size bands of an array of amounts"""
+    amounts = np.asarray(amounts, dtype=np.float64)
+    if not len(amounts):
+        return {'count': 0, 'total': 0, 'mean': None, 'percentiles': {}, 'bands': []}
+
+    band = np.clip(np.searchsorted(AMOUNT_BANDS, amounts, side='right') - 1, 0, None)
+    counts = np.bincount(band, minlength=len(AMOUNT_BANDS))
+    totals = np.bincount(band, weights=amounts, minlength=len(AMOUNT_BANDS))
+
+    return {
+        'count': int(len(amounts)),
+        'total': round(float(amounts.sum()), 2),
+        'mean': round(float(amounts.mean()), 2),
+        'percentiles': {
+            f'p{p}': round(float(value), 2) for p, value in zip(PERCENTILES, np.percentile(amounts, PERCENTILES))
+        },
+        'bands': [{
+            'band': _band_label(i),
+            'count': int(counts[i]),
+            'amount': round(float(totals[i]), 2)
+        } for i in range(len(AMOUNT_BANDS))]
+    }
+
+def _donor_names(donor_ids):
+    rows = db.session.query(Donor.id, Donor.first_name, Donor.last_name).filter(Donor.id.in_(donor_ids))
+    return {donor_id: f'{first_name} {last_name}' for donor_id, first_name, last_name in rows}
+
+def _lapsed_group(per_donor, names):
+    listed = per_donor.nlargest(LAPSED_LIST_LIMIT, 'lifetime_amount')
+    return {
+        'count': int(len(per_donor)),
+        'lifetime_amount': round(float(per_donor['lifetime_amount'].sum()), 2),
+        'donors': [{
+            'donor_id': int(row.Index),
+            'name': names.get(int(row.Index)),
+            'last_gift_date': row.last_gift.date().isoformat(),
+            'lifetime_amount': round(float(row.lifetime_amount), 2),
+            'gift_count': int(row.gift_count)
+        } for row in listed.itertuples()]
+    }
+
+def _fiscal_years(dates, start_month):
+    """Vectorized fiscal_year_of over a datetime Series"""
+    years = dates.dt.year
+    if start_month == 1:
+        return years
+    return years + (dates.dt.month >= start_month).astype(years.dtype)
+
+def lapsed_donors(frame, fiscal_year, start_month=1):
+    """LYBUNT and SYBUNT donors as of `fiscal_year`.
+
+    LYBUNT donors gave Last Year But Unfortunately Not This year; SYBUNT
+    donors gave Some Year before that but not last year or this year. Years
+    are fiscal years as in services.donor_cohorts, so these counts agree
+    with the cohort report's lapsed donors. Each list holds the donors with
+    the largest lifetime giving.
+    """
+    _, next_year = fiscal_year_bounds(fiscal_year, start_month)
+    frame = frame[frame['donation_date'] < pd.Timestamp(next_year)]
+    per_donor = frame.groupby('donor_id').agg(
+        last_gift=('donation_date', 'max'),
+        lifetime_amount=('amount', 'sum'),
+        gift_count=('amount', 'size')
+    )
+    last_year = _fiscal_years(per_donor['last_gift'], start_month)
+    lybunt = per_donor[last_year == fiscal_year - 1]
+    sybunt = per_donor[last_year < fiscal_year - 1]
+
+    listed = set(lybunt.nlargest(LAPSED_LIST_LIMIT, 'lifetime_amount').index)
+    listed.update(sybunt.nlargest(LAPSED_LIST_LIMIT, 'lifetime_amount').index)
+    names = _donor_names([int(donor_id) for donor_id in listed]) if listed else {}
+
+    return {
+        'fiscal_year': fiscal_year,
+        'lybunt': _lapsed_group(lybunt, names),
+        'sybunt': _lapsed_group(sybunt, names)
+    }
@@ -0,0 +1,215 @@
+import codecs
+import csv
+import io
+import json
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from sqlalchemy.exc import SQLAlchemyError
+from models import db, Donor, Donation
+from services.cache import invalidate_reports
+from services.donation_rollups import apply_deltas
+from services.donor_scores import mark_scores_stale
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+IMPORT_FORMATS = ('csv', 'jsonl')
+TRUE_VALUES = ('1', 'true', 'yes', 'y')
+UPLOAD_ENCODING = 'utf-8-sig'
+DECODE_BLOCK_SIZE = 1 << 16
+
+def detect_format(filename, import_format=None):
+    """Pick the import format from an explicit choice or the file extension"""
+    if import_format:
+        return import_format.lower()
+    if filename and filename.lower().endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'csv'
+
+def open_text(stream):
+    """Wrap a seekable binary file as UTF-8 text, refusing other encodings up front.
+
+    Imports commit chunk by chunk, so a Latin-1 or Excel "ANSI" file that
+    failed to decode halfway through would leave a partial import behind.
+    The bytes are decoded once before any row is read and a ValueError names
+    the first line that is not UTF-8.
+    """
+    decoder = codecs.getincrementaldecoder(UPLOAD_ENCODING)()
+    line = 1
+    while True:
+        block = stream.read(DECODE_BLOCK_SIZE)
+        try:
+            text = decoder.decode(block, final=not block)
+        except UnicodeDecodeError as e:
+            line += e.object[:e.start].count(b'\n')
+            raise ValueError(f'File must be UTF-8 encoded; line {line} is not. '
+                             'Save it as "CSV UTF-8" (or another UTF-8 format) and upload it again')
+        line += text.count('\n')
+        if not block:
+            break
+    stream.seek(0)
+    return io.TextIOWrapper(stream, encoding=UPLOAD_ENCODING, newline='')
+
+def read_rows(stream, import_format):
+    """Yield (row_number, dict) pairs from a CSV or JSON-lines text stream.
+
+    Rows are read lazily so a large file is never held in memory. A JSON line
+    that does not parse is yielded as an error string instead of a dict.
+    """
+    if import_format == 'csv':
+        for number, row in enumerate(csv.DictReader(stream), 1):
+            yield number, row
+    elif import_format == 'jsonl':
+        number = 0
+        for line in stream:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield number, 'Invalid JSON'
+                continue
+            yield number, row if isinstance(row, dict) else 'Each line must be a JSON object'
+    else:
+        raise ValueError(f"Unknown format '{import_format}'. Use one of: {', '.join(IMPORT_FORMATS)}")
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+def _parse_row(row):
+    """Validate one input row; returns (mapping, donor_key) or raises ValueError"""
+    if isinstance(row, str):
+        raise ValueError(row)
+
+    if not _blank(row.get('donor_id')):
+        try:
+            donor_key = ('id', int(row['donor_id']))
+        except (TypeError, ValueError):
+            raise ValueError('donor_id must be an integer')
+    elif not _blank(row.get('donor_email')):
+        donor_key = ('email', str(row['donor_email']).strip().lower())
+    else:
+        raise ValueError('donor_id or donor_email is required')
+
+    if _blank(row.get('amount')):
+        raise ValueError('amount is required')
+    try:
+        amount = Decimal(str(row['amount']).strip())
+    except InvalidOperation:
+        raise ValueError('amount must be a number')
+    if not amount.is_finite():
+        raise ValueError('amount must be a number')
+
+    donation_date = datetime.utcnow()
+    if not _blank(row.get('donation_date')):
+        try:
+            donation_date = datetime.fromisoformat(str(row['donation_date']).strip())
+        except ValueError:
+            raise ValueError('donation_date must be an ISO date (YYYY-MM-DD)')
+
+    is_recurring = row.get('is_recurring')
+    if isinstance(is_recurring, str):
+        is_recurring = is_recurring.strip().lower() in TRUE_VALUES
+
+    mapping = {
+        'amount': amount,
+        'donation_date': donation_date,
+        'payment_method': None if _blank(row.get('payment_method')) else row['payment_method'],
+        'is_recurring': bool(is_recurring),
+        'receipt_number': None if _blank(row.get('receipt_number')) else str(row['receipt_number']),
+        'campaign': None if _blank(row.get('campaign')) else row['campaign'],
+        'notes': None if _blank(row.get('notes')) else row['notes']
+    }
+    return mapping, donor_key
+
+def _resolve_donors(donor_keys):
+    """Map ('id', n) / ('email', e) keys to donor ids with one IN query per key type"""
+    ids = {value for kind, value in donor_keys if kind == 'id'}
+    emails = {value for kind, value in donor_keys if kind == 'email'}
+
+    resolved = {}
+    if ids:
+        for (donor_id,) in db.session.query(Donor.id).filter(Donor.id.in_(ids)):
+            resolved[('id', donor_id)] = donor_id
+    if emails:
+        for donor_id, email in db.session.query(Donor.id, db.func.lower(Donor.email)).filter(
+                db.func.lower(Donor.email).in_(emails)):
+            resolved[('email', email)] = donor_id
+    return resolved
+
+def _import_chunk(chunk, result):
+    """Validate, resolve and insert one chunk of rows in a single transaction"""
+    parsed = []
+    for number, row in chunk:
+        try:
+            parsed.append((number,) + _parse_row(row))
+        except ValueError as e:
+            record_error(result, number, str(e))
+
+    donors = _resolve_donors({donor_key for _, _, donor_key in parsed})
+
+    mappings = []
+    for number, mapping, donor_key in parsed:
+        donor_id = donors.get(donor_key)
+        if donor_id is None:
+            record_error(result, number, f'Donor not found: {donor_key[1]}')
+            continue
+        mapping['donor_id'] = donor_id
+        mappings.append((number, mapping))
+
+    if not mappings:
+        return
+
+    try:
+        db.session.bulk_insert_mappings(Donation, [mapping for _, mapping in mappings])
+        apply_deltas([({
+            'donor_id': mapping['donor_id'],
+            'date': mapping['donation_date'].date(),
+            'campaign': mapping['campaign'] or '',
+            'payment_method': mapping['payment_method'] or '',
+            'amount': mapping['amount'],
+            'is_recurring': mapping['is_recurring']
+        }, 1) for _, mapping in mappings])
+        mark_scores_stale(mapping['donor_id'] for _, mapping in mappings)
+        db.session.commit()
+        result['imported'] += len(mappings)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        message = f'Chunk rejected by the database: {e.__class__.__name__}'
+        for number, _ in mappings:
+            record_error(result, number, message)
+
+def record_error(result, row_number, message):
+    """Count a failed row, keeping the first MAX_REPORTED_ERRORS messages"""
+    result['failed'] += 1
+    if len(result['errors']) < MAX_REPORTED_ERRORS:
+        result['errors'].append({'row': row_number, 'error': message})
+
+def import_donations(rows, chunk_size=CHUNK_SIZE):
+    """Bulk-insert donations from (row_number, dict) pairs.
+
+    Each chunk costs a constant number of statements: donor lookups by IN,
+    one executemany insert, one rollup upsert per (day, campaign, method) and
+    a commit. Bad rows are reported and skipped; a chunk the database rejects
+    is rolled back as a whole without affecting earlier chunks.
+    """
+    result = {'total_rows': 0, 'imported': 0, 'failed': 0, 'errors': []}
+    started = time.perf_counter()
+
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        result['total_rows'] += len(chunk)
+        _import_chunk(chunk, result)
+
+    if result['imported']:
+        invalidate_reports()
+
+    elapsed = time.perf_counter() - started
+    result['elapsed_seconds'] = round(elapsed, 3)
+    result['rows_per_second'] = round(result['total_rows'] / elapsed) if elapsed > 0 else None
+    return result
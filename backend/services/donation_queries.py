@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import func, or_
+from sqlalchemy.orm import contains_eager
+from models import db, Donor, Donation, Campaign
+from services.pagination import escape_like, keyset_page
+
+# Newest first; matches the ix_donation_date index so pages are index range scans
+DONATION_ORDER = (Donation.donation_date, Donation.id)
+
+def _parse_datetime(value, name):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid {name}. Use ISO format (YYYY-MM-DD)')
+
+def _parse_amount(value, name):
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f'{name} must be a number')
+
+def _parse_int(value, name):
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+
+def _campaign_filter(value):
+    # Donations reference campaigns by name; resolve the id inside the same statement
+    campaign_name = db.session.query(Campaign.name).filter(
+        Campaign.id == _parse_int(value, 'campaign_id')
+    ).scalar_subquery()
+    return Donation.campaign == campaign_name
+
+def _start_date_filter(value):
+    return Donation.donation_date >= _parse_datetime(value, 'start_date')
+
+def _end_date_filter(value):
+    end_date = _parse_datetime(value, 'end_date')
+    if len(value) == 10:
+        # A bare date includes the whole day
+        return Donation.donation_date < end_date + timedelta(days=1)
+    return Donation.donation_date <= end_date
+
+def _search_filter(value):
+    clauses = []
+    for word in value.strip().lower().split():
+        pattern = escape_like(word) + '%'
+        clauses.append(or_(
+            func.lower(Donor.first_name).like(pattern, escape='\\'),
+            func.lower(Donor.last_name).like(pattern, escape='\\'),
+            func.lower(Donor.email).like(pattern, escape='\\'),
+            func.lower(Donation.receipt_number).like(pattern, escape='\\')
+        ))
+    return clauses
+
+# Query parameter -> clause builder. Builders raise ValueError on bad input and
+# may return a single clause or a list of clauses.
+DONATION_FILTERS = {
+    'donor_id': lambda value: Donation.donor_id == _parse_int(value, 'donor_id'),
+    'campaign_id': _campaign_filter,
+    'campaign': lambda value: Donation.campaign == value,
+    'start_date': _start_date_filter,
+    'end_date': _end_date_filter,
+    'min_amount': lambda value: Donation.amount >= _parse_amount(value, 'min_amount'),
+    'max_amount': lambda value: Donation.amount <= _parse_amount(value, 'max_amount'),
+    'payment_method': lambda value: Donation.payment_method == value,
+    'donor_type': lambda value: Donor.donor_type == value,
+    'is_recurring': lambda value: Donation.is_recurring == (value.lower() in ('1', 'true', 'yes')),
+    'search': _search_filter,
+}
+
+# Filters that reference Donor columns and therefore need the join
+DONOR_FILTERS = {'search', 'donor_type'}
+
+# camelCase parameter names sent by the reports screen
+PARAM_ALIASES = {
+    'startDate': 'start_date',
+    'endDate': 'end_date',
+    'campaignId': 'campaign_id',
+    'donorType': 'donor_type',
+    'reportType': 'report_type',
+}
+
+def normalize_params(args):
+    """Copy request parameters into a plain dict with snake_case names and blanks dropped"""
+    params = {}
+    for name, value in args.items():
+        if value in (None, '', 'null'):
+            continue
+        params[PARAM_ALIASES.get(name, name)] = value
+    return params
+
+def build_donation_filters(params):
+    """Turn request parameters into a list of SQL clauses.
+
+    Unknown and empty parameters are ignored. Returns (clauses, needs_donor)
+    where needs_donor says whether any clause references the donor table.
+    """
+    clauses = []
+    needs_donor = False
+
+    for name, builder in DONATION_FILTERS.items():
+        value = params.get(name)
+        if value in (None, ''):
+            continue
+
+        clause = builder(value)
+        clauses.extend(clause if isinstance(clause, list) else [clause])
+        needs_donor = needs_donor or name in DONOR_FILTERS
+
+    return clauses, needs_donor
+
+def filtered_donations(params):
+    """Donation query with filters applied and each donor loaded in the same statement"""
+    clauses, _ = build_donation_filters(params)
+    return Donation.query.join(Donation.donor).options(
+        contains_eager(Donation.donor)
+    ).filter(*clauses)
+
+def count_donations(params):
+    """Count matching donations without loading any rows"""
+    clauses, needs_donor = build_donation_filters(params)
+    query = db.session.query(func.count(Donation.id)).select_from(Donation)
+    if needs_donor:
+        query = query.join(Donation.donor)
+    return query.filter(*clauses).scalar()
+
+def search_donations(params, cursor=None, limit=25, page=None):
+    """Return (donations, total, next_cursor) for one page of filtered donations"""
+    total = count_donations(params)
+
+    donations, next_cursor = keyset_page(
+        filtered_donations(params),
+        DONATION_ORDER,
+        cursor=cursor,
+        limit=limit,
+        descending=True,
+        page=page
+    )
+
+    return donations, total, next_cursor
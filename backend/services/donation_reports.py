@@ -0,0 +1,92 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from sqlalchemy import case, distinct, func
+from models import db, Donation
+from services.donation_rollups import rollup_totals
+
+CENTS = Decimal('0.01')
+
+def _to_cents(value):
+    """A Decimal sum as a float rounded to cents, like every other money value in the API"""
+    return float(Decimal(value or 0).quantize(CENTS))
+
+def _raw_totals(*criteria):
+    """Aggregate raw donations matching `criteria`, in the same shape as rollup_totals"""
+    method = func.coalesce(Donation.payment_method, '')
+    rows = db.session.query(
+        method,
+        func.sum(Donation.amount),
+        func.count(Donation.id),
+        func.sum(case((Donation.is_recurring == True, 1), else_=0))
+    ).filter(*criteria).group_by(method).all()
+
+    total_amount, donation_count, recurring_count = Decimal('0'), 0, 0
+    by_method = {}
+    for name, amount, count, recurring in rows:
+        amount = Decimal(amount or 0)
+        total_amount += amount
+        donation_count += count
+        recurring_count += int(recurring or 0)
+        by_method[name] = amount
+
+    return total_amount, donation_count, recurring_count, by_method
+
+def _whole_days(start_date, end_date):
+    """First and last calendar days that lie entirely inside [start_date, end_date]"""
+    first_day = start_date.date()
+    if start_date.time() != time.min:
+        first_day += timedelta(days=1)
+    last_day = end_date.date() - timedelta(days=1)
+    return first_day, last_day
+
+def summarize_donations(start_date, end_date):
+    """Compute the donation report metrics for a date range with SQL aggregates.
+
+    Whole days are read from the daily rollup; only the partial days at either
+    end of the range touch raw donations. The distinct donor count cannot be
+    summed across days, so it is a COUNT(DISTINCT) over the donation indexes.
+    Amounts are summed as Decimals and returned as floats rounded to cents.
+    """
+    first_day, last_day = _whole_days(start_date, end_date)
+
+    if first_day <= last_day:
+        parts = [
+            rollup_totals(first_day, last_day),
+            _raw_totals(
+                Donation.donation_date >= start_date,
+                Donation.donation_date < datetime.combine(first_day, time.min)
+            ),
+            _raw_totals(
+                Donation.donation_date >= datetime.combine(last_day + timedelta(days=1), time.min),
+                Donation.donation_date <= end_date
+            )
+        ]
+    else:
+        parts = [_raw_totals(Donation.donation_date >= start_date, Donation.donation_date <= end_date)]
+
+    total_amount, donation_count, recurring_count = Decimal('0'), 0, 0
+    payment_methods = {}
+    for amount, count, recurring, by_method in parts:
+        total_amount += amount
+        donation_count += count
+        recurring_count += recurring
+        for name, method_amount in by_method.items():
+            name = name or 'Unknown'
+            payment_methods[name] = payment_methods.get(name, Decimal('0')) + method_amount
+
+    donor_count = db.session.query(func.count(distinct(Donation.donor_id))).filter(
+        Donation.donation_date >= start_date,
+        Donation.donation_date <= end_date
+    ).scalar()
+
+    total_amount = Decimal(total_amount).quantize(CENTS)
+    average_amount = total_amount / donation_count if donation_count else 0
+
+    return {
+        'total_amount': _to_cents(total_amount),
+        'donation_count': donation_count,
+        'average_amount': _to_cents(average_amount),
+        'donor_count': donor_count,
+        'recurring_count': recurring_count,
+        'payment_methods': {name: _to_cents(amount) for name, amount in payment_methods.items()}
+    }
@@ -0,0 +1,242 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import case, extract, func, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Donation, DailyDonationSummary, DonorFiscalYear
+from services.donor_cohorts import fiscal_year_of, fiscal_year_start_month
+
+ROLLUP_KEY = ('date', 'campaign', 'payment_method')
+
+def donation_snapshot(donation):
+    """Capture the rollup-relevant fields of a donation.
+
+    Take a snapshot before editing a donation so its old contribution can be
+    retracted once the new values are known.
+    """
+    donation_date = donation.donation_date or datetime.utcnow()
+    return {
+        'donor_id': donation.donor_id,
+        'date': donation_date.date(),
+        'campaign': donation.campaign or '',
+        'payment_method': donation.payment_method or '',
+        'amount': Decimal(str(donation.amount)),
+        'is_recurring': bool(donation.is_recurring)
+    }
+
+def dialect_insert(table):
+    """INSERT construct supporting on_conflict_do_update for the bound database"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    if dialect == 'sqlite':
+        return sqlite.insert(table)
+    raise NotImplementedError(f'INSERT ... ON CONFLICT is not supported on {dialect}')
+
+def apply_deltas(changes):
+    """Add (snapshot, sign) pairs to the daily summary and donor fiscal-year rows.
+
+    Changes are merged per key first, then each key is applied with a single
+    INSERT ... ON CONFLICT DO UPDATE so concurrent writers add to the same row
+    instead of racing on it. Runs in the caller's transaction.
+    """
+    totals = defaultdict(lambda: [Decimal('0'), 0, 0])
+    for snapshot, sign in changes:
+        entry = totals[tuple(snapshot[k] for k in ROLLUP_KEY)]
+        entry[0] += snapshot['amount'] * sign
+        entry[1] += sign
+        entry[2] += sign if snapshot['is_recurring'] else 0
+
+    table = DailyDonationSummary.__table__
+    now = datetime.utcnow()
+    for key, (amount, count, recurring) in totals.items():
+        if not (amount or count or recurring):
+            continue
+
+        stmt = dialect_insert(table).values(
+            **dict(zip(ROLLUP_KEY, key)),
+            total_amount=amount,
+            donation_count=count,
+            recurring_count=recurring,
+            updated_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEY),
+            set_={
+                'total_amount': table.c.total_amount + stmt.excluded.total_amount,
+                'donation_count': table.c.donation_count + stmt.excluded.donation_count,
+                'recurring_count': table.c.recurring_count + stmt.excluded.recurring_count,
+                'updated_at': stmt.excluded.updated_at
+            }
+        )
+        db.session.execute(stmt)
+
+    _apply_donor_year_deltas(changes)
+
+def _apply_donor_year_deltas(changes):
+    """Add (snapshot, sign) pairs to each donor's giving in the fiscal year of the gift.
+
+    The touched donors' cohort and previous years are then refreshed, since
+    a year gaining its first gift or losing its last one shifts them.
+    """
+    start_month = fiscal_year_start_month()
+    totals = defaultdict(lambda: [Decimal('0'), 0])
+    for snapshot, sign in changes:
+        entry = totals[(snapshot['donor_id'], fiscal_year_of(snapshot['date'], start_month))]
+        entry[0] += snapshot['amount'] * sign
+        entry[1] += sign
+
+    table = DonorFiscalYear.__table__
+    now = datetime.utcnow()
+    for (donor_id, fiscal_year), (amount, count) in totals.items():
+        if not (amount or count):
+            continue
+
+        stmt = dialect_insert(table).values(
+            donor_id=donor_id,
+            fiscal_year=fiscal_year,
+            total_amount=amount,
+            donation_count=count,
+            updated_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['donor_id', 'fiscal_year'],
+            set_={
+                'total_amount': table.c.total_amount + stmt.excluded.total_amount,
+                'donation_count': table.c.donation_count + stmt.excluded.donation_count,
+                'updated_at': stmt.excluded.updated_at
+            }
+        )
+        db.session.execute(stmt)
+
+    _refresh_donor_history({donor_id for donor_id, _ in totals})
+
+def _refresh_donor_history(donor_ids=None):
+    """Recompute cohort_year and previous_year from the donors' years with gifts (all donors if None)"""
+    table = DonorFiscalYear.__table__
+    other = table.alias('other')
+    given = (other.c.donor_id == table.c.donor_id, other.c.donation_count > 0)
+    stmt = table.update().values(
+        cohort_year=select(func.min(other.c.fiscal_year)).where(*given).scalar_subquery(),
+        previous_year=select(func.max(other.c.fiscal_year)).where(
+            *given, other.c.fiscal_year < table.c.fiscal_year
+        ).scalar_subquery()
+    )
+    if donor_ids is not None:
+        if not donor_ids:
+            return
+        stmt = stmt.where(table.c.donor_id.in_(donor_ids))
+    db.session.execute(stmt)
+
+def record_donation(donation):
+    """Add a new donation to the rollup"""
+    apply_deltas([(donation_snapshot(donation), 1)])
+
+def retract_donation(donation):
+    """Remove a donation that is about to be deleted from the rollup"""
+    apply_deltas([(donation_snapshot(donation), -1)])
+
+def revise_donation(before, donation):
+    """Move an edited donation's contribution from its old snapshot to its new values"""
+    apply_deltas([(before, -1), (donation_snapshot(donation), 1)])
+
+def rebuild_rollups(start_date=None, end_date=None):
+    """Recompute the daily summary rows for a date range (inclusive) from raw donations.
+
+    Used to backfill the table and to repair drift. Returns the number of
+    summary rows written.
+    """
+    summaries = DailyDonationSummary.query
+    donations = db.session.query(Donation).filter(Donation.donation_date.isnot(None))
+    if start_date:
+        summaries = summaries.filter(DailyDonationSummary.date >= start_date)
+        donations = donations.filter(Donation.donation_date >= datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        summaries = summaries.filter(DailyDonationSummary.date <= end_date)
+        donations = donations.filter(
+            Donation.donation_date < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        )
+
+    summaries.delete(synchronize_session=False)
+
+    day = func.date(Donation.donation_date)
+    campaign = func.coalesce(Donation.campaign, '')
+    payment_method = func.coalesce(Donation.payment_method, '')
+    grouped = donations.with_entities(
+        day,
+        campaign,
+        payment_method,
+        func.sum(Donation.amount),
+        func.count(Donation.id),
+        func.sum(case((Donation.is_recurring == True, 1), else_=0)),
+        literal(datetime.utcnow())
+    ).group_by(day, campaign, payment_method)
+
+    # INSERT ... SELECT keeps the whole backfill inside the database
+    result = db.session.execute(DailyDonationSummary.__table__.insert().from_select(
+        [*ROLLUP_KEY, 'total_amount', 'donation_count', 'recurring_count', 'updated_at'],
+        grouped.statement
+    ))
+
+    return result.rowcount
+
+def _fiscal_year_column(start_month):
+    year = extract('year', Donation.donation_date)
+    if start_month == 1:
+        return year
+    return year + case((extract('month', Donation.donation_date) >= start_month, 1), else_=0)
+
+def rebuild_donor_years():
+    """Recompute every donor's fiscal-year giving from raw donations.
+
+    Used to backfill the table and after FISCAL_YEAR_START_MONTH changes.
+    Returns the number of rows written.
+    """
+    DonorFiscalYear.query.delete(synchronize_session=False)
+
+    fiscal_year = _fiscal_year_column(fiscal_year_start_month())
+    grouped = db.session.query(
+        Donation.donor_id,
+        fiscal_year,
+        func.sum(Donation.amount),
+        func.count(Donation.id),
+        literal(datetime.utcnow())
+    ).filter(Donation.donation_date.isnot(None)).group_by(Donation.donor_id, fiscal_year)
+
+    result = db.session.execute(DonorFiscalYear.__table__.insert().from_select(
+        ['donor_id', 'fiscal_year', 'total_amount', 'donation_count', 'updated_at'],
+        grouped.statement
+    ))
+    _refresh_donor_history()
+
+    return result.rowcount
+
+def rollup_totals(first_day, last_day):
+    """Sum the rollup over whole days [first_day, last_day].
+
+    Returns (total_amount, donation_count, recurring_count, {payment_method: amount});
+    reads one row per day/campaign/payment method rather than raw donations.
+    """
+    method = DailyDonationSummary.payment_method
+    rows = db.session.query(
+        method,
+        func.sum(DailyDonationSummary.total_amount),
+        func.sum(DailyDonationSummary.donation_count),
+        func.sum(DailyDonationSummary.recurring_count)
+    ).filter(
+        DailyDonationSummary.date >= first_day,
+        DailyDonationSummary.date <= last_day
+    ).group_by(method).all()
+
+    total_amount, donation_count, recurring_count = Decimal('0'), 0, 0
+    by_method = {}
+    for name, amount, count, recurring in rows:
+        if not count:
+            continue
+        amount = Decimal(amount or 0)
+        total_amount += amount
+        donation_count += int(count)
+        recurring_count += int(recurring or 0)
+        by_method[name] = amount
+
+    return total_amount, donation_count, recurring_count, by_method
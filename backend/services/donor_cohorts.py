@@ -0,0 +1,110 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from flask import current_app
+from sqlalchemy import case, func
+from models import db, DonorFiscalYear
+from services.cache import report_cache
+
+DEFAULT_FISCAL_YEAR_START_MONTH = 1
+EMPTY_YEAR = {'donors': 0, 'new': 0, 'retained': 0, 'recaptured': 0, 'amount': 0.0}
+
+def fiscal_year_start_month():
+    return int(current_app.config.get('FISCAL_YEAR_START_MONTH', DEFAULT_FISCAL_YEAR_START_MONTH))
+
+def fiscal_year_of(day, start_month):
+    """Fiscal years are named after the calendar year they end in"""
+    return day.year + (1 if start_month > 1 and day.month >= start_month else 0)
+
+def fiscal_year_bounds(fiscal_year, start_month):
+    """First day of `fiscal_year` and first day of the next one"""
+    if start_month == 1:
+        return date(fiscal_year, 1, 1), date(fiscal_year + 1, 1, 1)
+    return date(fiscal_year - 1, start_month, 1), date(fiscal_year, start_month, 1)
+
+def _cohort_counts(fiscal_year):
+    """(cohort, fiscal year, donors, new, retained, recaptured, amount) rows up to `fiscal_year`.
+
+    Reads DonorFiscalYear, which holds one row per donor and fiscal year
+    they gave in along with the donor's first gift year (the cohort) and
+    previous gift year. Counting donors per cohort and year is one pass over
+    its covering index, so the database returns cohorts x years rows however
+    many donors there are.
+    """
+    years = DonorFiscalYear
+    return db.session.query(
+        years.cohort_year,
+        years.fiscal_year,
+        func.count(),
+        func.sum(case((years.fiscal_year == years.cohort_year, 1), else_=0)),
+        func.sum(case((years.previous_year == years.fiscal_year - 1, 1), else_=0)),
+        func.sum(case((years.previous_year < years.fiscal_year - 1, 1), else_=0)),
+        func.sum(years.total_amount)
+    ).filter(
+        years.fiscal_year <= fiscal_year,
+        years.donation_count > 0
+    ).group_by(years.cohort_year, years.fiscal_year).all()
+
+def _rate(part, whole):
+    return round(part / whole * 100, 1) if whole else None
+
+def compute_cohorts(fiscal_year, start_month):
+    """Cohort retention and yearly new, retained, recaptured and lapsed donors up to `fiscal_year`.
+
+    Retained donors gave in the previous fiscal year too; recaptured donors
+    gave before that but not in the previous year; lapsed donors gave in the
+    previous year but not this one. The recapture rate is measured against
+    everyone who had given before and was lapsed going into the year.
+    """
+    cohorts = defaultdict(dict)
+    totals = {}
+    for cohort, year, donors, new, retained, recaptured, amount in _cohort_counts(fiscal_year):
+        cohort, year = int(cohort), int(year)
+        cohorts[cohort][year] = donors
+        row = totals.setdefault(year, dict(EMPTY_YEAR))
+        row['donors'] += donors
+        row['new'] += int(new or 0)
+        row['retained'] += int(retained or 0)
+        row['recaptured'] += int(recaptured or 0)
+        row['amount'] += float(amount or 0)
+
+    years = []
+    ever_given = 0  # donors whose first gift came before the year being reported
+    for year in range(min(totals, default=fiscal_year), fiscal_year + 1):
+        row = totals.get(year, EMPTY_YEAR)
+        previous = totals.get(year - 1, EMPTY_YEAR)
+        lapsed = previous['donors'] - row['retained']
+        years.append({
+            'fiscal_year': year,
+            'donors': row['donors'],
+            'new_donors': row['new'],
+            'retained_donors': row['retained'],
+            'recaptured_donors': row['recaptured'],
+            'lapsed_donors': lapsed,
+            'amount': round(row['amount'], 2),
+            'retention_rate': _rate(row['retained'], previous['donors']),
+            'lapsed_rate': _rate(lapsed, previous['donors']),
+            # Recaptured donors come from those who had given before but skipped the previous year
+            'recapture_rate': _rate(row['recaptured'], ever_given - previous['donors'])
+        })
+        ever_given += row['new']
+
+    first_day, next_year = fiscal_year_bounds(fiscal_year, start_month)
+    return {
+        'fiscal_year': fiscal_year,
+        'start_date': first_day.isoformat(),
+        'end_date': (next_year - timedelta(days=1)).isoformat(),
+        'years': years,
+        'cohorts': [{
+            'cohort': cohort,
+            'donors': counts[cohort],
+            'retention': {
+                str(year): _rate(counts.get(year, 0), counts[cohort]) for year in range(cohort, fiscal_year + 1)
+            }
+        } for cohort, counts in sorted(cohorts.items())]
+    }
+
+def donor_cohorts(fiscal_year):
+    """Cohort analysis through `fiscal_year`, cached per fiscal year until donations change"""
+    start_month = fiscal_year_start_month()
+    key = ('donor_cohorts', start_month, fiscal_year)
+    return report_cache.get_or_compute(key, lambda: compute_cohorts(fiscal_year, start_month))
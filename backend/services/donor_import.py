@@ -0,0 +1,128 @@
+import time
+from datetime import datetime
+from itertools import islice
+from sqlalchemy.exc import SQLAlchemyError
+from models import db, Donor
+from services.donation_import import record_error
+from services.donation_rollups import dialect_insert
+
+CHUNK_SIZE = 1000
+
+# Columns an import may set; blank values never overwrite what is stored
+DONOR_FIELDS = ('first_name', 'last_name', 'email', 'phone', 'address', 'city',
+                'province', 'postal_code', 'donor_type', 'notes')
+DEFAULT_DONOR_TYPE = 'individual'
+
+def _clean(row):
+    """Strip an input row down to the non-blank donor fields"""
+    values = {}
+    for field in DONOR_FIELDS:
+        value = row.get(field)
+        if value is None:
+            continue
+        value = str(value).strip()
+        if value:
+            values[field] = value
+    if 'email' in values:
+        values['email'] = values['email'].lower()
+    return values
+
+def _existing_donors(emails):
+    """{lower(email): donor row} for the given emails in one IN query"""
+    if not emails:
+        return {}
+    columns = [getattr(Donor, field) for field in DONOR_FIELDS]
+    rows = db.session.query(*columns).filter(db.func.lower(Donor.email).in_(emails))
+    return {row.email.lower(): row._asdict() for row in rows}
+
+def _upsert_chunk(chunk, result):
+    """Merge one chunk of rows into the donor table with a single upsert statement"""
+    by_email = {}
+    anonymous = []
+    for number, row in chunk:
+        if isinstance(row, str):
+            record_error(result, number, row)
+            continue
+        values = _clean(row)
+        if 'email' not in values:
+            anonymous.append((number, values))
+        elif values['email'] in by_email:
+            # Later rows for the same email win, field by field
+            by_email[values['email']][1].update(values)
+            result['skipped'] += 1
+        else:
+            by_email[values['email']] = (number, values)
+
+    existing = _existing_donors(list(by_email))
+    now = datetime.utcnow()
+
+    records, numbers = [], []
+    created = updated = 0
+    for number, values in anonymous + list(by_email.values()):
+        stored = existing.get(values.get('email'))
+        if stored is None:
+            if 'first_name' not in values or 'last_name' not in values:
+                record_error(result, number, 'first_name and last_name are required for new donors')
+                continue
+            record = {field: None for field in DONOR_FIELDS}
+            record.update(values)
+            record['donor_type'] = record['donor_type'] or DEFAULT_DONOR_TYPE
+            created += 1
+        else:
+            if all(stored[field] == value for field, value in values.items() if field != 'email'):
+                result['skipped'] += 1
+                continue
+            # Keep the stored spelling of the email so ON CONFLICT matches it
+            record = {**stored, **values, 'email': stored['email']}
+            updated += 1
+        records.append({**record, 'created_at': now, 'updated_at': now})
+        numbers.append(number)
+
+    if not records:
+        return
+
+    table = Donor.__table__
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.email],
+        set_={
+            **{field: stmt.excluded[field] for field in DONOR_FIELDS if field != 'email'},
+            'updated_at': stmt.excluded.updated_at
+        }
+    )
+
+    try:
+        db.session.execute(stmt, records)
+        db.session.commit()
+        result['created'] += created
+        result['updated'] += updated
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        message = f'Chunk rejected by the database: {e.__class__.__name__}'
+        for number in numbers:
+            record_error(result, number, message)
+
+def upsert_donors(rows, chunk_size=CHUNK_SIZE):
+    """Create or update donors from (row_number, dict) pairs, deduplicating by email.
+
+    Each chunk looks up existing donors with one case-insensitive IN query and
+    writes with one INSERT ... ON CONFLICT (email) DO UPDATE. Rows matching an
+    existing donor fill in or overwrite the non-blank fields they carry; rows
+    that change nothing, or repeat an email already seen in the chunk, are
+    counted as skipped. Rows without an email are always created.
+    """
+    result = {'total_rows': 0, 'created': 0, 'updated': 0, 'skipped': 0, 'failed': 0, 'errors': []}
+    started = time.perf_counter()
+
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        result['total_rows'] += len(chunk)
+        _upsert_chunk(chunk, result)
+
+    elapsed = time.perf_counter() - started
+    result['elapsed_seconds'] = round(elapsed, 3)
+    result['rows_per_second'] = round(result['total_rows'] / elapsed) if elapsed > 0 else None
+    return result
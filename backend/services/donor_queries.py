@@ -0,0 +1,97 @@
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import contains_eager, selectinload
+from models import db, Donor, DonorScore
+from services.pagination import escape_like, keyset_page
+
+# Listing order; matches the ix_donor_name index so pages are index range scans
+DONOR_ORDER = (Donor.last_name, Donor.first_name, Donor.id)
+# Best donors first; matches ix_donor_score_rfm
+RFM_ORDER = (DonorScore.rfm_score, DonorScore.donor_id)
+DONOR_SORTS = ('name', 'rfm')
+
+def donor_search_filter(search):
+    """Build a prefix-match filter for a free-text donor search.
+
+    Every word in the search must prefix-match the first name, last name or
+    email, so "jane do" finds Jane Doe. Matching is done on lower() so the
+    expression indexes on Donor can serve it.
+    """
+    words = (search or '').strip().lower().split()
+    if not words:
+        return None
+
+    clauses = []
+    for word in words:
+        pattern = escape_like(word) + '%'
+        clauses.append(or_(
+            func.lower(Donor.first_name).like(pattern, escape='\\'),
+            func.lower(Donor.last_name).like(pattern, escape='\\'),
+            func.lower(Donor.email).like(pattern, escape='\\')
+        ))
+
+    return and_(*clauses)
+
+def _parse_rfm(value, name):
+    """Parse an RFM score bound (3-15) query parameter"""
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be an integer')
+
+def search_donors(search=None, donor_type=None, cursor=None, limit=25, page=None, sort='name',
+                  min_rfm=None, max_rfm=None):
+    """Return (donors, total, next_cursor) for one page of the donor list.
+
+    Sorting or filtering on the RFM score reads the persisted donor_score
+    rows, so only scored donors are listed and nothing is computed per
+    request.
+    """
+    filters = []
+    min_rfm = _parse_rfm(min_rfm, 'min_rfm')
+    max_rfm = _parse_rfm(max_rfm, 'max_rfm')
+    by_score = sort == 'rfm' or min_rfm is not None or max_rfm is not None
+
+    search_clause = donor_search_filter(search)
+    if search_clause is not None:
+        filters.append(search_clause)
+    if donor_type:
+        filters.append(Donor.donor_type == donor_type)
+    if by_score:
+        filters.append(DonorScore.rfm_score.isnot(None))
+    if min_rfm is not None:
+        filters.append(DonorScore.rfm_score >= min_rfm)
+    if max_rfm is not None:
+        filters.append(DonorScore.rfm_score <= max_rfm)
+
+    # Count with a bare aggregate so no donor rows are loaded
+    count = db.session.query(func.count(Donor.id))
+    query = Donor.query
+    if by_score:
+        count = count.join(Donor.score)
+        query = query.join(Donor.score).options(contains_eager(Donor.score))
+    else:
+        query = query.options(selectinload(Donor.score))
+    total = count.filter(*filters).scalar()
+
+    if sort == 'rfm':
+        donors, next_cursor = keyset_page(
+            query.filter(*filters),
+            RFM_ORDER,
+            cursor=cursor,
+            limit=limit,
+            descending=True,
+            page=page,
+            row_key=lambda donor: (donor.score.rfm_score, donor.id)
+        )
+    else:
+        donors, next_cursor = keyset_page(
+            query.filter(*filters),
+            DONOR_ORDER,
+            cursor=cursor,
+            limit=limit,
+            page=page
+        )
+
+    return donors, total, next_cursor
@@ -0,0 +1,185 @@
+from bisect import bisect_right
+from datetime import datetime
+from sqlalchemy import DateTime, case, func, literal, or_, select, true
+from models import db, Donation, DonorScore
+from services.donation_rollups import dialect_insert
+
+QUINTILES = 5
+# Stay under SQLite's bound-parameter limit in IN lookups
+DONOR_BATCH = 500
+
+# (score column, metric column) for each RFM dimension
+DIMENSIONS = (
+    ('recency_score', 'last_donation_date'),
+    ('frequency_score', 'donation_count'),
+    ('monetary_score', 'total_amount'),
+)
+
+def _metrics():
+    return (
+        func.max(Donation.donation_date).label('last_donation_date'),
+        func.count(Donation.id).label('donation_count'),
+        func.sum(Donation.amount).label('total_amount')
+    )
+
+def _quintile(metric):
+    """1-5 from the donor's rank on an aggregate among all donors; ties share a score.
+
+    Integer division of integer window results, so PostgreSQL and SQLite
+    truncate alike.
+    """
+    return 1 + QUINTILES * (func.rank().over(order_by=metric) - 1) / func.count().over()
+
+def mark_scores_stale(donor_ids):
+    """Flag donors whose donations changed so the next scoring run recomputes them.
+
+    Upserts, so donors without a score row yet get one. Runs in the caller's
+    transaction.
+    """
+    donor_ids = sorted(set(donor_ids))
+    if not donor_ids:
+        return
+
+    table = DonorScore.__table__
+    now = datetime.utcnow()
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['donor_id'],
+        set_={'stale': True, 'changed_at': stmt.excluded.changed_at}
+    )
+    db.session.execute(stmt, [{'donor_id': donor_id, 'stale': True, 'changed_at': now,
+                               'donation_count': 0, 'total_amount': 0} for donor_id in donor_ids])
+
+def _still_stale(changed_at, started):
+    # A donor whose donations changed while the run was reading keeps its flag
+    return case((changed_at > started, True), else_=False)
+
+def _unchanged_since(started):
+    return or_(DonorScore.changed_at.is_(None), DonorScore.changed_at <= started)
+
+def score_all():
+    """Score every donor in one aggregate pass. Returns the number of donors scored.
+
+    One GROUP BY over donations gives each donor's metrics, and rank windows
+    over those grouped rows turn them into quintiles, so the whole run is a
+    single INSERT ... SELECT upsert inside the database. Score rows of donors
+    left without donations are removed.
+    """
+    started = datetime.utcnow()
+    grouped = select(Donation.donor_id.label('donor_id'), *_metrics()).where(
+        Donation.donation_date.isnot(None)
+    ).group_by(Donation.donor_id).subquery()
+
+    recency = _quintile(grouped.c.last_donation_date)
+    frequency = _quintile(grouped.c.donation_count)
+    monetary = _quintile(grouped.c.total_amount)
+    scored = select(
+        grouped.c.donor_id,
+        grouped.c.last_donation_date,
+        grouped.c.donation_count,
+        grouped.c.total_amount,
+        recency.label('recency_score'),
+        frequency.label('frequency_score'),
+        monetary.label('monetary_score')
+    ).subquery()
+
+    columns = ['donor_id', 'last_donation_date', 'donation_count', 'total_amount',
+               'recency_score', 'frequency_score', 'monetary_score', 'rfm_score', 'stale', 'scored_at']
+    source = select(
+        *(scored.c[name] for name in columns[:7]),
+        scored.c.recency_score + scored.c.frequency_score + scored.c.monetary_score,
+        literal(False),
+        literal(started, DateTime)
+    ).where(true())  # SQLite needs a WHERE before ON CONFLICT in INSERT ... SELECT
+
+    table = DonorScore.__table__
+    stmt = dialect_insert(table).from_select(columns, source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['donor_id'],
+        set_={
+            **{name: stmt.excluded[name] for name in columns[1:8]},
+            'stale': _still_stale(table.c.changed_at, started),
+            'scored_at': stmt.excluded.scored_at
+        }
+    )
+    result = db.session.execute(stmt)
+
+    has_donations = db.session.query(Donation.id).filter(
+        Donation.donor_id == DonorScore.donor_id, Donation.donation_date.isnot(None)
+    ).exists()
+    DonorScore.query.filter(~has_donations, _unchanged_since(started)).delete(synchronize_session=False)
+    return result.rowcount
+
+def score_boundaries():
+    """{score column: sorted [(lowest metric with that score, score)]} from fresh score rows"""
+    boundaries = {}
+    for score, metric in DIMENSIONS:
+        score_column, metric_column = getattr(DonorScore, score), getattr(DonorScore, metric)
+        rows = db.session.query(score_column, func.min(metric_column)).filter(
+            DonorScore.stale == False, score_column.isnot(None)
+        ).group_by(score_column).all()
+        boundaries[score] = sorted((value, quintile) for quintile, value in rows if value is not None)
+    return boundaries
+
+def _score_from(boundaries, value):
+    """Highest quintile whose lowest member's metric is at or below `value`"""
+    values = [boundary for boundary, _ in boundaries]
+    i = bisect_right(values, value)
+    return boundaries[i - 1][1] if i else 1
+
+def score_stale():
+    """Rescore donors flagged stale against the quintile boundaries of the last full run.
+
+    Only the stale donors' donations are aggregated. Quintile boundaries
+    drift slowly, so scores stay comparable until the next full run
+    refreshes them. Returns the number of donors rescored, or falls back to
+    score_all() when no full run has produced boundaries yet.
+    """
+    boundaries = score_boundaries()
+    if not all(boundaries.values()):
+        return score_all()
+
+    started = datetime.utcnow()
+    stale_ids = [
+        donor_id for (donor_id,) in db.session.query(DonorScore.donor_id).filter(DonorScore.stale == True)
+    ]
+    table = DonorScore.__table__
+    rescored = 0
+    for i in range(0, len(stale_ids), DONOR_BATCH):
+        batch = stale_ids[i:i + DONOR_BATCH]
+        rows = db.session.query(Donation.donor_id, *_metrics()).filter(
+            Donation.donor_id.in_(batch), Donation.donation_date.isnot(None)
+        ).group_by(Donation.donor_id).all()
+
+        updates = []
+        for donor_id, last_date, count, amount in rows:
+            scores = {score: _score_from(boundaries[score], value)
+                      for (score, _), value in zip(DIMENSIONS, (last_date, count, amount))}
+            updates.append({
+                'b_donor_id': donor_id,
+                'last_donation_date': last_date,
+                'donation_count': count,
+                'total_amount': amount,
+                'rfm_score': sum(scores.values()),
+                **scores
+            })
+        if updates:
+            db.session.execute(
+                table.update().where(table.c.donor_id == db.bindparam('b_donor_id')).values(
+                    stale=_still_stale(table.c.changed_at, started),
+                    scored_at=started
+                ),
+                updates
+            )
+            rescored += len(updates)
+
+        emptied = set(batch) - {row[0] for row in rows}
+        if emptied:
+            DonorScore.query.filter(
+                DonorScore.donor_id.in_(emptied), _unchanged_since(started)
+            ).delete(synchronize_session=False)
+    return rescored
+
+def score_donors(full=False):
+    """Run the scoring batch: every donor when `full`, otherwise only stale ones"""
+    return score_all() if full else score_stale()
@@ -0,0 +1,148 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import distinct, func
+from models import db, Donor, Donation, Campaign
+from services.donation_queries import build_donation_filters
+
+# Rows fetched per round trip; on PostgreSQL yield_per uses a server-side cursor
+FETCH_SIZE = 1000
+# Rows written per chunk sent to the client
+FLUSH_EVERY = 500
+
+DONATION_COLUMNS = [
+    'id', 'donation_date', 'amount', 'payment_method', 'is_recurring', 'receipt_number',
+    'campaign', 'donor_id', 'donor_first_name', 'donor_last_name', 'donor_email', 'donor_type'
+]
+
+DONOR_COLUMNS = [
+    'id', 'first_name', 'last_name', 'email', 'phone', 'address', 'city', 'province',
+    'postal_code', 'donor_type', 'created_at'
+]
+
+CAMPAIGN_COLUMNS = [
+    'id', 'name', 'start_date', 'end_date', 'goal_amount', 'raised_amount', 'donation_count', 'donor_count'
+]
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def donation_rows(params):
+    """Yield matching donations with their donor's details, newest first"""
+    clauses, _ = build_donation_filters(params)
+    query = db.session.query(
+        Donation.id, Donation.donation_date, Donation.amount, Donation.payment_method,
+        Donation.is_recurring, Donation.receipt_number, Donation.campaign, Donation.donor_id,
+        Donor.first_name, Donor.last_name, Donor.email, Donor.donor_type
+    ).join(Donor, Donation.donor_id == Donor.id).filter(*clauses).order_by(
+        Donation.donation_date.desc(), Donation.id.desc()
+    )
+
+    for row in query.yield_per(FETCH_SIZE):
+        yield dict(zip(DONATION_COLUMNS, row))
+
+def donor_rows(params):
+    """Yield donors, optionally restricted to a donor type"""
+    query = db.session.query(*[getattr(Donor, column) for column in DONOR_COLUMNS])
+    if params.get('donor_type'):
+        query = query.filter(Donor.donor_type == params['donor_type'])
+
+    for row in query.order_by(Donor.id).yield_per(FETCH_SIZE):
+        yield dict(zip(DONOR_COLUMNS, row))
+
+def campaign_rows(params):
+    """Yield one performance row per campaign for donations matching the filters"""
+    clauses, needs_donor = build_donation_filters(params)
+    totals = db.session.query(
+        Donation.campaign,
+        func.sum(Donation.amount),
+        func.count(Donation.id),
+        func.count(distinct(Donation.donor_id))
+    )
+    if needs_donor:
+        totals = totals.join(Donation.donor)
+    totals = {
+        name: (amount, count, donors)
+        for name, amount, count, donors in totals.filter(*clauses).group_by(Donation.campaign)
+    }
+
+    campaigns = Campaign.query
+    if params.get('campaign_id'):
+        campaigns = campaigns.filter(Campaign.id == int(params['campaign_id']))
+
+    for campaign in campaigns.order_by(Campaign.id):
+        amount, count, donors = totals.get(campaign.name, (0, 0, 0))
+        yield {
+            'id': campaign.id,
+            'name': campaign.name,
+            'start_date': campaign.start_date,
+            'end_date': campaign.end_date,
+            'goal_amount': campaign.goal_amount,
+            'raised_amount': Decimal(amount or 0).quantize(Decimal('0.01')),
+            'donation_count': count,
+            'donor_count': donors
+        }
+
+# dataset name -> (columns, row generator)
+DATASETS = {
+    'donations': (DONATION_COLUMNS, donation_rows),
+    'donors': (DONOR_COLUMNS, donor_rows),
+    'campaigns': (CAMPAIGN_COLUMNS, campaign_rows),
+}
+
+def stream_csv(columns, rows):
+    """Encode rows as CSV, yielding a chunk every FLUSH_EVERY rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for i, row in enumerate(rows, 1):
+        writer.writerow([_serialize(row[column]) for column in columns])
+        if i % FLUSH_EVERY == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+def stream_jsonl(columns, rows):
+    """Encode rows as newline-delimited JSON, yielding a chunk every FLUSH_EVERY rows"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({column: _serialize(row[column]) for column in columns}))
+        if len(lines) >= FLUSH_EVERY:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+# format name -> (encoder, mimetype, file extension)
+FORMATS = {
+    'csv': (stream_csv, 'text/csv', 'csv'),
+    'jsonl': (stream_jsonl, 'application/x-ndjson', 'jsonl'),
+}
+
+def export_stream(dataset, export_format, params):
+    """Return (chunk generator, mimetype, extension) for an export.
+
+    Raises ValueError for an unknown dataset or format. Nothing is fetched
+    until the generator is iterated, so the response can start immediately.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}'. Use one of: {', '.join(DATASETS)}")
+    if export_format not in FORMATS:
+        raise ValueError(f"Unknown format '{export_format}'. Use one of: {', '.join(FORMATS)}")
+
+    # Validate filters up front so bad input is a 400, not a broken download
+    build_donation_filters(params)
+
+    columns, rows = DATASETS[dataset]
+    encoder, mimetype, extension = FORMATS[export_format]
+    return encoder(columns, rows(params)), mimetype, extension
@@ -0,0 +1,50 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Concurrent network calls per collection run
+COLLECTOR_WORKERS = int(os.environ.get('COLLECTOR_WORKERS', 4))
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads sharing it"""
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next_slot = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until this caller's slot comes up"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+# Requests per second allowed against each API, shared by every collection
+# run in the process. Twitter's standard search allows 180 calls per 15 minutes.
+RATE_LIMITS = {
+    'twitter': RateLimiter(0.2),
+    'reddit': RateLimiter(1),
+    'news': RateLimiter(2)
+}
+
+def fetch_all(tasks, fetch, max_workers=COLLECTOR_WORKERS):
+    """Run fetch(task) for every task on a bounded thread pool.
+
+    Yields (task, result, error) as each call finishes so the caller can
+    analyze and store results while other requests are still in flight.
+    Exactly one of result and error is None.
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as executor:
+        futures = {executor.submit(fetch, task): task for task in tasks}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
@@ -0,0 +1,156 @@
+import hashlib
+import random
+import re
+from collections import namedtuple
+from models import db, ContentFingerprint, SentimentRecord
+
+URL_PATTERN = re.compile(r'https?://\S+|www\.\S+')
+RETWEET_PREFIX = re.compile(r'^\s*rt\s+@\w+:?')
+WORD_PATTERN = re.compile(r'\w+')
+
+# MinHash over the set of words: NUM_HASHES minimums, banded for lookup.
+# With BANDS bands of ROWS hashes, pairs above ~0.65 Jaccard similarity
+# almost always share a band and are then compared on the full signature.
+NUM_HASHES = 24
+BANDS = 6
+ROWS = NUM_HASHES // BANDS
+MERSENNE_PRIME = (1 << 31) - 1
+MIN_SIMILARITY = 0.75
+# Fewer distinct words than this give unreliable estimates; such texts only match exactly
+MIN_SIGNATURE_WORDS = 6
+# Stay under SQLite's bound-parameter limit in IN lookups
+LOOKUP_BATCH = 500
+INDEX_CHUNK_SIZE = 1000
+
+_random = random.Random(20240501)  # Fixed seed: signatures must stay comparable across runs
+PERMUTATIONS = [(_random.randrange(1, MERSENNE_PRIME), _random.randrange(MERSENNE_PRIME)) for _ in range(NUM_HASHES)]
+
+class Fingerprint(namedtuple('Fingerprint', ['content_hash', 'signature'])):
+    """Exact hash of the normalized text plus an optional MinHash signature"""
+
+    @property
+    def bands(self):
+        """One 31-bit value per band, so each fits a signed INTEGER column"""
+        return [int.from_bytes(hashlib.blake2b(
+            ','.join(map(str, self.signature[band * ROWS:(band + 1) * ROWS])).encode('ascii'), digest_size=4
+        ).digest(), 'big') >> 1 for band in range(BANDS)]
+
+    def to_row(self):
+        row = {'content_hash': self.content_hash, 'signature': None}
+        row.update({f'band_{band}': None for band in range(BANDS)})
+        if self.signature is not None:
+            row['signature'] = ''.join(f'{value:08x}' for value in self.signature)
+            row.update({f'band_{band}': value for band, value in enumerate(self.bands)})
+        return row
+
+def parse_signature(text):
+    return tuple(int(text[i:i + 8], 16) for i in range(0, len(text), 8)) if text else None
+
+def normalize_words(text):
+    """Lowercased words with URLs and retweet prefixes removed"""
+    text = RETWEET_PREFIX.sub(' ', URL_PATTERN.sub(' ', (text or '').lower()))
+    return WORD_PATTERN.findall(text)
+
+def minhash(words):
+    """MinHash signature of a set of words; None when there are too few to compare"""
+    words = set(words)
+    if len(words) < MIN_SIGNATURE_WORDS:
+        return None
+
+    hashes = [int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=4).digest(), 'big') for word in words]
+    return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS)
+
+def fingerprint(text):
+    words = normalize_words(text)
+    content_hash = hashlib.blake2b(' '.join(words).encode('utf-8'), digest_size=16).hexdigest()
+    return Fingerprint(content_hash, minhash(words))
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the word sets behind two signatures"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_HASHES
+
+class FingerprintIndex:
+    """In-memory exact and banded MinHash lookup mapping fingerprints to keys"""
+    def __init__(self):
+        self._exact = {}
+        self._bands = [{} for _ in range(BANDS)]
+
+    def add(self, fp, key):
+        self._exact.setdefault(fp.content_hash, key)
+        if fp.signature is not None:
+            for band, value in enumerate(fp.bands):
+                self._bands[band].setdefault(value, []).append((fp.signature, key))
+
+    def match(self, fp):
+        """Key of an identical or the most similar near-duplicate fingerprint, or None"""
+        key = self._exact.get(fp.content_hash)
+        if key is not None or fp.signature is None:
+            return key
+
+        best = None
+        for band, value in enumerate(fp.bands):
+            for other, other_key in self._bands[band].get(value, ()):
+                score = similarity(fp.signature, other)
+                if score >= MIN_SIMILARITY and (best is None or score > best[0]):
+                    best = (score, other_key)
+        return best[1] if best else None
+
+def _batches(values):
+    values = sorted(values)
+    for i in range(0, len(values), LOOKUP_BATCH):
+        yield values[i:i + LOOKUP_BATCH]
+
+def load_index(fingerprints):
+    """FingerprintIndex of stored canonical records that could match any of `fingerprints`.
+
+    One IN query per batch of exact hashes and one per band; candidates are
+    then compared on their full signatures in memory. Entries whose record
+    no longer exists are left out.
+    """
+    index = FingerprintIndex()
+    columns = (ContentFingerprint.record_id, ContentFingerprint.content_hash, ContentFingerprint.signature)
+    indexed = db.session.query(*columns).join(SentimentRecord, SentimentRecord.id == ContentFingerprint.record_id)
+    rows = []
+    for batch in _batches({fp.content_hash for fp in fingerprints}):
+        rows.extend(indexed.filter(ContentFingerprint.content_hash.in_(batch)))
+
+    band_values = [set() for _ in range(BANDS)]
+    for fp in fingerprints:
+        if fp.signature is not None:
+            for band, value in enumerate(fp.bands):
+                band_values[band].add(value)
+    for band, values in enumerate(band_values):
+        column = getattr(ContentFingerprint, f'band_{band}')
+        for batch in _batches(values):
+            rows.extend(indexed.filter(column.in_(batch)))
+
+    # Lowest id first, so the oldest record stays canonical
+    for record_id, content_hash, signature in sorted(set(rows)):
+        index.add(Fingerprint(content_hash, parse_signature(signature)), record_id)
+    return index
+
+def index_record(record, fp):
+    """Add a canonical record's fingerprint to the persistent index (in the caller's transaction)"""
+    db.session.add(ContentFingerprint(record=record, **fp.to_row()))
+
+def index_unfingerprinted(chunk_size=INDEX_CHUNK_SIZE):
+    """Backfill the index for canonical records stored before fingerprinting; returns the count.
+
+    Existing records are indexed as they are, not linked to each other.
+    """
+    indexed = 0
+    while True:
+        rows = db.session.query(SentimentRecord.id, SentimentRecord.content_text).outerjoin(
+            ContentFingerprint, ContentFingerprint.record_id == SentimentRecord.id
+        ).filter(
+            ContentFingerprint.record_id.is_(None),
+            SentimentRecord.canonical_id.is_(None)
+        ).order_by(SentimentRecord.id).limit(chunk_size).all()
+        if not rows:
+            return indexed
+
+        db.session.execute(ContentFingerprint.__table__.insert(), [
+            {'record_id': record_id, **fingerprint(content_text).to_row()} for record_id, content_text in rows
+        ])
+        db.session.commit()
+        indexed += len(rows)
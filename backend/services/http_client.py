@@ -0,0 +1,94 @@
+import json
+import os
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from services.cache import PersistentCache
+from services.fetching import COLLECTOR_WORKERS
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (5, 30)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# How long a cached response is served without asking the server again
+RESPONSE_TTL = int(os.environ.get('HTTP_CACHE_TTL', 3600))
+# Response bodies are large; keep fewer of them than the sentiment cache keeps results
+RESPONSE_CACHE_SIZE = int(os.environ.get('HTTP_CACHE_MAX_ENTRIES', 5000))
+
+# Query parameters that authenticate rather than select data; never part of a cache key
+SECRET_PARAMS = ('apiKey', 'api_key', 'key', 'token')
+
+def build_session(retries=3, backoff_factor=0.5, pool_maxsize=COLLECTOR_WORKERS):
+    """requests.Session with keep-alive connection pooling and bounded retries.
+
+    Connection errors and 429/5xx responses to GETs are retried with
+    exponential backoff, honouring Retry-After.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    # One pooled connection per fetch thread so concurrent requests reuse sockets
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def response_cache_key(url, params):
+    return json.dumps([url, sorted((k, v) for k, v in (params or {}).items() if k not in SECRET_PARAMS)])
+
+class CachedHTTPClient:
+    """GETs JSON through a pooled session, caching responses by URL and query.
+
+    A cached response younger than `ttl` is returned without a request.
+    Older entries are revalidated with If-None-Match / If-Modified-Since when
+    the server sent validators, so an unchanged resource costs a 304.
+    """
+    def __init__(self, session=None, cache=None, timeout=DEFAULT_TIMEOUT, ttl=RESPONSE_TTL):
+        self.session = session or build_session()
+        self.cache = cache or PersistentCache(os.environ.get('HTTP_CACHE_PATH') or ':memory:', 'http-v1',
+                                              maxsize=RESPONSE_CACHE_SIZE)
+        self.timeout = timeout
+        self.ttl = ttl
+        self.requests = 0
+        self.revalidated = 0
+
+    def get_json(self, url, params=None):
+        key = response_cache_key(url, params)
+        entry = self.cache.get(key)
+        if entry and time.time() - entry['fetched_at'] < self.ttl:
+            return entry['body']
+
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        self.requests += 1
+        response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 304 and entry:
+            self.revalidated += 1
+            self.cache.set(key, {**entry, 'fetched_at': time.time()})
+            return entry['body']
+
+        body = response.json()
+        if response.ok:
+            self.cache.set(key, {
+                'body': body,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': time.time()
+            })
+        return body
+
+    def stats(self):
+        return {**self.cache.stats(), 'requests': self.requests, 'revalidated': self.revalidated}
@@ -0,0 +1,103 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse a page size query parameter, clamped to [1, maximum]"""
+    try:
+        limit = int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+
+    return max(1, min(limit, maximum))
+
+def parse_page(value):
+    """Parse a 1-based page number query parameter"""
+    try:
+        page = int(value) if value not in (None, '') else 1
+    except (TypeError, ValueError):
+        raise ValueError('page must be an integer')
+
+    return max(1, page)
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'n': str(value)}
+    return value
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+        if 'n' in value:
+            return Decimal(value['n'])
+        raise ValueError('Unknown cursor value')
+    return value
+
+def encode_cursor(values):
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor, size):
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+
+    return [_decode_value(v) for v in values]
+
+def escape_like(term):
+    """Escape LIKE wildcards so user input is matched literally"""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def keyset_page(query, columns, cursor=None, limit=DEFAULT_PAGE_SIZE, descending=False, page=None,
+                row_key=None):
+    """Fetch one page of a query ordered by `columns`.
+
+    `columns` must end with a unique column (usually the primary key) so the
+    ordering is total. When a cursor is given the page starts right after the
+    row it encodes, which keeps deep pages as cheap as the first one. Without
+    a cursor, `page` falls back to offset paging for clients that jump to
+    arbitrary page numbers. `row_key` reads the cursor values off a row when
+    some columns are not attributes of it, e.g. columns of a joined table.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        key = tuple_(*columns)
+        values = tuple_(*decode_cursor(cursor, len(columns)))
+        query = query.filter(key < values if descending else key > values)
+
+    order = [c.desc() for c in columns] if descending else list(columns)
+    query = query.order_by(*order)
+
+    if not cursor and page and page > 1:
+        query = query.offset((page - 1) * limit)
+
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        values = row_key(last) if row_key else [getattr(last, c.key) for c in columns]
+        next_cursor = encode_cursor(list(values))
+
+    return rows, next_cursor
@@ -0,0 +1,228 @@
+import os
+import time
+from datetime import datetime
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
+from models import db, SentimentRecord
+from services.sentiment_analyzer import batch_analyze
+from services.sentiment_identity import attach_topics
+from services.fingerprint import FingerprintIndex, fingerprint, index_record, load_index
+from services.sentiment_rollups import record_sentiment
+
+# Records analyzed and committed per transaction
+WRITE_CHUNK_SIZE = int(os.environ.get('COLLECTOR_CHUNK_SIZE', 500))
+MAX_RETRIES = 3
+RETRY_DELAY = 0.5
+MIN_CONTENT_LENGTH = 5
+SAMPLE_SIZE = 10
+# Stay under SQLite's bound-parameter limit in IN lookups
+URL_LOOKUP_BATCH = 500
+# PostgreSQL serialization failure and deadlock
+TRANSIENT_SQLSTATES = {'40001', '40P01'}
+# SQLITE_BUSY and SQLITE_LOCKED, which sqlite3 only reports in the message
+TRANSIENT_SQLITE_MESSAGES = ('database is locked', 'database table is locked')
+
+class StoredCanonical(int):
+    """Id of an already stored record a post duplicates (told apart from in-chunk indexes)"""
+
+def _copied(score, magnitude, label):
+    """Analysis for a duplicate: the canonical record's sentiment, without its topics"""
+    return {'sentiment_score': score, 'sentiment_magnitude': magnitude, 'sentiment_label': label, 'topics': []}
+
+def is_transient(error):
+    """Whether a database error is worth retrying: lost connections, locks, deadlocks, serialization failures.
+
+    Other OperationalErrors, such as a missing table or column, fail the
+    same way on every attempt and are raised at once.
+    """
+    if not isinstance(error, DBAPIError):
+        return False
+    if error.connection_invalidated:
+        return True
+    # psycopg2 exposes the SQLSTATE as pgcode, psycopg 3 as sqlstate
+    sqlstate = getattr(error.orig, 'pgcode', None) or getattr(error.orig, 'sqlstate', None)
+    if sqlstate in TRANSIENT_SQLSTATES:
+        return True
+    return isinstance(error, OperationalError) and str(error.orig).startswith(TRANSIENT_SQLITE_MESSAGES)
+
+class RecordWriter:
+    """Buffers collected posts for one source and writes them in chunked transactions.
+
+    Each flush analyzes the buffered texts with batch_analyze, inserts the
+    records, links their topics, adds them to the daily summaries and
+    commits once. A transient database error
+    rolls the chunk back and retries it with exponential backoff; the
+    analysis is not repeated. Posts whose content_url is already stored, or
+    was already queued in this run, are dropped before analysis. Posts whose
+    text duplicates or nearly duplicates a stored record or an earlier post
+    in the chunk are stored linked to it with its sentiment instead of being
+    analyzed. Use as a context manager, or call flush() when collection ends.
+    """
+    def __init__(self, source, chunk_size=WRITE_CHUNK_SIZE, max_retries=MAX_RETRIES, retry_delay=RETRY_DELAY):
+        self.source_id = source.id if hasattr(source, 'id') else source
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.written = 0
+        self.failed = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.linked = 0
+        self.sample = []
+        self._pending = []
+        self._seen_urls = set()
+
+    @property
+    def pending(self):
+        """Posts queued and not yet flushed"""
+        return len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def add(self, content_text, content_url=None, published_date=None):
+        """Queue a post; returns False if it is too short to analyze or a repeat in this run"""
+        if not content_text or len(content_text) < MIN_CONTENT_LENGTH:
+            self.skipped += 1
+            return False
+        if content_url:
+            if content_url in self._seen_urls:
+                self.duplicates += 1
+                return False
+            self._seen_urls.add(content_url)
+
+        self._pending.append((content_text, content_url, published_date))
+        if len(self._pending) >= self.chunk_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Analyze and commit everything buffered; returns the number of records written"""
+        pending, self._pending = self._pending, []
+        analyzed = {}  # text -> analysis, so retries never analyze twice
+        analyzed_date = datetime.utcnow()
+        rechecked = False
+
+        attempt = 0
+        while True:
+            pending = self._drop_stored(pending)
+            if not pending:
+                return 0
+            try:
+                plan = self._plan(pending, analyzed)
+                records = self._write(pending, plan, analyzed_date)
+                break
+            except IntegrityError:
+                db.session.rollback()
+                if rechecked:
+                    self.failed += len(pending)
+                    raise
+                # Another run stored some of these URLs since the check; drop them and try again
+                rechecked = True
+            except (OperationalError, DBAPIError) as e:
+                db.session.rollback()
+                if attempt == self.max_retries or not is_transient(e):
+                    self.failed += len(pending)
+                    raise
+                time.sleep(self.retry_delay * 2 ** attempt)
+                attempt += 1
+
+        self.written += len(records)
+        self.linked += sum(1 for _, canonical, _ in plan if canonical is not None)
+        if len(self.sample) < SAMPLE_SIZE:
+            self.sample.extend(record.to_dict() for record in records[:SAMPLE_SIZE - len(self.sample)])
+        return len(records)
+
+    def _drop_stored(self, pending):
+        """Remove queued posts whose content_url is already in the database"""
+        urls = [content_url for _, content_url, _ in pending if content_url]
+        stored = set()
+        for i in range(0, len(urls), URL_LOOKUP_BATCH):
+            stored.update(url for (url,) in db.session.query(SentimentRecord.content_url).filter(
+                SentimentRecord.content_url.in_(urls[i:i + URL_LOOKUP_BATCH])))
+        if not stored:
+            return pending
+
+        self.duplicates += sum(1 for _, content_url, _ in pending if content_url in stored)
+        return [item for item in pending if item[1] not in stored]
+
+    def _plan(self, pending, analyzed):
+        """Fingerprint each post and decide where its sentiment comes from.
+
+        Returns (fingerprint, canonical, analysis) per post, where canonical is
+        a stored record id, the index of an earlier post in this chunk, or
+        None for a post that is analyzed and indexed itself.
+        """
+        fingerprints = [fingerprint(content_text) for content_text, _, _ in pending]
+        stored = load_index(fingerprints)
+        matches = [stored.match(fp) for fp in fingerprints]
+
+        stored_ids = sorted({record_id for record_id in matches if record_id is not None})
+        stored_sentiment = {}
+        for i in range(0, len(stored_ids), URL_LOOKUP_BATCH):
+            rows = db.session.query(
+                SentimentRecord.id, SentimentRecord.sentiment_score,
+                SentimentRecord.sentiment_magnitude, SentimentRecord.sentiment_label
+            ).filter(SentimentRecord.id.in_(stored_ids[i:i + URL_LOOKUP_BATCH]))
+            stored_sentiment.update((record_id, _copied(*sentiment)) for record_id, *sentiment in rows)
+
+        chunk = FingerprintIndex()
+        canonicals = []
+        for i, (fp, record_id) in enumerate(zip(fingerprints, matches)):
+            # A record deleted since the index lookup is no canonical; the post is then analyzed and indexed
+            if record_id in stored_sentiment:
+                canonicals.append(StoredCanonical(record_id))
+                continue
+            canonical = chunk.match(fp)
+            if canonical is None:
+                chunk.add(fp, i)
+            canonicals.append(canonical)
+
+        texts = [pending[i][0] for i, canonical in enumerate(canonicals)
+                 if canonical is None and pending[i][0] not in analyzed]
+        if texts:
+            analyzed.update(zip(texts, batch_analyze(texts)))
+
+        plan = []
+        for (content_text, _, _), fp, canonical in zip(pending, fingerprints, canonicals):
+            if canonical is None:
+                analysis = analyzed[content_text]
+            elif isinstance(canonical, StoredCanonical):
+                analysis = stored_sentiment[canonical]
+            else:
+                source = analyzed[pending[canonical][0]]
+                analysis = _copied(source['sentiment_score'], source['sentiment_magnitude'], source['sentiment_label'])
+            plan.append((fp, canonical, analysis))
+        return plan
+
+    def _write(self, pending, plan, analyzed_date):
+        records = []
+        for (content_text, content_url, published_date), (fp, canonical, analysis) in zip(pending, plan):
+            record = SentimentRecord(
+                source_id=self.source_id,
+                content_text=content_text,
+                content_url=content_url,
+                sentiment_score=analysis['sentiment_score'],
+                sentiment_magnitude=analysis['sentiment_magnitude'],
+                sentiment_label=analysis['sentiment_label'],
+                published_date=published_date or analyzed_date,
+                analyzed_date=analyzed_date
+            )
+            db.session.add(record)
+            if canonical is None:
+                index_record(record, fp)
+            elif isinstance(canonical, StoredCanonical):
+                record.canonical_id = canonical
+            else:
+                record.canonical = records[canonical]
+            records.append(record)
+
+        # Only canonical records carry topics and count in the daily summaries
+        canonical = [(record, analysis['topics']) for record, (_, link, analysis) in zip(records, plan) if link is None]
+        attach_topics(canonical)
+        record_sentiment(canonical)
+        db.session.commit()
+        return records
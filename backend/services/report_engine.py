@@ -0,0 +1,301 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import case, distinct, func
+from sqlalchemy.orm import contains_eager
+from models import db, Donor, Donation, Campaign, DailyDonationSummary
+from services.cache import report_cache
+from services.donation_analytics import amount_distribution, donation_frame, lapsed_donors
+from services.donation_queries import build_donation_filters
+from services.donor_cohorts import donor_cohorts, fiscal_year_of, fiscal_year_start_month
+from services.exports import campaign_rows
+
+# Trend granularities offered by the reports screen
+PERIODS = ('daily', 'weekly', 'monthly', 'quarterly', 'yearly')
+
+DEFAULT_REPORT = 'overview'
+DEFAULT_RANGE_DAYS = 365
+TOP_DONOR_LIMIT = 10
+REPORT_DONATION_LIMIT = 500
+
+REPORTS = {}
+
+def register_report(name):
+    """Register a report builder under `name`.
+
+    Builders take the normalized parameters and return a JSON-ready dict.
+    They should push their work into SQL aggregates, or into the columnar
+    path in services.donation_analytics when SQL cannot express it well;
+    results are cached.
+    """
+    def decorator(builder):
+        REPORTS[name] = builder
+        return builder
+    return decorator
+
+def normalize_report_params(params):
+    """Validate report parameters and reduce them to a canonical, hashable form"""
+    try:
+        end_date = date.fromisoformat(params['end_date'][:10]) if params.get('end_date') else datetime.utcnow().date()
+        start_date = (date.fromisoformat(params['start_date'][:10]) if params.get('start_date')
+                      else end_date - timedelta(days=DEFAULT_RANGE_DAYS - 1))
+    except ValueError:
+        raise ValueError('Invalid date format. Use ISO format (YYYY-MM-DD)')
+    if start_date > end_date:
+        raise ValueError('start_date must not be after end_date')
+
+    period = params.get('period', 'monthly')
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}'. Use one of: {', '.join(PERIODS)}")
+
+    normalized = {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'campaign_id': params.get('campaign_id'),
+        'donor_type': params.get('donor_type'),
+        'period': period
+    }
+    normalized = {k: v for k, v in normalized.items() if v not in (None, '')}
+
+    # Surface bad filter values (e.g. a non-numeric campaign id) as ValueError now
+    build_donation_filters(normalized)
+    return normalized
+
+def _donation_query(params, *columns):
+    """Aggregate query over donations matching the report filters"""
+    clauses, needs_donor = build_donation_filters(params)
+    query = db.session.query(*columns).select_from(Donation)
+    if needs_donor:
+        query = query.join(Donation.donor)
+    return query.filter(*clauses)
+
+def _as_date(value):
+    # SQLite returns DATE() results as text
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+def _period_label(day, period):
+    if period == 'daily':
+        return day.isoformat()
+    if period == 'weekly':
+        return (day - timedelta(days=day.weekday())).isoformat()
+    if period == 'monthly':
+        return day.strftime('%Y-%m')
+    if period == 'quarterly':
+        return f'{day.year}-Q{(day.month - 1) // 3 + 1}'
+    return str(day.year)
+
+def daily_totals(params):
+    """[(day, amount, count)] for the report range, one row per day.
+
+    Reads the daily rollup unless a donor filter is present, in which case it
+    groups raw donations by day in SQL.
+    """
+    first_day = date.fromisoformat(params['start_date'])
+    last_day = date.fromisoformat(params['end_date'])
+
+    if 'donor_type' in params:
+        day = func.date(Donation.donation_date)
+        rows = _donation_query(params, day, func.sum(Donation.amount), func.count(Donation.id)).group_by(day)
+    else:
+        rows = db.session.query(
+            DailyDonationSummary.date,
+            func.sum(DailyDonationSummary.total_amount),
+            func.sum(DailyDonationSummary.donation_count)
+        ).filter(
+            DailyDonationSummary.date >= first_day,
+            DailyDonationSummary.date <= last_day
+        )
+        if 'campaign_id' in params:
+            campaign = db.session.query(Campaign.name).filter(Campaign.id == int(params['campaign_id'])).scalar()
+            if campaign is None:
+                # Like the raw-donation filter, an unknown campaign matches nothing;
+                # '' in the rollup stands for donations without a campaign
+                return []
+            rows = rows.filter(DailyDonationSummary.campaign == campaign)
+        rows = rows.group_by(DailyDonationSummary.date)
+
+    return sorted(
+        (_as_date(day), float(amount or 0), int(count or 0))
+        for day, amount, count in rows.all() if count
+    )
+
+@register_report('donation_summary')
+def donation_summary(params):
+    """Totals, trend series, top donors and donor mix for the range"""
+    daily = daily_totals(params)
+    total_amount = sum(amount for _, amount, _ in daily)
+    total_count = sum(count for _, _, count in daily)
+
+    trends = {}
+    for day, amount, count in daily:
+        label = _period_label(day, params['period'])
+        bucket = trends.setdefault(label, {'period': label, 'amount': 0, 'count': 0})
+        bucket['amount'] += amount
+        bucket['count'] += count
+
+    total = func.sum(Donation.amount)
+    clauses, _ = build_donation_filters(params)
+    top_donors = db.session.query(
+        Donor.id, Donor.first_name, Donor.last_name, Donor.donor_type, total, func.count(Donation.id)
+    ).join(Donation, Donation.donor_id == Donor.id).filter(*clauses).group_by(
+        Donor.id, Donor.first_name, Donor.last_name, Donor.donor_type
+    ).order_by(total.desc()).limit(TOP_DONOR_LIMIT).all()
+
+    distribution = db.session.query(
+        func.coalesce(Donor.donor_type, 'unknown'), func.count(distinct(Donor.id))
+    ).join(Donation, Donation.donor_id == Donor.id).filter(*clauses).group_by(
+        func.coalesce(Donor.donor_type, 'unknown')
+    ).all()
+
+    return {
+        'summary': {
+            'totalDonations': total_count,
+            'totalAmount': round(total_amount, 2),
+            'averageDonation': round(total_amount / total_count, 2) if total_count else 0
+        },
+        'donationTrends': [
+            {**bucket, 'amount': round(bucket['amount'], 2)} for bucket in trends.values()
+        ],
+        'topDonors': [{
+            'id': donor_id,
+            'name': f'{first_name} {last_name}',
+            'type': donor_type,
+            'total_amount': float(amount or 0),
+            'donation_count': count
+        } for donor_id, first_name, last_name, donor_type, amount, count in top_donors],
+        'donorDistribution': [{'type': name, 'count': count} for name, count in distribution]
+    }
+
+@register_report('donor_retention')
+def donor_retention(params):
+    """New, retained, lapsed and recurring donors compared with the preceding period of equal length"""
+    start = datetime.fromisoformat(params['start_date'])
+    end = datetime.fromisoformat(params['end_date']) + timedelta(days=1)
+    prior_start = start - (end - start)
+
+    prior = {**params, 'start_date': prior_start.date().isoformat(),
+             'end_date': (start - timedelta(days=1)).date().isoformat()}
+
+    current_donors = _donation_query(params, Donation.donor_id).distinct().subquery()
+    prior_donors = _donation_query(prior, Donation.donor_id).distinct().subquery()
+
+    total_donors = db.session.query(func.count()).select_from(current_donors).scalar()
+    prior_count = db.session.query(func.count()).select_from(prior_donors).scalar()
+    retained = db.session.query(func.count()).select_from(current_donors).filter(
+        current_donors.c.donor_id.in_(db.session.query(prior_donors.c.donor_id))
+    ).scalar()
+
+    # A donor is new if they never gave before the range; served by ix_donation_donor_date
+    earlier_gift = db.session.query(Donation.id).filter(
+        Donation.donor_id == current_donors.c.donor_id,
+        Donation.donation_date < start
+    ).exists()
+    new_donors = db.session.query(func.count()).select_from(current_donors).filter(~earlier_gift).scalar()
+
+    recurring = _donation_query(
+        params, func.count(distinct(case((Donation.is_recurring == True, Donation.donor_id))))
+    ).scalar()
+
+    return {
+        'donorSummary': {
+            'totalDonors': total_donors,
+            'newDonors': new_donors,
+            'recurringDonors': recurring,
+            'retainedDonors': retained,
+            'lapsedDonors': prior_count - retained,
+            'priorPeriodDonors': prior_count,
+            'retentionRate': round(retained / prior_count * 100, 1) if prior_count else None
+        }
+    }
+
+@register_report('campaign_performance')
+def campaign_performance(params):
+    """Raised amount, gift count and donors per campaign against its goal"""
+    performance = []
+    for row in campaign_rows(params):
+        goal_amount = float(row['goal_amount']) if row['goal_amount'] else None
+        raised_amount = float(row['raised_amount'])
+        performance.append({
+            **row,
+            'start_date': row['start_date'].isoformat() if row['start_date'] else None,
+            'end_date': row['end_date'].isoformat() if row['end_date'] else None,
+            'goal_amount': goal_amount,
+            'raised_amount': raised_amount,
+            'percent_of_goal': round(raised_amount / goal_amount * 100, 1) if goal_amount else None
+        })
+    return {'campaignPerformance': performance}
+
+@register_report('payment_method_mix')
+def payment_method_mix(params):
+    """Amount, count and share of the total for each payment method"""
+    method = func.coalesce(Donation.payment_method, 'Unknown')
+    rows = _donation_query(params, method, func.sum(Donation.amount), func.count(Donation.id)).group_by(method).all()
+    grand_total = sum(float(amount or 0) for _, amount, _ in rows)
+
+    return {
+        'paymentMethods': sorted([{
+            'method': name,
+            'amount': float(amount or 0),
+            'count': count,
+            'share': round(float(amount or 0) / grand_total * 100, 1) if grand_total else 0
+        } for name, amount, count in rows], key=lambda row: row['amount'], reverse=True)
+    }
+
+def _history(params):
+    """The report filters without a start date, covering every gift up to the end of the range"""
+    return {name: value for name, value in params.items() if name != 'start_date'}
+
+@register_report('gift_distribution')
+def gift_distribution(params):
+    """Percentiles and gift-size bands of the donation amounts in the range"""
+    return {'giftDistribution': amount_distribution(donation_frame(params)['amount'].to_numpy())}
+
+@register_report('lapsed_donors')
+def lapsed(params):
+    """LYBUNT and SYBUNT donors as of the fiscal year the range ends in"""
+    start_month = fiscal_year_start_month()
+    fiscal_year = fiscal_year_of(date.fromisoformat(params['end_date']), start_month)
+    return {'lapsedDonors': lapsed_donors(donation_frame(_history(params)), fiscal_year, start_month)}
+
+@register_report('donor_cohorts')
+def cohort_analysis(params):
+    """First-gift cohorts and yearly retention, recapture and lapse rates up to the range's fiscal year.
+
+    The one cohort report; lapsed_donors lists donors on the same fiscal
+    years. Covers every donation; the other report filters do not apply, so
+    one cached result serves every range ending in the same fiscal year.
+    Computed in SQL over DonorFiscalYear, one row per donor and year they
+    gave in, rather than over raw donations.
+    """
+    fiscal_year = fiscal_year_of(date.fromisoformat(params['end_date']), fiscal_year_start_month())
+    return {'donorCohorts': donor_cohorts(fiscal_year)}
+
+@register_report('overview')
+def overview(params):
+    """Everything the reports screen renders, plus the most recent donations in the range"""
+    clauses, _ = build_donation_filters(params)
+    donations = Donation.query.join(Donation.donor).options(contains_eager(Donation.donor)).filter(
+        *clauses
+    ).order_by(Donation.donation_date.desc(), Donation.id.desc()).limit(REPORT_DONATION_LIMIT).all()
+
+    return {
+        **donation_summary(params),
+        **donor_retention(params),
+        **campaign_performance(params),
+        **payment_method_mix(params),
+        'donations': [{
+            **donation.to_dict(),
+            'date': donation.donation_date.isoformat(),
+            'campaign_name': donation.campaign
+        } for donation in donations]
+    }
+
+def generate_report(name, params):
+    """Build a registered report, serving repeated requests from the report cache.
+
+    Raises ValueError for unknown reports or invalid parameters.
+    """
+    if name not in REPORTS:
+        raise ValueError(f"Unknown report '{name}'. Use one of: {', '.join(sorted(REPORTS))}")
+
+    normalized = normalize_report_params(params)
+    key = ('report', name, tuple(sorted(normalized.items())))
+    return report_cache.get_or_compute(key, lambda: REPORTS[name](normalized))
@@ -1,111 +1,219 @@
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from textblob import TextBlob
+import os
 import re
+import time
+import hashlib
+import json
+import threading
 from collections import Counter
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-
-# Download necessary NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
-    nltk.download('wordnet')
-    nltk.download('vader_lexicon')
-
-# Initialize NLTK components
-stop_words = set(stopwords.words('english'))
-lemmatizer = WordNetLemmatizer()
-sid = SentimentIntensityAnalyzer()
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from services.cache import PersistentCache
 
-def preprocess_text(text):
-    """Clean and preprocess text for analysis"""
-    if not text:
-        return ""
-        
-    # Convert to lowercase
-    text = text.lower()
+# NLTK packages the analyzer needs, and where nltk.data finds each one
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+    'vader_lexicon': 'sentiment/vader_lexicon.zip'
+}
+
+def missing_nltk_data():
+    """NLTK packages from NLTK_RESOURCES that are not installed locally"""
+    import nltk
     
-    # Remove URLs
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text)
+    missing = []
+    for package, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(package)
+    return missing
+
+def download_nltk_data():
+    """Fetch any missing NLTK packages. Needs network access; run at deploy time"""
+    import nltk
     
-    # Remove user mentions (for Twitter)
-    text = re.sub(r'@\w+', '', text)
+    missing = missing_nltk_data()
+    for package in missing:
+        nltk.download(package, quiet=True)
+    return missing
+
+class SentimentAnalyzer:
+    """NLTK and TextBlob components, loaded from local NLTK data.
     
-    # Remove hashtags but keep the text
-    text = re.sub(r'#(\w+)', r'\1', text)
+    Building one imports nltk/textblob and reads the stopword list and VADER
+    lexicon, so the module only does it on first use (see get_analyzer).
+    """
+    def __init__(self):
+        missing = missing_nltk_data()
+        if missing:
+            raise LookupError(
+                f"NLTK data not installed: {', '.join(missing)}. "
+                "Run 'flask warm-sentiment --download' or install it under NLTK_DATA."
+            )
+        
+        from nltk.corpus import stopwords
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        from nltk.stem import WordNetLemmatizer
+        from nltk.tokenize import word_tokenize
+        from textblob.en.sentiments import PatternAnalyzer
+        
+        self.stop_words = set(stopwords.words('english'))
+        self.lemmatizer = WordNetLemmatizer()
+        self.sid = SentimentIntensityAnalyzer()
+        self.pattern_analyzer = PatternAnalyzer()
+        self.word_tokenize = word_tokenize
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+def get_analyzer():
+    """The process-wide SentimentAnalyzer, created on first call"""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = SentimentAnalyzer()
+    return _analyzer
+
+def warm_up():
+    """Load every analyzer resource now instead of on the first request.
     
-    # Remove punctuation and special characters
-    text = re.sub(r'[^\w\s]', '', text)
+    Reads local NLTK data only and never downloads; raises LookupError when
+    data is missing. Call it before forking workers (e.g. with gunicorn
+    --preload) so they share the loaded data. Returns the seconds taken.
+    """
+    started = time.perf_counter()
+    analyzer = get_analyzer()
     
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    # WordNet, punkt and the pattern lexicon are themselves loaded lazily on first use
+    analyzer.lemmatizer.lemmatize('warming')
+    analyzer.word_tokenize('warm up')
+    analyzer.pattern_analyzer.analyze('warm up')
+    analyzer.sid.polarity_scores('warm up')
+    return time.perf_counter() - started
+
+# URLs, user mentions and punctuation (which takes the '#' off hashtags) in one pass
+CLEANUP_PATTERN = re.compile(r'http\S+|www\S+|@\w+|[^\w\s]')
+
+# Batches at least this large are spread over a process pool
+PARALLEL_THRESHOLD = 1000
+MIN_CHUNK_SIZE = 250
+
+# Distinct tokens whose lemma is kept in memory
+LEMMA_CACHE_SIZE = 50000
+
+# Scoring parameters. Cached results are keyed to these, so changing any of
+# them (or bumping ANALYZER_VERSION after a logic change) invalidates the cache.
+ANALYZER_VERSION = 1
+SCORING_WEIGHTS = {
+    'vader': 0.7,
+    'textblob': 0.3,
+    'neutral_band': 0.05,
+    'subjectivity': 0.5,
+    'num_topics': 5
+}
+
+EMPTY_ANALYSIS = {
+    'sentiment_score': 0,
+    'sentiment_magnitude': 0,
+    'sentiment_label': 'neutral',
+    'topics': []
+}
+
+_result_cache = None
+
+def scoring_fingerprint():
+    """Identifier for the current scoring logic and weights"""
+    config = json.dumps({'version': ANALYZER_VERSION, 'weights': SCORING_WEIGHTS}, sort_keys=True)
+    return hashlib.sha1(config.encode('utf-8')).hexdigest()
+
+def get_result_cache():
+    """Analysis results keyed by content hash.
+
+    Stored in the SQLite file named by SENTIMENT_CACHE_PATH so results survive
+    restarts; without it the cache only lasts for the process. Holds at most
+    SENTIMENT_CACHE_MAX_ENTRIES results. Reopened (and so emptied) whenever
+    the scoring fingerprint changes.
+    """
+    global _result_cache
+    fingerprint = scoring_fingerprint()
+    if _result_cache is None or _result_cache.version != fingerprint:
+        _result_cache = PersistentCache(
+            os.environ.get('SENTIMENT_CACHE_PATH') or ':memory:',
+            fingerprint,
+            maxsize=int(os.environ.get('SENTIMENT_CACHE_MAX_ENTRIES', PersistentCache.DEFAULT_MAXSIZE))
+        )
+    return _result_cache
+
+def content_key(processed_text):
+    """Cache key for preprocessed text; retweets and copies that differ only in links or mentions share it"""
+    return hashlib.blake2b(processed_text.encode('utf-8'), digest_size=16).hexdigest()
+
+def cache_stats():
+    """Hit/miss counters for the result and lemma caches"""
+    return {
+        'results': get_result_cache().stats(),
+        'lemmas': lemmatize.cache_info()._asdict()
+    }
+
+def preprocess_text(text):
+    """Clean and preprocess text for analysis"""
+    if not text:
+        return ""
     
-    return text
+    # Lowercase, strip URLs/mentions/punctuation, then collapse whitespace
+    return ' '.join(CLEANUP_PATTERN.sub('', text.lower()).split())
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def lemmatize(token):
+    """WordNet lemma for a token, memoized; feeds repeat the same vocabulary constantly"""
+    return get_analyzer().lemmatizer.lemmatize(token)
+
+def _topics_from_tokens(tokens, num_topics=5):
+    """Most frequent lemmatized non-stopword tokens"""
+    stop_words = get_analyzer().stop_words
+    filtered_tokens = [lemmatize(token) for token in tokens if token.lower() not in stop_words and len(token) > 2]
+    
+    # Get most common words as topics
+    return [word for word, freq in Counter(filtered_tokens).most_common(num_topics)]
 
 def extract_topics(text, num_topics=5):
     """Extract main topics from text"""
     if not text:
         return []
-        
-    # Tokenize
-    tokens = word_tokenize(text)
-    
-    # Remove stopwords and lemmatize
-    filtered_tokens = [lemmatizer.lemmatize(token) for token in tokens if token.lower() not in stop_words and len(token) > 2]
-    
-    # Count word frequencies
-    word_freq = Counter(filtered_tokens)
-    
-    # Get most common words as topics
-    topics = [word for word, freq in word_freq.most_common(num_topics)]
     
-    return topics
+    return _topics_from_tokens(get_analyzer().word_tokenize(text), num_topics)
 
-def analyze_text(text):
-    """Analyze text for sentiment and topics"""
-    if not text:
-        return {
-            'sentiment_score': 0,
-            'sentiment_magnitude': 0,
-            'sentiment_label': 'neutral',
-            'topics': []
-        }
-    
-    # Preprocess text
-    processed_text = preprocess_text(text)
+def _analyze_processed(processed_text):
+    """Score preprocessed text, tokenizing it once for topic extraction"""
+    analyzer = get_analyzer()
+    weights = SCORING_WEIGHTS
     
     # VADER sentiment analysis
-    vader_scores = sid.polarity_scores(processed_text)
-    compound_score = vader_scores['compound']
+    compound_score = analyzer.sid.polarity_scores(processed_text)['compound']
     
-    # TextBlob for additional analysis
-    blob = TextBlob(processed_text)
-    textblob_polarity = blob.sentiment.polarity
-    textblob_subjectivity = blob.sentiment.subjectivity
+    # TextBlob's pattern analyzer, reused rather than building a TextBlob per text
+    textblob_polarity, textblob_subjectivity = analyzer.pattern_analyzer.analyze(processed_text)
     
     # Combine scores (weighted average)
-    final_score = (compound_score * 0.7) + (textblob_polarity * 0.3)
+    final_score = (compound_score * weights['vader']) + (textblob_polarity * weights['textblob'])
     
     # Determine sentiment label
-    if final_score > 0.05:
+    if final_score > weights['neutral_band']:
         sentiment_label = 'positive'
-    elif final_score < -0.05:
+    elif final_score < -weights['neutral_band']:
         sentiment_label = 'negative'
     else:
         sentiment_label = 'neutral'
     
     # Extract topics
-    topics = extract_topics(processed_text)
+    topics = (_topics_from_tokens(analyzer.word_tokenize(processed_text), weights['num_topics'])
+              if processed_text else [])
     
     # Calculate magnitude (strength of sentiment)
     # Using TextBlob's subjectivity as a proxy for magnitude
-    magnitude = abs(final_score) + (textblob_subjectivity * 0.5)
+    magnitude = abs(final_score) + (textblob_subjectivity * weights['subjectivity'])
     
     return {
         'sentiment_score': round(final_score, 3),
@@ -114,9 +222,90 @@ def analyze_text(text):
         'topics': topics
     }
 
-def batch_analyze(texts):
-    """Analyze a batch of texts"""
-    results = []
+def analyze_text(text):
+    """Analyze text for sentiment and topics"""
+    if not text:
+        return dict(EMPTY_ANALYSIS, topics=[])
+    
+    processed_text = preprocess_text(text)
+    cache = get_result_cache()
+    key = content_key(processed_text)
+    
+    result = cache.get(key)
+    if result is None:
+        result = _analyze_processed(processed_text)
+        cache.set(key, result)
+    return result
+
+def _analyze_chunk(processed_texts):
+    """Analyze a list of preprocessed texts in one process"""
+    return [_analyze_processed(text) for text in processed_texts]
+
+def batch_analyze(texts, workers=None, return_stats=False):
+    """Analyze a batch of texts.
+    
+    Texts already in the result cache, or repeated within the batch, are
+    scored once. Small batches run in-process. Batches of PARALLEL_THRESHOLD
+    texts or more to score are split into chunks and analyzed across a process
+    pool of `workers` processes (default: one per CPU); pass workers=1 to
+    stay in-process. Results keep the input order. With return_stats=True,
+    returns (results, stats) where stats reports texts per second and cache hits.
+    """
+    texts = list(texts)
+    started = time.perf_counter()
+    
+    keys = []
+    pending = {}
     for text in texts:
-        results.append(analyze_text(text))
-    return results
+        if not text:
+            keys.append(None)
+            continue
+        processed_text = preprocess_text(text)
+        key = content_key(processed_text)
+        keys.append(key)
+        pending.setdefault(key, processed_text)
+    
+    cache = get_result_cache()
+    analyzed = cache.get_many(pending)
+    cache_hits = len(analyzed)
+    todo = [(key, processed_text) for key, processed_text in pending.items() if key not in analyzed]
+    
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(todo) // MIN_CHUNK_SIZE))
+    
+    processed_texts = [processed_text for _, processed_text in todo]
+    if workers > 1 and len(todo) >= PARALLEL_THRESHOLD:
+        # Load the analyzer before forking so workers inherit it instead of each loading it
+        get_analyzer()
+        # A few chunks per worker keeps the pool busy when texts vary in length
+        chunk_size = max(MIN_CHUNK_SIZE, -(-len(todo) // (workers * 4)))
+        chunks = [processed_texts[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            scored = [result for chunk in executor.map(_analyze_chunk, chunks) for result in chunk]
+    else:
+        workers = 1
+        scored = _analyze_chunk(processed_texts)
+    
+    fresh = [(key, result) for (key, _), result in zip(todo, scored)]
+    if fresh:
+        cache.set_many(fresh)
+    analyzed.update(fresh)
+    
+    results = [
+        dict(analyzed[key], topics=list(analyzed[key]['topics'])) if key else dict(EMPTY_ANALYSIS, topics=[])
+        for key in keys
+    ]
+    
+    if not return_stats:
+        return results
+    
+    elapsed = time.perf_counter() - started
+    return results, {
+        'texts': len(texts),
+        'analyzed': len(todo),
+        'cache_hits': cache_hits,
+        'workers': workers,
+        'elapsed_seconds': round(elapsed, 3),
+        'texts_per_second': round(len(texts) / elapsed) if elapsed > 0 else None
+    }
@@ -0,0 +1,113 @@
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, SentimentSource, Topic, record_topics
+from services.cache import TTLCache
+from services.donation_rollups import dialect_insert
+
+# Ids never change once committed, so the long TTL only bounds how long a
+# deleted row could linger
+IDENTITY_TTL = 24 * 3600
+
+def identity_caches():
+    """(topic name -> id, (source name, type) -> id) caches for the current app's database.
+
+    Kept in app.extensions so each app, and so each database, has its own.
+    """
+    caches = current_app.extensions.get('sentiment_identity')
+    if caches is None:
+        caches = current_app.extensions.setdefault('sentiment_identity', (
+            TTLCache(maxsize=50000, ttl=IDENTITY_TTL),
+            TTLCache(maxsize=256, ttl=IDENTITY_TTL)
+        ))
+    return caches
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_uncommitted_ids(session):
+    # Ids learned inside a transaction that rolled back may not exist; start over
+    if has_app_context():
+        clear_identity_caches()
+
+def clear_identity_caches():
+    """Forget the current app's cached topic and source ids"""
+    for cache in identity_caches():
+        cache.clear()
+
+def resolve_topics(names):
+    """Map topic names to ids, creating missing topics.
+
+    Names not in the identity cache are fetched with one IN query; any still
+    missing are inserted with one INSERT ... ON CONFLICT DO NOTHING and read
+    back with one more IN query. Runs in the caller's transaction.
+    """
+    names = {name for name in names if name}
+    topic_ids, _ = identity_caches()
+    resolved = {}
+    missing = set()
+    for name in names:
+        topic_id = topic_ids.get(name)
+        if topic_id is None:
+            missing.add(name)
+        else:
+            resolved[name] = topic_id
+    if not missing:
+        return resolved
+
+    found = dict(db.session.query(Topic.name, Topic.id).filter(Topic.name.in_(missing)))
+    new_names = missing - found.keys()
+    if new_names:
+        # DO NOTHING lets concurrent collectors create the same topic without failing
+        stmt = dialect_insert(Topic.__table__).on_conflict_do_nothing(index_elements=['name'])
+        db.session.execute(stmt, [{'name': name} for name in sorted(new_names)])
+        found.update(db.session.query(Topic.name, Topic.id).filter(Topic.name.in_(new_names)))
+
+    for name, topic_id in found.items():
+        topic_ids.set(name, topic_id)
+    resolved.update(found)
+    return resolved
+
+def resolve_source_id(name, source_type, description=None):
+    """Id of the source with this name and type, creating it if needed"""
+    key = (name, source_type)
+    _, source_ids = identity_caches()
+    source_id = source_ids.get(key)
+    if source_id is not None:
+        return source_id
+
+    lookup = db.session.query(SentimentSource.id).filter_by(name=name, type=source_type)
+    source_id = lookup.scalar()
+    if source_id is None:
+        stmt = dialect_insert(SentimentSource.__table__).on_conflict_do_nothing(index_elements=['name', 'type'])
+        db.session.execute(stmt, [{
+            'name': name,
+            'type': source_type,
+            'description': description or f"{source_type.capitalize()} source for {name}"
+        }])
+        source_id = lookup.scalar()
+
+    source_ids.set(key, source_id)
+    return source_id
+
+def attach_topics(records_with_topics):
+    """Link records to their topic names with one resolve and one executemany insert.
+
+    Takes (record, [topic names]) pairs; records are flushed first so they
+    have ids. Runs in the caller's transaction.
+    """
+    records_with_topics = [(record, names) for record, names in records_with_topics if names]
+    if not records_with_topics:
+        return
+
+    db.session.flush()
+    topic_map = resolve_topics(name for _, names in records_with_topics for name in names)
+    links = {
+        (record.id, topic_map[name])
+        for record, names in records_with_topics
+        for name in names if name in topic_map
+    }
+    db.session.execute(record_topics.insert(), [
+        {'record_id': record_id, 'topic_id': topic_id} for record_id, topic_id in sorted(links)
+    ])
+    for record, _ in records_with_topics:
+        # The association rows were written directly; reload the collection on next access
+        db.session.expire(record, ['topics'])
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, selectinload
+from models import db, DailySentimentSummary, DailyTopicCount, SentimentRecord, SentimentSource, Topic, record_topics
+from services.sentiment_rollups import LABELS, TOTAL_FIELDS, record_aggregates
+
+DEFAULT_DAYS = 7
+MAX_DAYS = 3650
+BUCKETS = ('hour', 'day')
+# Hourly buckets are grouped from raw records, so their ranges stay short
+MAX_HOURLY_DAYS = 31
+DEFAULT_RECORD_LIMIT = 100
+MAX_RECORD_LIMIT = 500
+DEFAULT_TOPIC_LIMIT = 100
+
+def parse_days(value, default=DEFAULT_DAYS):
+    """Parse a `days` window query parameter, clamped to [1, MAX_DAYS]"""
+    try:
+        days = int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        raise ValueError('days must be an integer')
+
+    return max(1, min(days, MAX_DAYS))
+
+def parse_bucket(value, days):
+    """Validate a `bucket` query parameter for a window of `days`"""
+    bucket = value or 'day'
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(BUCKETS)}")
+    if bucket == 'hour' and days > MAX_HOURLY_DAYS:
+        raise ValueError(f'hourly buckets are limited to {MAX_HOURLY_DAYS} days')
+    return bucket
+
+def window_start(days):
+    """Midnight starting a window of `days` whole days that ends today"""
+    return datetime.combine(datetime.utcnow().date() - timedelta(days=days - 1), datetime.min.time())
+
+def bucket_key(column, bucket):
+    """SQL expression giving each timestamp's bucket start as ISO text"""
+    if db.engine.dialect.name == 'postgresql':
+        return func.to_char(column, 'YYYY-MM-DD"T"HH24:00:00' if bucket == 'hour' else 'YYYY-MM-DD')
+    return func.strftime('%Y-%m-%dT%H:00:00' if bucket == 'hour' else '%Y-%m-%d', column)
+
+def _bucket(key, totals):
+    totals = dict(zip(TOTAL_FIELDS, totals))
+    count = int(totals['record_count'] or 0)
+    return {
+        'bucket': key,
+        'record_count': count,
+        'average_sentiment': float(totals['score_sum'] or 0) / count if count else 0,
+        **{f'{label}_count': int(totals[f'{label}_count'] or 0) for label in LABELS}
+    }
+
+def source_series(source_id, days, bucket):
+    """Sentiment per bucket for one source, grouped over ix_sentiment_record_source_analyzed.
+
+    Near-duplicates linked to a canonical record are left out, as in the
+    topic series and the daily summaries, so the charts agree.
+    """
+    key = bucket_key(SentimentRecord.analyzed_date, bucket).label('bucket')
+    rows = db.session.query(key, *record_aggregates()).filter(
+        SentimentRecord.source_id == source_id,
+        SentimentRecord.analyzed_date >= window_start(days),
+        SentimentRecord.canonical_id.is_(None)
+    ).group_by(key).order_by(key)
+    return [_bucket(row[0], row[1:]) for row in rows]
+
+def topic_series(topic_id, days, bucket):
+    """Sentiment per bucket for one topic.
+
+    Daily buckets are read from the per-topic daily rollup, so a year of
+    history is at most 365 rows; hourly buckets join record_topics through
+    its topic index for short windows.
+    """
+    if bucket == 'day':
+        rows = db.session.query(
+            DailyTopicCount.date, *(getattr(DailyTopicCount, field) for field in TOTAL_FIELDS)
+        ).filter(
+            DailyTopicCount.topic_id == topic_id,
+            DailyTopicCount.date >= window_start(days).date()
+        ).order_by(DailyTopicCount.date)
+        return [_bucket(row[0].isoformat(), row[1:]) for row in rows]
+
+    key = bucket_key(SentimentRecord.analyzed_date, bucket).label('bucket')
+    rows = db.session.query(key, *record_aggregates()).join(
+        record_topics, record_topics.c.record_id == SentimentRecord.id
+    ).filter(
+        record_topics.c.topic_id == topic_id,
+        SentimentRecord.analyzed_date >= window_start(days)
+    ).group_by(key).order_by(key)
+    return [_bucket(row[0], row[1:]) for row in rows]
+
+def _recent(query, limit):
+    # Topics and source names are loaded in two extra queries, not one per record
+    return query.options(selectinload(SentimentRecord.topics), joinedload(SentimentRecord.source)).order_by(
+        SentimentRecord.analyzed_date.desc(), SentimentRecord.id.desc()
+    ).limit(limit).all()
+
+def source_records(source_id, days, limit=DEFAULT_RECORD_LIMIT):
+    """Newest canonical records from one source in the window"""
+    return _recent(SentimentRecord.query.filter(
+        SentimentRecord.source_id == source_id,
+        SentimentRecord.analyzed_date >= window_start(days),
+        SentimentRecord.canonical_id.is_(None)
+    ), limit)
+
+def topic_records(topic_id, days, limit=DEFAULT_RECORD_LIMIT):
+    """Newest records mentioning one topic in the window"""
+    return _recent(SentimentRecord.query.join(
+        record_topics, record_topics.c.record_id == SentimentRecord.id
+    ).filter(
+        record_topics.c.topic_id == topic_id,
+        SentimentRecord.analyzed_date >= window_start(days)
+    ), limit)
+
+def latest_summaries(days):
+    """Daily sentiment summaries for the window, oldest first"""
+    return DailySentimentSummary.query.filter(
+        DailySentimentSummary.date >= window_start(days).date()
+    ).order_by(DailySentimentSummary.date).all()
+
+def active_topics(days, limit=DEFAULT_TOPIC_LIMIT):
+    """Topics mentioned in the window, most mentioned first, from the daily rollup"""
+    mentions = func.sum(DailyTopicCount.record_count).label('record_count')
+    rows = db.session.query(Topic.id, Topic.name, mentions).join(
+        DailyTopicCount, DailyTopicCount.topic_id == Topic.id
+    ).filter(
+        DailyTopicCount.date >= window_start(days).date()
+    ).group_by(Topic.id, Topic.name).order_by(mentions.desc(), Topic.name).limit(limit)
+    return [{'id': topic_id, 'name': name, 'record_count': int(count)} for topic_id, name, count in rows]
+
+def all_sources():
+    return SentimentSource.query.order_by(SentimentSource.name).all()
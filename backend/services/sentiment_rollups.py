@@ -0,0 +1,178 @@
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import and_, case, func, literal, or_, select
+from models import db, DailySentimentSummary, DailyTopicCount, SentimentRecord, Topic, record_topics
+from services.donation_rollups import dialect_insert
+from services.sentiment_identity import resolve_topics
+
+LABELS = ('positive', 'negative', 'neutral')
+TOP_TOPICS = 10
+# Stay under SQLite's bound-parameter limit in IN lookups
+DAY_BATCH = 500
+
+TOTAL_FIELDS = ('record_count', 'score_sum', *(f'{label}_count' for label in LABELS))
+
+def _new_totals():
+    return dict.fromkeys(TOTAL_FIELDS, 0)
+
+def _add(totals, record):
+    totals['record_count'] += 1
+    totals['score_sum'] += record.sentiment_score or 0
+    if record.sentiment_label in LABELS:
+        totals[f'{record.sentiment_label}_count'] += 1
+
+def _merge(table, stmt):
+    """SET clause adding the excluded row's totals to the stored ones"""
+    return {field: func.coalesce(table.c[field], 0) + stmt.excluded[field] for field in TOTAL_FIELDS}
+
+def _stored_score_sum(table):
+    """A summary's score sum, derived from its average for rows written before score_sum existed.
+
+    Those rows have score_sum NULL, or 0 when the column was added with its
+    default; average x count gives the same sum, and is also exact for days
+    whose scores really do sum to 0.
+    """
+    legacy = and_(or_(table.c.score_sum.is_(None), table.c.score_sum == 0), table.c.record_count > 0)
+    return case(
+        (legacy, func.coalesce(table.c.average_sentiment, 0) * table.c.record_count),
+        else_=func.coalesce(table.c.score_sum, 0)
+    )
+
+def record_sentiment(records_with_topics):
+    """Add newly written canonical records to the daily summaries and topic rollup.
+
+    Takes (record, [topic names]) pairs. Each touched day gets one
+    INSERT ... ON CONFLICT DO UPDATE that adds the new counts and score sum,
+    per-topic totals are added with one executemany upsert, and only the
+    touched days' top topics are recomputed, so the cost follows the new
+    records rather than the size of the day. Runs in the caller's transaction.
+    """
+    days = defaultdict(_new_totals)
+    topics = defaultdict(_new_totals)
+    for record, names in records_with_topics:
+        day = (record.analyzed_date or datetime.utcnow()).date()
+        _add(days[day], record)
+        for name in set(names or ()):
+            _add(topics[day, name], record)
+    if not days:
+        return
+
+    table = DailySentimentSummary.__table__
+    now = datetime.utcnow()
+    for day, totals in sorted(days.items()):
+        stmt = dialect_insert(table).values(
+            date=day,
+            average_sentiment=totals['score_sum'] / totals['record_count'],
+            updated_at=now,
+            **totals
+        )
+        merged = _merge(table, stmt)
+        merged['score_sum'] = _stored_score_sum(table) + stmt.excluded.score_sum
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['date'],
+            set_={
+                **merged,
+                'average_sentiment': merged['score_sum'] / merged['record_count'],
+                'updated_at': stmt.excluded.updated_at
+            }
+        )
+        db.session.execute(stmt)
+
+    topic_ids = resolve_topics(name for _, name in topics)
+    rows = [
+        {'date': day, 'topic_id': topic_ids[name], **totals}
+        for (day, name), totals in sorted(topics.items()) if name in topic_ids
+    ]
+    if rows:
+        counts = DailyTopicCount.__table__
+        stmt = dialect_insert(counts)
+        stmt = stmt.on_conflict_do_update(index_elements=['date', 'topic_id'], set_=_merge(counts, stmt))
+        db.session.execute(stmt, rows)
+
+    refresh_top_topics(days)
+
+def refresh_top_topics(days):
+    """Rewrite top_topics for the given days from the per-day topic counts"""
+    days = sorted(set(days))
+    for i in range(0, len(days), DAY_BATCH):
+        batch = days[i:i + DAY_BATCH]
+        rank = func.row_number().over(
+            partition_by=DailyTopicCount.date,
+            order_by=(DailyTopicCount.record_count.desc(), Topic.name)
+        ).label('rank')
+        ranked = db.session.query(
+            DailyTopicCount.date.label('date'), Topic.name.label('name'),
+            DailyTopicCount.record_count.label('record_count'), rank
+        ).join(Topic, Topic.id == DailyTopicCount.topic_id).filter(DailyTopicCount.date.in_(batch)).subquery()
+
+        top = defaultdict(dict)
+        for day, name, count in db.session.query(ranked.c.date, ranked.c.name, ranked.c.record_count).filter(
+                ranked.c.rank <= TOP_TOPICS).order_by(ranked.c.date, ranked.c.rank):
+            top[day][name] = count
+
+        for day in batch:
+            db.session.query(DailySentimentSummary).filter(DailySentimentSummary.date == day).update(
+                {'top_topics': json.dumps(top.get(day, {}))}, synchronize_session=False)
+
+def record_aggregates():
+    """SQL aggregates over SentimentRecord in TOTAL_FIELDS order"""
+    return (
+        func.count(SentimentRecord.id),
+        func.coalesce(func.sum(SentimentRecord.sentiment_score), 0),
+        *(func.sum(case((SentimentRecord.sentiment_label == label, 1), else_=0)) for label in LABELS)
+    )
+
+def rebuild_summaries(start_date=None, end_date=None):
+    """Recompute the daily sentiment summaries for a date range (inclusive) from raw records.
+
+    Used to backfill the tables and to repair drift. Near-duplicates are left
+    out, as they are when records are written. Returns the number of summary
+    rows written.
+    """
+    summaries = DailySentimentSummary.query
+    topic_counts = DailyTopicCount.query
+    conditions = [SentimentRecord.canonical_id.is_(None), SentimentRecord.analyzed_date.isnot(None)]
+    if start_date:
+        summaries = summaries.filter(DailySentimentSummary.date >= start_date)
+        topic_counts = topic_counts.filter(DailyTopicCount.date >= start_date)
+        conditions.append(SentimentRecord.analyzed_date >= datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        summaries = summaries.filter(DailySentimentSummary.date <= end_date)
+        topic_counts = topic_counts.filter(DailyTopicCount.date <= end_date)
+        conditions.append(
+            SentimentRecord.analyzed_date < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        )
+
+    summaries.delete(synchronize_session=False)
+    topic_counts.delete(synchronize_session=False)
+
+    day = func.date(SentimentRecord.analyzed_date)
+    grouped = select(
+        day,
+        *record_aggregates(),
+        func.coalesce(func.avg(SentimentRecord.sentiment_score), 0),
+        literal(datetime.utcnow())
+    ).where(and_(*conditions)).group_by(day)
+
+    # INSERT ... SELECT keeps the whole backfill inside the database
+    result = db.session.execute(DailySentimentSummary.__table__.insert().from_select(
+        ['date', *TOTAL_FIELDS, 'average_sentiment', 'updated_at'], grouped
+    ))
+
+    topic_grouped = select(
+        day, record_topics.c.topic_id, *record_aggregates()
+    ).select_from(
+        record_topics.join(SentimentRecord, SentimentRecord.id == record_topics.c.record_id)
+    ).where(and_(*conditions)).group_by(day, record_topics.c.topic_id)
+    db.session.execute(DailyTopicCount.__table__.insert().from_select(
+        ['date', 'topic_id', *TOTAL_FIELDS], topic_grouped
+    ))
+
+    days = [row[0] for row in db.session.query(DailySentimentSummary.date).filter(
+        *([DailySentimentSummary.date >= start_date] if start_date else []),
+        *([DailySentimentSummary.date <= end_date] if end_date else [])
+    )]
+    refresh_top_topics(days)
+
+    return result.rowcount
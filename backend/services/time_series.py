@@ -0,0 +1,270 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import func
+from models import db, DailyDonationSummary, DailySentimentSummary
+from services.cache import report_cache
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax', 'avg')
+COMPARISONS = ('previous', 'year')
+DEFAULT_POINTS = 365
+MAX_POINTS = 2000
+MAX_WINDOW = 365
+DEFAULT_RANGE_DAYS = 365
+MAX_RANGE_DAYS = 366 * 20
+
+SERIES = {}
+
+def register_series(name, kind, public=False):
+    """Register a daily series loader under `name`.
+
+    Loaders take (first_day, last_day) and return [(day, value)] sorted by
+    day, reading rollup tables rather than raw rows. `kind` is 'sum' for
+    additive values, whose missing days are zero and whose periods are
+    compared by total, or 'mean' for averages, whose missing days are gaps.
+    Public series are readable without logging in.
+    """
+    def decorator(loader):
+        SERIES[name] = {'loader': loader, 'kind': kind, 'public': public}
+        return loader
+    return decorator
+
+def _as_date(value):
+    # SQLite returns DATE() results as text
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+@register_series('sentiment', kind='mean', public=True)
+def sentiment_series(first_day, last_day):
+    rows = db.session.query(DailySentimentSummary.date, DailySentimentSummary.average_sentiment).filter(
+        DailySentimentSummary.date >= first_day,
+        DailySentimentSummary.date <= last_day,
+        DailySentimentSummary.record_count > 0
+    ).order_by(DailySentimentSummary.date)
+    return [(_as_date(day), float(value or 0)) for day, value in rows]
+
+@register_series('sentiment_volume', kind='sum', public=True)
+def sentiment_volume_series(first_day, last_day):
+    rows = db.session.query(DailySentimentSummary.date, DailySentimentSummary.record_count).filter(
+        DailySentimentSummary.date >= first_day,
+        DailySentimentSummary.date <= last_day
+    ).order_by(DailySentimentSummary.date)
+    return [(_as_date(day), int(value or 0)) for day, value in rows]
+
+def _donation_series(column, first_day, last_day):
+    rows = db.session.query(DailyDonationSummary.date, func.sum(column)).filter(
+        DailyDonationSummary.date >= first_day,
+        DailyDonationSummary.date <= last_day
+    ).group_by(DailyDonationSummary.date).order_by(DailyDonationSummary.date)
+    return [(_as_date(day), float(value or 0)) for day, value in rows]
+
+@register_series('donation_amount', kind='sum')
+def donation_amount_series(first_day, last_day):
+    return _donation_series(DailyDonationSummary.total_amount, first_day, last_day)
+
+@register_series('donation_count', kind='sum')
+def donation_count_series(first_day, last_day):
+    return _donation_series(DailyDonationSummary.donation_count, first_day, last_day)
+
+def _fill_days(points, first_day, last_day):
+    """Dense daily points for an additive series; days without rows are zero"""
+    values = dict(points)
+    return [(first_day + timedelta(days=i), values.get(first_day + timedelta(days=i), 0))
+            for i in range((last_day - first_day).days + 1)]
+
+def moving_average(values, window):
+    """Trailing mean over `window` points (days, for dense series); None until the window is full"""
+    averages = []
+    total = 0
+    for i, value in enumerate(values):
+        total += value
+        if i >= window:
+            total -= values[i - window]
+        averages.append(total / window if i >= window - 1 else None)
+    return averages
+
+def _even_buckets(n, count):
+    """Split range(n) into `count` contiguous (start, end) slices of near-equal size"""
+    edges = [round(i * n / count) for i in range(count + 1)]
+    return [(edges[i], edges[i + 1]) for i in range(count) if edges[i] < edges[i + 1]]
+
+def lttb(values, target):
+    """Indexes kept by Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each bucket between them, the
+    point forming the largest triangle with the previously kept point and the
+    next bucket's average, which preserves peaks and troughs.
+    """
+    n = len(values)
+    if target >= n or target < 3:
+        return list(range(n))
+
+    kept = [0]
+    buckets = _even_buckets(n - 2, target - 2)
+    for b, (start, end) in enumerate(buckets):
+        start, end = start + 1, end + 1
+        if b + 1 < len(buckets):
+            next_start, next_end = buckets[b + 1][0] + 1, buckets[b + 1][1] + 1
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / (next_end - next_start)
+
+        ax, ay = kept[-1], values[kept[-1]]
+        best, best_area = start, -1
+        for i in range(start, end):
+            area = abs((ax - avg_x) * (values[i] - ay) - (ax - i) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = i, area
+        kept.append(best)
+    kept.append(n - 1)
+    return kept
+
+def minmax(values, target):
+    """Indexes of each bucket's minimum and maximum, in order, for about `target` points"""
+    n = len(values)
+    if target >= n or target < 2:
+        return list(range(n))
+
+    kept = []
+    for start, end in _even_buckets(n, target // 2):
+        low = min(range(start, end), key=values.__getitem__)
+        high = max(range(start, end), key=values.__getitem__)
+        kept.extend(sorted({low, high}))
+    return kept
+
+def _slices(values, target, method):
+    """(start, end) slices of the full series, one per output point"""
+    if method == 'avg':
+        return _even_buckets(len(values), min(target, len(values)))
+    select = lttb if method == 'lttb' else minmax
+    return [(i, i + 1) for i in select(values, target)]
+
+def _mean(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+def _rounded(value):
+    return round(value, 4) if value is not None else None
+
+def _points(points, target, method, averages=None, shift=None):
+    """Downsample (day, value) points, averaging each output point's slice.
+
+    `averages` are full-resolution moving averages aligned with `points`, so
+    smoothing is never computed over already-downsampled data.
+    """
+    days = [day for day, _ in points]
+    values = [value for _, value in points]
+
+    output = []
+    for start, end in _slices(values, target, method):
+        point = {'date': days[start].isoformat(), 'value': _rounded(_mean(values[start:end]))}
+        if averages is not None:
+            point['moving_average'] = _rounded(_mean(averages[start:end]))
+        if shift is not None:
+            point['aligned_date'] = (days[start] + shift).isoformat()
+        output.append(point)
+    return output
+
+def _summary(points, kind):
+    values = [value for _, value in points]
+    if kind == 'sum':
+        return round(sum(values), 4)
+    return _rounded(_mean(values))
+
+def normalize_trend_params(params):
+    """Validate trend parameters and reduce them to a canonical, hashable form"""
+    try:
+        end_date = date.fromisoformat(params['end_date'][:10]) if params.get('end_date') else datetime.utcnow().date()
+        start_date = (date.fromisoformat(params['start_date'][:10]) if params.get('start_date')
+                      else end_date - timedelta(days=DEFAULT_RANGE_DAYS - 1))
+    except ValueError:
+        raise ValueError('Invalid date format. Use ISO format (YYYY-MM-DD)')
+    if start_date > end_date:
+        raise ValueError('start_date must not be after end_date')
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        raise ValueError(f'Ranges are limited to {MAX_RANGE_DAYS} days')
+
+    try:
+        points = int(params.get('points') or DEFAULT_POINTS)
+        window = int(params.get('window') or 0)
+    except ValueError:
+        raise ValueError('points and window must be integers')
+
+    method = params.get('method') or 'lttb'
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown method '{method}'. Use one of: {', '.join(DOWNSAMPLE_METHODS)}")
+    compare = params.get('compare') or None
+    if compare is not None and compare not in COMPARISONS:
+        raise ValueError(f"Unknown comparison '{compare}'. Use one of: {', '.join(COMPARISONS)}")
+
+    normalized = {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'points': max(3, min(points, MAX_POINTS)),
+        'window': max(0, min(window, MAX_WINDOW)),
+        'method': method,
+        'compare': compare
+    }
+    return {k: v for k, v in normalized.items() if v not in (None, 0)}
+
+def _load(series, first_day, last_day):
+    points = series['loader'](first_day, last_day)
+    return _fill_days(points, first_day, last_day) if series['kind'] == 'sum' else points
+
+def _trend(name, params):
+    series = SERIES[name]
+    first_day = date.fromisoformat(params['start_date'])
+    last_day = date.fromisoformat(params['end_date'])
+    window = params.get('window')
+
+    # Load the days before the range too, so the moving average is full from the first point
+    lead = timedelta(days=window - 1) if window else timedelta(0)
+    loaded = _load(series, first_day - lead, last_day)
+    start = next((i for i, (day, _) in enumerate(loaded) if day >= first_day), len(loaded))
+    averages = moving_average([value for _, value in loaded], window)[start:] if window else None
+    points = loaded[start:]
+
+    result = {
+        'series': name,
+        'start_date': params['start_date'],
+        'end_date': params['end_date'],
+        'method': params['method'],
+        'raw_points': len(points),
+        'summary': _summary(points, series['kind']),
+        'points': _points(points, params['points'], params['method'], averages)
+    }
+
+    compare = params.get('compare')
+    if compare:
+        if compare == 'year':
+            shift = timedelta(days=364)  # 52 weeks, so weekdays line up
+        else:
+            shift = last_day - first_day + timedelta(days=1)
+        previous = _load(series, first_day - shift, last_day - shift)
+        previous_summary = _summary(previous, series['kind'])
+        change = (result['summary'] - previous_summary
+                  if result['summary'] is not None and previous_summary is not None else None)
+        result['comparison'] = {
+            'period': compare,
+            'start_date': (first_day - shift).isoformat(),
+            'end_date': (last_day - shift).isoformat(),
+            'summary': previous_summary,
+            'change': _rounded(change),
+            'change_percent': round(change / abs(previous_summary) * 100, 1)
+                              if change is not None and previous_summary else None,
+            'points': _points(previous, params['points'], params['method'], shift=shift)
+        }
+    return result
+
+def build_trend(name, params):
+    """Downsampled daily series with optional moving average and period comparison, cached.
+
+    Raises ValueError for unknown series or invalid parameters.
+    """
+    if name not in SERIES:
+        raise ValueError(f"Unknown series '{name}'. Use one of: {', '.join(sorted(SERIES))}")
+
+    normalized = normalize_trend_params(params)
+    key = ('trend', name, tuple(sorted(normalized.items())))
+    return report_cache.get_or_compute(key, lambda: _trend(name, normalized))
+
+def is_public(name):
+    return SERIES.get(name, {}).get('public', False)
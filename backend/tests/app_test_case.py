@@ -0,0 +1,51 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from models import db, User
+from services.cache import invalidate_reports
+
+TEST_CONFIG = {
+    'TESTING': True,
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    'SECRET_KEY': 'test-secret-key',
+    'JWT_SECRET_KEY': 'test-jwt-secret'
+}
+
+class AppTestCase(unittest.TestCase):
+    """Runs each test in an app context against a fresh in-memory database
+
+    Subclasses set `config` to override TEST_CONFIG and add their own data
+    after calling super().setUp().
+    """
+    config = {}
+
+    def setUp(self):
+        """Set up the app, test client and database with an empty report cache"""
+        self.app = create_app({**TEST_CONFIG, **self.config})
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        invalidate_reports()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        invalidate_reports()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def staff_headers(self):
+        """Create a staff user and return headers that authenticate API requests as them"""
+        user = User(username='staff', email='staff@example.com', role='staff')
+        user.set_password('password')
+        db.session.add(user)
+        db.session.commit()
+        return {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
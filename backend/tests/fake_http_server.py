@@ -0,0 +1,51 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class FakeHTTPServer:
+    """Local HTTP server returning canned JSON, for exercising real HTTP clients in tests.
+
+    `respond(path, query, headers)` returns (status, body, extra_headers).
+    Every request is recorded in `requests` as (path, query, headers).
+
+        with FakeHTTPServer(respond) as server:
+            requests.get(server.url + '/v2/everything')
+    """
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                headers = dict(self.headers)
+                fake.requests.append((parsed.path, query, headers))
+
+                status, body, extra_headers = fake.respond(parsed.path, query, headers)
+                payload = json.dumps(body).encode('utf-8') if body is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in (extra_headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,196 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_http_server import FakeHTTPServer
+from sqlalchemy.exc import DataError
+from app_test_case import AppTestCase
+from models import SentimentRecord, CollectionCheckpoint
+from services import data_collectors
+from services.cache import PersistentCache
+from services.fetching import RateLimiter, fetch_all
+from services.http_client import CachedHTTPClient, build_session
+from services.record_writer import RecordWriter
+from services.sentiment_rollups import record_sentiment
+
+NO_LIMITS = {'twitter': RateLimiter(None), 'reddit': RateLimiter(None), 'news': RateLimiter(None)}
+
+def fake_batch_analyze(texts):
+    return [{'sentiment_score': 0.1, 'sentiment_magnitude': 0.2,
+             'sentiment_label': 'positive', 'topics': ['tires']} for _ in texts]
+
+class StubTwitterAPI:
+    """Returns one original tweet and one retweet per keyword"""
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.since_ids = []
+        self._lock = threading.Lock()
+
+    def search_tweets(self, q, since_id=None, **kwargs):
+        with self._lock:
+            self.since_ids.append(since_id)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        user = SimpleNamespace(screen_name='shopper')
+        tweet_id = data_collectors.CANADIAN_TIRE_KEYWORDS.index(q) * 10
+        return [
+            SimpleNamespace(id=tweet_id, full_text=f'Talking about {q} today', user=user,
+                            created_at=datetime(2024, 5, 1)),
+            SimpleNamespace(id=tweet_id + 1, text='RT something', user=user, created_at=datetime(2024, 5, 1),
+                            retweeted_status=True)
+        ]
+
+class StubComments(list):
+    def replace_more(self, limit=None):
+        pass
+
+    def list(self):
+        return self
+
+class StubReddit:
+    """Each subreddit search finds one post with one comment"""
+    def subreddit(self, name):
+        return SimpleNamespace(search=lambda keyword, **kwargs: [SimpleNamespace(
+            title=f'{keyword} in r/{name}', selftext='thoughts?', permalink=f'/r/{name}/{keyword}',
+            created_utc=1714521600,
+            comments=StubComments([SimpleNamespace(body='I agree completely', permalink=f'/r/{name}/{keyword}/c',
+                                                   created_utc=1714521600)])
+        )])
+
+def news_api(path, query, headers):
+    """Fake News API: one article per keyword, except one keyword that fails"""
+    if query['q'] == 'CT Corp':
+        return 500, {'status': 'error'}, {}
+    return 200, {'status': 'ok', 'articles': [{
+        'title': f"{query['q']} results", 'description': 'Quarterly earnings rose',
+        'url': f"https://news.example.com/{query['q']}", 'publishedAt': '2024-05-01T12:00:00Z'
+    }]}, {}
+
+class TestDataCollectors(AppTestCase):
+    def setUp(self):
+        """Set up the app with stubbed analysis and no rate limiting"""
+        super().setUp()
+
+        for patcher in (patch('services.record_writer.batch_analyze', side_effect=fake_batch_analyze),
+                        patch.dict(data_collectors.RATE_LIMITS, NO_LIMITS)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_twitter_keywords_fetched_concurrently(self):
+        """Test keyword searches overlap and retweets are skipped"""
+        api = StubTwitterAPI(delay=0.05)
+        result = data_collectors.collect_twitter_data(api=api)
+
+        self.assertGreater(api.peak, 1)
+        self.assertEqual(result['count'], len(data_collectors.CANADIAN_TIRE_KEYWORDS))
+        self.assertEqual(SentimentRecord.query.count(), len(data_collectors.CANADIAN_TIRE_KEYWORDS))
+
+    def test_second_run_starts_from_checkpoints(self):
+        """Test a re-run searches from each keyword's since_id and writes nothing twice"""
+        api = StubTwitterAPI()
+        data_collectors.collect_twitter_data(api=api)
+        checkpoints = {c.query_key: c.since_id for c in CollectionCheckpoint.query}
+        self.assertEqual(checkpoints['Canadian Tire'], '1')
+
+        api.since_ids.clear()
+        with patch('services.record_writer.batch_analyze', side_effect=fake_batch_analyze) as analyze:
+            result = data_collectors.collect_twitter_data(api=api)
+
+        self.assertEqual(sorted(api.since_ids), sorted(checkpoints.values()))
+        self.assertEqual(result['count'], 0)
+        analyze.assert_not_called()
+        self.assertEqual(SentimentRecord.query.count(), len(data_collectors.CANADIAN_TIRE_KEYWORDS))
+
+    def test_rejected_chunk_only_fails_its_tasks(self):
+        """Test a chunk the database rejects keeps its keyword's checkpoint and the run carries on"""
+        def reject_ct_corp(pairs):
+            if any('CT Corp' in record.content_text for record, _ in pairs):
+                raise DataError('INSERT', {}, Exception('value rejected'))
+            record_sentiment(pairs)
+
+        with patch.object(data_collectors, 'RecordWriter', partial(RecordWriter, chunk_size=1)), \
+                patch('services.record_writer.record_sentiment', side_effect=reject_ct_corp), \
+                patch('builtins.print') as log:
+            result = data_collectors.collect_twitter_data(api=StubTwitterAPI())
+
+        keywords = len(data_collectors.CANADIAN_TIRE_KEYWORDS)
+        self.assertEqual(result['count'], keywords - 1)
+        self.assertIn("keyword 'CT Corp'", log.call_args_list[0].args[0])
+        checkpoints = {c.query_key for c in CollectionCheckpoint.query}
+        self.assertEqual(len(checkpoints), keywords - 1)
+        self.assertNotIn('CT Corp', checkpoints)
+
+    def test_reddit_posts_and_comments(self):
+        """Test every subreddit/keyword pair is searched with per-thread clients"""
+        clients = []
+
+        def factory():
+            clients.append(threading.get_ident())
+            return StubReddit()
+
+        result = data_collectors.collect_reddit_data(reddit_factory=factory)
+        pairs = len(data_collectors.REDDIT_SUBREDDITS) * len(data_collectors.CANADIAN_TIRE_KEYWORDS)
+
+        self.assertEqual(result['count'], pairs * 2)
+        self.assertEqual(len(clients), len(set(clients)))
+        self.assertEqual(CollectionCheckpoint.query.count(), pairs)
+        # Posts at or before the checkpoint are not searched again, nor their comments
+        self.assertEqual(data_collectors.collect_reddit_data(reddit_factory=StubReddit)['count'], 0)
+
+    def test_news_failures_are_isolated(self):
+        """Test a failing keyword does not stop the others and a re-run is served from cache"""
+        with FakeHTTPServer(news_api) as server, \
+                patch.object(data_collectors, 'NEWS_API_URL', server.url + '/v2/everything'), \
+                patch.dict(os.environ, {'NEWS_API_KEY': 'test-key'}):
+            client = CachedHTTPClient(session=build_session(retries=0), cache=PersistentCache(':memory:', 'test'))
+            result = data_collectors.collect_news_data(client=client)
+            data_collectors.collect_news_data(client=client)
+            first_runs = list(server.requests)
+            data_collectors.collect_news_data(client=client)
+
+        keywords = len(data_collectors.CANADIAN_TIRE_KEYWORDS)
+        self.assertEqual(result['count'], keywords - 1)
+        self.assertEqual(result['records'][0]['source_name'], 'News Articles')
+        self.assertEqual(server.requests[0][1]['apiKey'], 'test-key')
+        # The second run searches from each keyword's checkpoint day, and writes nothing twice
+        self.assertEqual([query['from'] for _, query, _ in first_runs[keywords:] if query['q'] == 'Canadian Tire'],
+                         ['2024-05-01'])
+        self.assertEqual(SentimentRecord.query.count(), keywords - 1)
+        # A third run within the same window only asks again for the keyword whose response was an error
+        self.assertEqual(len(server.requests), len(first_runs) + 1)
+
+class TestFetching(unittest.TestCase):
+    def test_fetch_all_reports_errors_per_task(self):
+        """Test results and errors come back for every task"""
+        def fetch(n):
+            if n == 2:
+                raise ValueError('bad')
+            return n * 10
+
+        outcomes = {task: (result, type(error)) for task, result, error in fetch_all(range(4), fetch)}
+        self.assertEqual(outcomes[1], (10, type(None)))
+        self.assertEqual(outcomes[2], (None, ValueError))
+
+    def test_rate_limiter_spaces_calls(self):
+        """Test calls through a shared limiter are spaced by its interval"""
+        limiter = RateLimiter(20)
+        started = time.monotonic()
+        list(fetch_all(range(5), lambda _: limiter.wait(), max_workers=5))
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, Donor, Donation
+from services.donation_analytics import amount_distribution, donation_frame
+
+class TestDonationAnalytics(AppTestCase):
+    def setUp(self):
+        """Set up test client and donors giving across four years"""
+        super().setUp()
+        self.headers = self.staff_headers()
+
+        donors = {name: Donor(first_name=name, last_name='Doe', email=f'{name}@example.com')
+                  for name in ('Ann', 'Bob', 'Cy', 'Di')}
+        db.session.add_all(donors.values())
+        db.session.commit()
+
+        gifts = {
+            'Ann': [(2021, '100.00'), (2022, '50.00'), (2024, '20.00')],  # active this year
+            'Bob': [(2022, '10.00'), (2023, '30.00')],                    # LYBUNT
+            'Cy': [(2022, '5000.00')],                                    # SYBUNT
+            'Di': [(2023, '75.00'), (2023, '25.00')],                     # LYBUNT
+        }
+        for name, donations in gifts.items():
+            for year, amount in donations:
+                db.session.add(Donation(donor_id=donors[name].id, amount=amount, donation_date=datetime(year, 3, 1)))
+        db.session.commit()
+        self.donors = {name: donor.id for name, donor in donors.items()}
+
+    def _report(self, name, **params):
+        response = self.client.get('/api/reports/generate', query_string={'report': name, **params},
+                                   headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data)
+
+    def test_frame_read_in_chunks(self):
+        """Test chunked reads build the same columns as a single read"""
+        frame = donation_frame({'end_date': '2023-12-31'}, chunk_size=2)
+        self.assertEqual(len(frame), 7)
+        self.assertEqual(frame['amount'].sum(), 5290.0)
+        self.assertEqual(str(frame['donation_date'].dtype), 'datetime64[us]')
+        self.assertEqual(len(donation_frame({'start_date': '2030-01-01'})), 0)
+
+    def test_amount_distribution(self):
+        """Test percentiles and gift-size bands"""
+        distribution = amount_distribution([10, 20, 30, 40, 6000])
+        self.assertEqual(distribution['percentiles']['p50'], 30.0)
+        self.assertEqual(distribution['mean'], 1220.0)
+        bands = {band['band']: band['count'] for band in distribution['bands']}
+        self.assertEqual((bands['0-25'], bands['25-50'], bands['5000+']), (2, 2, 1))
+
+    def test_lapsed_donor_report(self):
+        """Test LYBUNT and SYBUNT donors as of the year the range ends in"""
+        lapsed = self._report('lapsed_donors', start_date='2024-01-01', end_date='2024-12-31')['lapsedDonors']
+        self.assertEqual(lapsed['fiscal_year'], 2024)
+        self.assertEqual(lapsed['lybunt']['count'], 2)
+        self.assertEqual([d['name'] for d in lapsed['lybunt']['donors']], ['Di Doe', 'Bob Doe'])
+        self.assertEqual(lapsed['lybunt']['lifetime_amount'], 140.0)
+        self.assertEqual(lapsed['sybunt']['donors'], [{
+            'donor_id': self.donors['Cy'], 'name': 'Cy Doe', 'last_gift_date': '2022-03-01',
+            'lifetime_amount': 5000.0, 'gift_count': 1
+        }])
+
+    def test_lapsed_donors_by_fiscal_year(self):
+        """Test lapsed donors follow the fiscal years used by the cohort report"""
+        self.app.config['FISCAL_YEAR_START_MONTH'] = 4
+        # December 2024 falls in fiscal 2025, which began in April 2024
+        lapsed = self._report('lapsed_donors', end_date='2024-12-31')['lapsedDonors']
+        self.assertEqual(lapsed['fiscal_year'], 2025)
+        self.assertEqual([d['name'] for d in lapsed['lybunt']['donors']], ['Ann Doe'])
+        self.assertEqual(lapsed['sybunt']['count'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
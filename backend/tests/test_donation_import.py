@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, Donor, Donation, DailyDonationSummary
+from services.donation_import import import_donations, read_rows
+
+CSV_FILE = """donor_id,donor_email,amount,donation_date,payment_method,campaign,is_recurring
+{jane},,25.00,2024-03-01,cash,Relay,no
+,JANE@example.com,75.50,2024-03-01,cash,Relay,yes
+{jane},,not-a-number,2024-03-02,cash,Relay,no
+,nobody@example.com,10,2024-03-02,cash,Relay,no
+{jane},,40,2024-03-02,credit card,,no
+"""
+
+class TestDonationImport(AppTestCase):
+    def setUp(self):
+        """Set up test client, database, a donor and an authenticated staff user"""
+        super().setUp()
+        self.headers = self.staff_headers()
+        self.jane = Donor(first_name='Jane', last_name='Doe', email='jane@example.com')
+        db.session.add(self.jane)
+        db.session.commit()
+
+    def _upload(self, content, filename, encoding='utf-8', **form):
+        data = {'file': (io.BytesIO(content.encode(encoding)), filename), **form}
+        response = self.client.post('/api/donations/import', data=data, headers=self.headers,
+                                    content_type='multipart/form-data')
+        return response, json.loads(response.data)
+
+    def test_csv_import_reports_bad_rows(self):
+        """Test valid rows are inserted and bad rows are reported by line"""
+        response, data = self._upload(CSV_FILE.format(jane=self.jane.id), 'gifts.csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['data']['total_rows'], 5)
+        self.assertEqual(data['data']['imported'], 3)
+        self.assertEqual(data['data']['failed'], 2)
+        self.assertEqual([error['row'] for error in data['data']['errors']], [3, 4])
+        self.assertEqual(Donation.query.count(), 3)
+
+    def test_import_updates_daily_rollup(self):
+        """Test imported donations are added to the daily summary"""
+        import_donations(read_rows(io.StringIO(CSV_FILE.format(jane=self.jane.id)), 'csv'), chunk_size=2)
+
+        relay = DailyDonationSummary.query.filter_by(date=date(2024, 3, 1), campaign='Relay').one()
+        self.assertEqual(relay.total_amount, Decimal('100.50'))
+        self.assertEqual(relay.donation_count, 2)
+        self.assertEqual(relay.recurring_count, 1)
+
+    def test_jsonl_import(self):
+        """Test JSON-lines uploads, including malformed lines"""
+        lines = '\n'.join([
+            json.dumps({'donor_email': 'jane@example.com', 'amount': 20, 'donation_date': '2024-05-01'}),
+            '{not json',
+            json.dumps({'donor_id': self.jane.id, 'amount': '5.25'})
+        ])
+        _, data = self._upload(lines, 'gifts.jsonl')
+
+        self.assertEqual(data['data']['imported'], 2)
+        self.assertEqual(data['data']['errors'], [{'row': 2, 'error': 'Invalid JSON'}])
+
+    def test_non_utf8_file_rejected(self):
+        """Test a Latin-1 export is refused before any row is imported"""
+        content = CSV_FILE.format(jane=self.jane.id) + ',jane@example.com,10.00,2024-03-02,cash,Café,no\n'
+        response, data = self._upload(content, 'gifts.csv', encoding='latin-1')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('UTF-8', data['message'])
+        self.assertIn(f"line {content.count(chr(10))}", data['message'])
+        self.assertEqual(Donation.query.count(), 0)
+
+    def test_missing_file(self):
+        """Test a request without a file is rejected"""
+        response = self.client.post('/api/donations/import', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
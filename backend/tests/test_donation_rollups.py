@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+import json
+from datetime import date, datetime
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, Donor, Donation, DailyDonationSummary
+from services.donation_rollups import rebuild_rollups
+from services.donation_reports import summarize_donations
+
+class TestDonationRollups(AppTestCase):
+    def setUp(self):
+        """Set up test client, database and an authenticated staff user"""
+        super().setUp()
+        self.headers = self.staff_headers()
+        self.donor = Donor(first_name='Jane', last_name='Doe', email='jane@example.com')
+        db.session.add(self.donor)
+        db.session.commit()
+
+    def _create(self, **fields):
+        payload = {'donor_id': self.donor.id, **fields}
+        response = self.client.post('/api/donations', data=json.dumps(payload),
+                                    content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        return json.loads(response.data)['data']['id']
+
+    def _rollup(self):
+        return {
+            (s.date, s.campaign, s.payment_method): (float(s.total_amount), s.donation_count, s.recurring_count)
+            for s in DailyDonationSummary.query.all()
+            if s.donation_count
+        }
+
+    def test_rollup_follows_create_update_delete(self):
+        """Test the rollup is adjusted in the same request as each donation change"""
+        first = self._create(amount=50, donation_date='2024-06-01T10:00:00',
+                             payment_method='cash', campaign='Relay', is_recurring=True)
+        self._create(amount=25, donation_date='2024-06-01T15:00:00', payment_method='cash', campaign='Relay')
+        self.assertEqual(self._rollup(), {(date(2024, 6, 1), 'Relay', 'cash'): (75.0, 2, 1)})
+
+        self.client.put(f'/api/donations/{first}', data=json.dumps({'payment_method': 'cheque', 'amount': 60}),
+                        content_type='application/json', headers=self.headers)
+        self.assertEqual(self._rollup(), {
+            (date(2024, 6, 1), 'Relay', 'cash'): (25.0, 1, 0),
+            (date(2024, 6, 1), 'Relay', 'cheque'): (60.0, 1, 1)
+        })
+
+        self.client.delete(f'/api/donations/{first}', headers=self.headers)
+        self.assertEqual(self._rollup(), {(date(2024, 6, 1), 'Relay', 'cash'): (25.0, 1, 0)})
+
+    def test_rebuild_matches_incremental(self):
+        """Test a backfill produces the same rows as incremental maintenance"""
+        self._create(amount=10, donation_date='2024-06-01T09:00:00', payment_method='cash')
+        self._create(amount=20, donation_date='2024-06-02T09:00:00', campaign='Relay')
+        self._create(amount=30, donation_date='2024-06-02T18:00:00', campaign='Relay', is_recurring=True)
+        incremental = self._rollup()
+
+        DailyDonationSummary.query.delete()
+        self.assertEqual(rebuild_rollups(), 2)
+        db.session.commit()
+        self.assertEqual(self._rollup(), incremental)
+
+    def test_summary_combines_rollup_and_partial_days(self):
+        """Test reports over partial days agree with a raw scan"""
+        for day, amount in [(1, 10), (2, 20), (3, 30), (4, 40)]:
+            db.session.add(Donation(donor_id=self.donor.id, amount=amount,
+                                    donation_date=datetime(2024, 6, day, 12, 0), payment_method='cash'))
+        db.session.commit()
+        rebuild_rollups()
+        db.session.commit()
+
+        summary = summarize_donations(datetime(2024, 6, 1, 13, 0), datetime(2024, 6, 4, 12, 0))
+        self.assertEqual(summary['total_amount'], 90.0)
+        self.assertEqual(summary['donation_count'], 3)
+        self.assertEqual(summary['payment_methods']['cash'], 90.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, Donor, Donation, Campaign
+
+class TestDonationRoutes(AppTestCase):
+    def setUp(self):
+        """Set up test client, database and an authenticated staff user"""
+        super().setUp()
+        self.headers = self.staff_headers()
+
+        self._create_test_data()
+
+    def _create_test_data(self):
+        """Create donors, a campaign and a spread of donations"""
+        jane = Donor(first_name='Jane', last_name='Doe', email='jane@example.com')
+        bob = Donor(first_name='Bob', last_name='Martin', email='bob@example.com')
+        self.campaign = Campaign(name='Daffodil Month')
+        db.session.add_all([jane, bob, self.campaign])
+        db.session.commit()
+
+        self.start = datetime(2024, 4, 1, 12, 0)
+        for i in range(10):
+            db.session.add(Donation(
+                donor_id=jane.id if i % 2 == 0 else bob.id,
+                amount=10 * (i + 1),
+                donation_date=self.start + timedelta(days=i),
+                payment_method='credit card' if i < 6 else 'cash',
+                campaign='Daffodil Month' if i < 4 else 'Relay for Life',
+                receipt_number=f'R-{i:04d}'
+            ))
+        db.session.commit()
+
+    def _get(self, **params):
+        response = self.client.get('/api/donations', query_string=params, headers=self.headers)
+        return response, json.loads(response.data)
+
+    def test_newest_first_with_donor_name(self):
+        """Test donations are returned newest first with the donor name loaded"""
+        response, data = self._get(limit=3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['total'], 10)
+        self.assertEqual([d['amount'] for d in data['donations']], [100.0, 90.0, 80.0])
+        self.assertEqual(data['donations'][0]['donor_name'], 'Bob Martin')
+
+    def test_cursor_pages(self):
+        """Test following next_cursor visits every donation exactly once"""
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 4}
+            if cursor:
+                params['cursor'] = cursor
+            _, data = self._get(**params)
+            seen.extend(d['id'] for d in data['donations'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(len(set(seen)), 10)
+
+    def test_combined_filters(self):
+        """Test campaign, date, amount and payment method filters compose"""
+        _, data = self._get(campaign_id=self.campaign.id)
+        self.assertEqual(data['total'], 4)
+
+        _, data = self._get(start_date='2024-04-03', end_date='2024-04-05')
+        self.assertEqual(data['total'], 3)
+
+        _, data = self._get(min_amount='30', max_amount='70', payment_method='credit card')
+        self.assertEqual(sorted(d['amount'] for d in data['donations']), [30.0, 40.0, 50.0, 60.0])
+
+    def test_search_by_donor(self):
+        """Test search matches the donor's name"""
+        _, data = self._get(search='jane')
+        self.assertEqual(data['total'], 5)
+        self.assertTrue(all(d['donor_name'] == 'Jane Doe' for d in data['donations']))
+
+    def test_invalid_filter(self):
+        """Test a malformed filter value is rejected"""
+        response, data = self._get(min_amount='lots')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(data['success'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, Donor, Donation, DonorFiscalYear
+from services.cache import invalidate_reports
+from services.donation_rollups import rebuild_donor_years, record_donation
+from services.donor_cohorts import donor_cohorts
+
+class TestDonorCohorts(AppTestCase):
+    # Fiscal 2024 runs from April 2023 to March 2024
+    config = {'FISCAL_YEAR_START_MONTH': 4}
+
+    def setUp(self):
+        """Set up test client and donors giving across three fiscal years"""
+        super().setUp()
+        self.headers = self.staff_headers()
+
+        donors = {name: Donor(first_name=name, last_name='Doe', email=f'{name}@example.com')
+                  for name in ('Ann', 'Bob', 'Cy', 'Di')}
+        db.session.add_all(donors.values())
+        db.session.commit()
+        self.donors = donors
+
+        gifts = {
+            'Ann': [datetime(2021, 6, 1), datetime(2022, 6, 1), datetime(2023, 6, 1)],  # every year
+            'Bob': [datetime(2021, 6, 1), datetime(2024, 3, 31, 18)],                   # recaptured in FY2024
+            'Cy': [datetime(2022, 6, 1), datetime(2024, 4, 1)],                          # lapsed in FY2024
+            'Di': [datetime(2024, 2, 15)],                                               # new in FY2024
+        }
+        for name, dates in gifts.items():
+            for day in dates:
+                db.session.add(Donation(donor_id=donors[name].id, amount='10.00', donation_date=day))
+        db.session.commit()
+        rebuild_donor_years()
+        db.session.commit()
+
+    def _donor_years(self):
+        return {(row.donor_id, row.fiscal_year): (float(row.total_amount), row.donation_count)
+                for row in DonorFiscalYear.query.all() if row.donation_count}
+
+    def _report(self, **params):
+        response = self.client.get('/api/reports/generate', query_string={'report': 'donor_cohorts', **params},
+                                   headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data)['donorCohorts']
+
+    def test_yearly_rates(self):
+        """Test new, retained, recaptured and lapsed donors per fiscal year"""
+        report = self._report(start_date='2023-04-01', end_date='2024-03-31')
+        self.assertEqual((report['fiscal_year'], report['start_date'], report['end_date']),
+                         (2024, '2023-04-01', '2024-03-31'))
+        self.assertEqual([(y['fiscal_year'], y['donors'], y['new_donors'], y['retained_donors'],
+                           y['recaptured_donors'], y['lapsed_donors']) for y in report['years']], [
+            (2022, 2, 2, 0, 0, 0),
+            (2023, 2, 1, 1, 0, 1),
+            (2024, 3, 1, 1, 1, 1)
+        ])
+        fy2024 = report['years'][-1]
+        self.assertEqual((fy2024['retention_rate'], fy2024['lapsed_rate'], fy2024['recapture_rate']),
+                         (50.0, 50.0, 100.0))
+        self.assertIsNone(report['years'][0]['retention_rate'])
+
+    def test_cohort_retention(self):
+        """Test each first-gift cohort's share giving in later fiscal years"""
+        cohorts = self._report(end_date='2024-03-31')['cohorts']
+        self.assertEqual(cohorts, [
+            {'cohort': 2022, 'donors': 2, 'retention': {'2022': 100.0, '2023': 50.0, '2024': 100.0}},
+            {'cohort': 2023, 'donors': 1, 'retention': {'2023': 100.0, '2024': 0.0}},
+            {'cohort': 2024, 'donors': 1, 'retention': {'2024': 100.0}}
+        ])
+
+        # A range ending in April falls in fiscal 2025, where Cy is recaptured
+        fy2025 = self._report(end_date='2024-04-15')['years'][-1]
+        self.assertEqual((fy2025['fiscal_year'], fy2025['donors'], fy2025['recaptured_donors']), (2025, 1, 1))
+
+    def test_cached_per_fiscal_year(self):
+        """Test results are reused within a fiscal year until donations change"""
+        first = donor_cohorts(2024)
+        gift = Donation(donor_id=self.donors['Di'].id, amount='5.00', donation_date=datetime(2023, 5, 1))
+        db.session.add(gift)
+        record_donation(gift)
+        db.session.commit()
+        self.assertIs(donor_cohorts(2024), first)
+
+        invalidate_reports()
+        self.assertEqual(donor_cohorts(2024)['years'][-1]['amount'], 35.0)
+
+    def test_donor_years_follow_donation_changes(self):
+        """Test creating, moving and deleting gifts keeps the fiscal-year table in step with a rebuild"""
+        di = self.donors['Di'].id
+        response = self.client.post('/api/donations', json={
+            'donor_id': di, 'amount': '25.00', 'donation_date': '2024-03-20T00:00:00'
+        }, headers=self.headers)
+        gift = json.loads(response.data)['data']['id']
+        self.assertEqual(self._donor_years()[(di, 2024)], (35.0, 2))
+
+        # Moving the gift into April moves it into fiscal 2025, where Di is retained
+        self.client.put(f'/api/donations/{gift}', json={'donation_date': '2024-04-02T00:00:00'}, headers=self.headers)
+        self.assertEqual((self._donor_years()[(di, 2024)], self._donor_years()[(di, 2025)]), ((10.0, 1), (25.0, 1)))
+        self.assertEqual(self._report(end_date='2024-04-15')['years'][-1]['retained_donors'], 1)
+
+        self.client.delete(f'/api/donations/{gift}', headers=self.headers)
+        self.assertNotIn((di, 2025), self._donor_years())
+        self.assertEqual(self._report(end_date='2024-04-15')['years'][-1]['donors'], 1)
+
+        incremental = self._donor_years()
+        self.assertEqual(rebuild_donor_years(), 8)
+        db.session.commit()
+        self.assertEqual(self._donor_years(), incremental)
+
+if __name__ == '__main__':
+    unittest.main()
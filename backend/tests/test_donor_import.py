@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import io
+import json
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, Donor
+from services.donor_import import upsert_donors
+
+CSV_FILE = """first_name,last_name,email,city,donor_type
+Jane,Doe,Jane@Example.com,Toronto,
+Jane,Doe,jane@example.com,,
+Sam,Lee,sam@example.com,Ottawa,
+,,nobody@example.com,,
+Pat,Kim,,Halifax,corporate
+"""
+
+class TestDonorImport(AppTestCase):
+    def setUp(self):
+        """Set up test client, database, an existing donor and an authenticated staff user"""
+        super().setUp()
+        self.headers = self.staff_headers()
+        self.jane = Donor(first_name='Jane', last_name='Doe', email='jane@example.com', donor_type='individual')
+        db.session.add(self.jane)
+        db.session.commit()
+
+    def test_csv_upsert_counts(self):
+        """Test existing emails are updated, new ones created and repeats skipped"""
+        data = {'file': (io.BytesIO(CSV_FILE.encode('utf-8')), 'donors.csv')}
+        response = self.client.post('/api/donors/import', data=data, headers=self.headers,
+                                    content_type='multipart/form-data')
+        result = json.loads(response.data)['data']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((result['created'], result['updated'], result['skipped'], result['failed']), (2, 1, 1, 1))
+        self.assertEqual(result['errors'][0]['row'], 4)
+        self.assertEqual(Donor.query.count(), 3)
+
+        jane = db.session.get(Donor, self.jane.id)
+        self.assertEqual(jane.city, 'Toronto')
+        self.assertEqual(jane.email, 'jane@example.com')
+        self.assertEqual(Donor.query.filter_by(email='sam@example.com').one().donor_type, 'individual')
+
+    def test_unchanged_rows_are_skipped(self):
+        """Test re-importing the same list changes nothing"""
+        rows = [(1, {'first_name': 'Jane', 'last_name': 'Doe', 'email': 'JANE@example.com'})]
+        result = upsert_donors(rows)
+        self.assertEqual((result['created'], result['updated'], result['skipped']), (0, 0, 1))
+
+    def test_json_body(self):
+        """Test donors can be sent as a JSON list"""
+        response = self.client.post('/api/donors/import', headers=self.headers, json={'donors': [
+            {'first_name': 'Sam', 'last_name': 'Lee', 'email': 'sam@example.com'},
+            {'email': 'jane@example.com', 'phone': '555-0100'}
+        ]})
+        result = json.loads(response.data)['data']
+
+        self.assertEqual((result['created'], result['updated']), (1, 1))
+        self.assertEqual(db.session.get(Donor, self.jane.id).phone, '555-0100')
+
+    def test_non_utf8_file_rejected(self):
+        """Test an Excel "ANSI" export is refused with a 400 instead of failing mid-import"""
+        content = 'first_name,last_name,email\nRené,Côté,rene@example.com\n'.encode('cp1252')
+        response = self.client.post('/api/donors/import', data={'file': (io.BytesIO(content), 'donors.csv')},
+                                    headers=self.headers, content_type='multipart/form-data')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('line 2', json.loads(response.data)['message'])
+        self.assertEqual(Donor.query.count(), 1)
+
+    def test_missing_payload(self):
+        """Test a request with neither a file nor a donors list is rejected"""
+        response = self.client.post('/api/donors/import', headers=self.headers, json={})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
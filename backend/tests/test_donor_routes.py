@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, Donor, Donation
+
+class TestDonorRoutes(AppTestCase):
+    def setUp(self):
+        """Set up test client, database and an authenticated staff user"""
+        super().setUp()
+        self.headers = self.staff_headers()
+
+        self._create_test_data()
+
+    def _create_test_data(self):
+        """Create test donors"""
+        names = [
+            ('Jane', 'Doe'), ('John', 'Doe'), ('Alice', 'Martin'), ('Bob', 'Martin'),
+            ('Carol', 'Nguyen'), ('Dave', 'Smith'), ('Erin', 'Smith'), ('Frank', 'Tremblay')
+        ]
+        for first_name, last_name in names:
+            db.session.add(Donor(
+                first_name=first_name,
+                last_name=last_name,
+                email=f'{first_name.lower()}.{last_name.lower()}@example.com',
+                donor_type='individual'
+            ))
+        db.session.commit()
+
+    def _get(self, **params):
+        response = self.client.get('/api/donors', query_string=params, headers=self.headers)
+        return response, json.loads(response.data)
+
+    def test_first_page(self):
+        """Test the first page is ordered by name and reports the full total"""
+        response, data = self._get(limit=3)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(data['success'])
+        self.assertEqual(data['total'], 8)
+        self.assertEqual([d['first_name'] for d in data['donors']], ['Jane', 'John', 'Alice'])
+        self.assertIsNotNone(data['next_cursor'])
+
+    def test_cursor_walks_every_donor_once(self):
+        """Test following next_cursor visits each donor exactly once"""
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            _, data = self._get(**params)
+            seen.extend(d['id'] for d in data['donors'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+
+        self.assertEqual(len(seen), 8)
+        self.assertEqual(len(set(seen)), 8)
+
+    def test_page_number_matches_cursor(self):
+        """Test offset pages used by the UI line up with cursor pages"""
+        _, first = self._get(limit=3)
+        _, by_cursor = self._get(limit=3, cursor=first['next_cursor'])
+        _, by_page = self._get(limit=3, page=2)
+        self.assertEqual(
+            [d['id'] for d in by_cursor['donors']],
+            [d['id'] for d in by_page['donors']]
+        )
+
+    def test_prefix_search(self):
+        """Test search matches name and email prefixes case-insensitively"""
+        _, data = self._get(search='smi')
+        self.assertEqual(data['total'], 2)
+        self.assertEqual({d['first_name'] for d in data['donors']}, {'Dave', 'Erin'})
+
+        _, data = self._get(search='JANE do')
+        self.assertEqual(data['total'], 1)
+        self.assertEqual(data['donors'][0]['email'], 'jane.doe@example.com')
+
+    def test_search_escapes_wildcards(self):
+        """Test LIKE wildcards in the search term are matched literally"""
+        _, data = self._get(search='%')
+        self.assertEqual(data['total'], 0)
+
+    def test_donation_totals(self):
+        """Test totals are aggregated per donor on the listed page"""
+        jane = Donor.query.filter_by(email='jane.doe@example.com').first()
+        db.session.add_all([
+            Donation(donor_id=jane.id, amount=25, donation_date=datetime(2024, 1, 5)),
+            Donation(donor_id=jane.id, amount=75.50, donation_date=datetime(2024, 3, 1))
+        ])
+        db.session.commit()
+
+        _, data = self._get(search='doe')
+        donors = {d['first_name']: d for d in data['donors']}
+        self.assertEqual(donors['Jane']['total_donated'], 100.5)
+        self.assertEqual(donors['Jane']['donation_count'], 2)
+        self.assertEqual(donors['Jane']['last_donation_date'], '2024-03-01T00:00:00')
+        self.assertEqual(donors['John']['total_donated'], 0)
+        self.assertEqual(donors['John']['donation_count'], 0)
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+        response, data = self._get(cursor='not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(data['success'])
+
+if __name__ == '__main__':
+    unittest.main()
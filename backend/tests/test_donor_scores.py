@@ -0,0 +1,116 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, Donor, Donation, DonorScore
+from services.donor_scores import score_donors
+
+class TestDonorScores(AppTestCase):
+    def setUp(self):
+        """Set up test client and five donors, each better than the last on every dimension"""
+        super().setUp()
+        self.headers = self.staff_headers()
+
+        names = ('Ann', 'Bob', 'Cy', 'Di', 'Ed')
+        donors = {name: Donor(first_name=name, last_name='Doe', email=f'{name}@example.com') for name in names}
+        db.session.add_all(donors.values())
+        db.session.commit()
+        self.donors = {name: donor.id for name, donor in donors.items()}
+
+        # Ann gave once in January 2024 ... Ed gave five times, most recently in May
+        for rank, name in enumerate(names, start=1):
+            for month in range(1, rank + 1):
+                db.session.add(Donation(donor_id=donors[name].id, amount=f'{rank * 10}.00',
+                                        donation_date=datetime(2024, month, 1)))
+        db.session.commit()
+
+    def _scores(self):
+        return {name: db.session.get(DonorScore, donor_id) for name, donor_id in self.donors.items()}
+
+    def _list(self, **params):
+        response = self.client.get('/api/donors', query_string=params, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data)
+
+    def test_full_run_scores_quintiles(self):
+        """Test every donor gets a quintile per dimension and ties share a score"""
+        self.assertEqual(score_donors(full=True), 5)
+        db.session.commit()
+        scores = self._scores()
+        self.assertEqual([scores[name].rfm_score for name in ('Ann', 'Bob', 'Cy', 'Di', 'Ed')], [3, 6, 9, 12, 15])
+        self.assertEqual((scores['Ed'].donation_count, float(scores['Ed'].total_amount)), (5, 250.0))
+        self.assertFalse(any(score.stale for score in scores.values()))
+
+        # Bob and Cy catch up with Di's four gifts; Cy's last gift now ties with Di's
+        db.session.add_all([Donation(donor_id=self.donors['Bob'], amount='5.00', donation_date=datetime(2024, 6, day))
+                            for day in (1, 2)])
+        db.session.add(Donation(donor_id=self.donors['Cy'], amount='10.00', donation_date=datetime(2024, 4, 1)))
+        db.session.commit()
+        score_donors(full=True)
+        scores = self._scores()
+        self.assertEqual([scores[name].frequency_score for name in ('Ann', 'Bob', 'Cy', 'Di', 'Ed')], [1, 2, 2, 2, 5])
+        self.assertEqual([scores[name].recency_score for name in ('Ann', 'Cy', 'Di', 'Ed', 'Bob')], [1, 2, 2, 4, 5])
+        self.assertEqual(scores['Bob'].monetary_score, 2)
+
+    def test_incremental_rescores_changed_donors(self):
+        """Test donation writes mark donors stale and the next run rescores only them"""
+        score_donors(full=True)
+        db.session.commit()
+        first_run = self._scores()['Di'].scored_at
+
+        response = self.client.post('/api/donations', json={
+            'donor_id': self.donors['Ann'], 'amount': '500.00', 'donation_date': '2024-07-01T00:00:00'
+        }, headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(self._scores()['Ann'].stale)
+
+        self.assertEqual(score_donors(), 1)
+        db.session.commit()
+        scores = self._scores()
+        self.assertFalse(scores['Ann'].stale)
+        # Scored against the full run's boundaries: latest and largest, but only two gifts
+        self.assertEqual((scores['Ann'].recency_score, scores['Ann'].frequency_score,
+                          scores['Ann'].monetary_score, scores['Ann'].rfm_score), (5, 2, 5, 12))
+        self.assertEqual(scores['Di'].scored_at, first_run)
+
+        # A donor left without donations loses the score row
+        donation = Donation.query.filter_by(donor_id=self.donors['Ann']).first()
+        other = Donation.query.filter(Donation.donor_id == self.donors['Ann'], Donation.id != donation.id).one()
+        for gift in (donation, other):
+            self.assertEqual(self.client.delete(f'/api/donations/{gift.id}', headers=self.headers).status_code, 200)
+        score_donors()
+        db.session.commit()
+        self.assertIsNone(db.session.get(DonorScore, self.donors['Ann']))
+
+    def test_list_sorted_and_filtered_by_score(self):
+        """Test the donor list pages by stored score and filters on a score range"""
+        unscored = self._list()
+        self.assertEqual(unscored['total'], 5)
+        self.assertIsNone(unscored['donors'][0]['rfm'])
+        self.assertEqual(self._list(sort='rfm')['total'], 0)
+
+        score_donors(full=True)
+        db.session.commit()
+        first = self._list(sort='rfm', limit=2)
+        self.assertEqual([d['first_name'] for d in first['donors']], ['Ed', 'Di'])
+        self.assertEqual(first['donors'][0]['rfm']['segment'], '555')
+        second = self._list(sort='rfm', limit=2, cursor=first['next_cursor'])
+        self.assertEqual([d['first_name'] for d in second['donors']], ['Cy', 'Bob'])
+
+        ranged = self._list(min_rfm=6, max_rfm=12)
+        self.assertEqual(ranged['total'], 3)
+        self.assertEqual([d['first_name'] for d in ranged['donors']], ['Bob', 'Cy', 'Di'])
+
+        response = self.client.get('/api/donors', query_string={'sort': 'score'}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/donors', query_string={'min_rfm': 'high'}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
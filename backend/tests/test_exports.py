@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+import csv
+import io
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, Donor, Donation, Campaign
+
+class TestExports(AppTestCase):
+    def setUp(self):
+        """Set up test client, database and an authenticated staff user"""
+        super().setUp()
+        self.headers = self.staff_headers()
+
+        self._create_test_data()
+
+    def _create_test_data(self):
+        """Create donors of two types and a campaign with donations"""
+        jane = Donor(first_name='Jane', last_name='Doe', email='jane@example.com', donor_type='individual')
+        acme = Donor(first_name='Acme', last_name='Corp', email='giving@acme.example', donor_type='corporate')
+        db.session.add_all([jane, acme, Campaign(name='Relay', goal_amount=1000)])
+        db.session.commit()
+
+        for i in range(12):
+            db.session.add(Donation(
+                donor_id=jane.id if i % 3 else acme.id,
+                amount=10 + i,
+                donation_date=datetime(2024, 3, 1 + i),
+                campaign='Relay',
+                payment_method='cash'
+            ))
+        db.session.commit()
+
+    def _export(self, **params):
+        response = self.client.get('/api/reports/export', query_string=params, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_csv_export_streams_in_chunks(self):
+        """Test the CSV export is streamed and honours the report filters"""
+        with patch('services.exports.FLUSH_EVERY', 2):
+            response = self._export(startDate='2024-03-01', endDate='2024-03-06', donorType='individual')
+
+        self.assertTrue(response.is_streamed)
+        self.assertIn('attachment', response.headers['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(all(row['donor_first_name'] == 'Jane' for row in rows))
+        self.assertEqual(rows[0]['donation_date'], '2024-03-06T00:00:00')
+
+    def test_jsonl_donor_export(self):
+        """Test donors export as one JSON object per line"""
+        response = self._export(dataset='donors', format='jsonl')
+        lines = response.get_data(as_text=True).strip().split('\n')
+        self.assertEqual([json.loads(line)['email'] for line in lines], ['jane@example.com', 'giving@acme.example'])
+
+    def test_campaign_export(self):
+        """Test the campaign report sums donations per campaign"""
+        response = self._export(dataset='campaigns', format='jsonl', startDate='2024-03-01', endDate='2024-03-02')
+        row = json.loads(response.get_data(as_text=True))
+        self.assertEqual(row['name'], 'Relay')
+        self.assertEqual(row['raised_amount'], '21.00')
+        self.assertEqual(row['donation_count'], 2)
+        self.assertEqual(row['donor_count'], 2)
+
+    def test_unknown_dataset(self):
+        """Test an unknown dataset is rejected before streaming starts"""
+        response = self.client.get('/api/reports/export', query_string={'dataset': 'users'}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
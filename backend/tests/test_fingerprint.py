@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, ContentFingerprint, SentimentSource, SentimentRecord
+from services.fingerprint import FingerprintIndex, fingerprint, index_unfingerprinted, load_index
+
+WIRE_STORY = ('Canadian Tire Corporation reported quarterly earnings that beat analyst expectations as retail '
+              'sales grew across its stores and online channels this spring while automotive demand stayed strong')
+
+class TestFingerprint(unittest.TestCase):
+    def test_normalized_copies_match_exactly(self):
+        """Test retweet prefixes, links, case and punctuation do not change the hash"""
+        original = fingerprint('Great prices on winter tires at Canadian Tire!')
+        retweet = fingerprint('RT @shopper: great prices on WINTER tires at Canadian Tire https://t.co/x1')
+        self.assertEqual(original.content_hash, retweet.content_hash)
+
+    def test_near_duplicates_found_through_bands(self):
+        """Test republished and lightly edited stories match, unrelated posts do not"""
+        index = FingerprintIndex()
+        index.add(fingerprint(WIRE_STORY), 'story')
+
+        self.assertEqual(index.match(fingerprint('BREAKING: ' + WIRE_STORY)), 'story')
+        self.assertEqual(index.match(fingerprint(WIRE_STORY.replace('beat', 'topped'))), 'story')
+        self.assertIsNone(index.match(fingerprint(
+            'Long lines at the Canadian Tire checkout today and the staff seemed overwhelmed by holiday shoppers')))
+
+    def test_short_texts_only_match_exactly(self):
+        """Test texts too short for a reliable signature only match identical text"""
+        index = FingerprintIndex()
+        index.add(fingerprint('Love this store'), 'short')
+        self.assertIsNone(fingerprint('Love this store').signature)
+        self.assertIsNone(index.match(fingerprint('Hate this store')))
+
+class TestFingerprintIndex(AppTestCase):
+    def setUp(self):
+        """Set up the app with one source"""
+        super().setUp()
+
+        self.source = SentimentSource(name='News Articles', type='news')
+        db.session.add(self.source)
+        db.session.commit()
+
+    def test_backfill_indexes_stored_records(self):
+        """Test records stored before fingerprinting are indexed and then found by lookup"""
+        record = SentimentRecord(source_id=self.source.id, content_text=WIRE_STORY, sentiment_score=0.4)
+        db.session.add(record)
+        db.session.commit()
+
+        self.assertEqual(index_unfingerprinted(chunk_size=1), 1)
+        self.assertEqual(index_unfingerprinted(), 0)
+        self.assertEqual(ContentFingerprint.query.count(), 1)
+
+        republished = fingerprint(WIRE_STORY + ' Shares rose 3 percent.')
+        self.assertEqual(load_index([republished]).match(republished), record.id)
+
+if __name__ == '__main__':
+    unittest.main()
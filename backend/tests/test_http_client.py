@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_http_server import FakeHTTPServer
+from services.cache import PersistentCache
+from services.http_client import CachedHTTPClient, build_session
+
+class TestCachedHTTPClient(unittest.TestCase):
+    def _client(self, **kwargs):
+        return CachedHTTPClient(session=build_session(backoff_factor=0),
+                                cache=PersistentCache(':memory:', 'test'), **kwargs)
+
+    def test_repeated_queries_served_from_cache(self):
+        """Test the same query and window is downloaded once, whatever the API key"""
+        with FakeHTTPServer(lambda path, query, headers: (200, {'status': 'ok', 'q': query['q']}, {})) as server:
+            client = self._client()
+            first = client.get_json(server.url + '/v2/everything', {'q': 'tires', 'from': '2024-05-01', 'apiKey': 'a'})
+            second = client.get_json(server.url + '/v2/everything', {'q': 'tires', 'from': '2024-05-01', 'apiKey': 'b'})
+            client.get_json(server.url + '/v2/everything', {'q': 'tires', 'from': '2024-05-02', 'apiKey': 'a'})
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(server.requests), 2)
+
+    def test_stale_entries_are_revalidated(self):
+        """Test an expired entry is revalidated with its ETag and a 304 reuses the body"""
+        def respond(path, query, headers):
+            if headers.get('If-None-Match') == '"v1"':
+                return 304, None, {'ETag': '"v1"'}
+            return 200, {'status': 'ok', 'articles': []}, {'ETag': '"v1"'}
+
+        with FakeHTTPServer(respond) as server:
+            client = self._client(ttl=0)
+            first = client.get_json(server.url + '/news', {'q': 'tires'})
+            second = client.get_json(server.url + '/news', {'q': 'tires'})
+
+        self.assertEqual(first, second)
+        self.assertEqual(client.revalidated, 1)
+        self.assertEqual(server.requests[1][2].get('If-None-Match'), '"v1"')
+
+    def test_transient_errors_are_retried(self):
+        """Test 503 responses are retried on the pooled session"""
+        statuses = [503, 503]
+
+        def respond(path, query, headers):
+            return (statuses.pop(), {'status': 'error'}, {}) if statuses else (200, {'status': 'ok'}, {})
+
+        with FakeHTTPServer(respond) as server:
+            body = self._client().get_json(server.url + '/news', {'q': 'tires'})
+
+        self.assertEqual(body, {'status': 'ok'})
+        self.assertEqual(len(server.requests), 3)
+
+    def test_error_responses_are_not_cached(self):
+        """Test an API error is returned but fetched again next time"""
+        with FakeHTTPServer(lambda path, query, headers: (401, {'status': 'error'}, {})) as server:
+            client = self._client()
+            client.get_json(server.url + '/news', {'q': 'tires'})
+            client.get_json(server.url + '/news', {'q': 'tires'})
+
+        self.assertEqual(len(server.requests), 2)
+
+class TestPersistentCache(unittest.TestCase):
+    def test_oldest_entries_evicted_past_maxsize(self):
+        """Test writes past maxsize evict the entries stored longest ago"""
+        cache = PersistentCache(':memory:', 'test', maxsize=3)
+        cache.set_many([('a', 1), ('b', 2), ('c', 3)])
+        cache.set('a', 10)  # rewriting makes 'a' the newest entry
+        cache.set_many([('d', 4), ('e', 5)])
+
+        self.assertEqual(cache.get_many(['a', 'b', 'c', 'd', 'e']), {'a': 10, 'd': 4, 'e': 5})
+        self.assertEqual(cache.stats()['size'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import event
+from sqlalchemy.exc import DataError, OperationalError
+from app_test_case import AppTestCase
+from models import db, ContentFingerprint, SentimentSource, SentimentRecord, Topic
+from services.fingerprint import FingerprintIndex, fingerprint
+from services.record_writer import RecordWriter, is_transient
+
+def fake_batch_analyze(texts):
+    return [{
+        'sentiment_score': 0.5,
+        'sentiment_magnitude': 0.7,
+        'sentiment_label': 'positive',
+        'topics': ['tires', f'topic{len(text)}']
+    } for text in texts]
+
+class TestRecordWriter(AppTestCase):
+    def setUp(self):
+        """Set up the app, a source and a stubbed analyzer"""
+        super().setUp()
+
+        self.source = SentimentSource(name='Twitter', type='twitter')
+        db.session.add(self.source)
+        db.session.commit()
+
+        analyzer = patch('services.record_writer.batch_analyze', side_effect=fake_batch_analyze)
+        self.batch_analyze = analyzer.start()
+        self.addCleanup(analyzer.stop)
+
+    def test_commits_once_per_chunk(self):
+        """Test records are analyzed and committed in chunks, not one by one"""
+        commits = []
+        listener = lambda session: commits.append(session)
+        event.listen(db.session, 'after_commit', listener)
+        try:
+            with RecordWriter(self.source, chunk_size=4) as writer:
+                for i in range(10):
+                    writer.add(f'Post number {i}', content_url=f'https://example.com/{i}')
+                writer.add('hi')
+        finally:
+            event.remove(db.session, 'after_commit', listener)
+
+        self.assertEqual(len(commits), 3)
+        self.assertEqual(self.batch_analyze.call_count, 3)
+        self.assertEqual((writer.written, writer.skipped), (10, 1))
+        self.assertEqual(len(writer.sample), 10)
+        self.assertEqual(SentimentRecord.query.count(), 10)
+        self.assertEqual(Topic.query.filter_by(name='tires').one().records.count(), 10)
+
+    def test_known_urls_skipped_before_analysis(self):
+        """Test posts already stored or repeated in a run are dropped before analysis"""
+        with RecordWriter(self.source) as writer:
+            writer.add('Stored earlier today', content_url='https://example.com/1')
+
+        with RecordWriter(self.source) as writer:
+            writer.add('Stored earlier today', content_url='https://example.com/1')
+            writer.add('A brand new post', content_url='https://example.com/2')
+            writer.add('A brand new post', content_url='https://example.com/2')
+
+        self.assertEqual((writer.written, writer.duplicates), (1, 2))
+        self.batch_analyze.assert_called_with(['A brand new post'])
+        self.assertEqual(SentimentRecord.query.count(), 2)
+
+    def test_near_duplicates_linked_not_analyzed(self):
+        """Test repeats of stored or queued content reuse the canonical record's sentiment"""
+        story = ('Canadian Tire reported quarterly earnings that beat expectations '
+                 'as retail sales grew across its stores and online channels')
+        with RecordWriter(self.source) as writer:
+            writer.add(story, content_url='https://news.example.com/original')
+
+        with RecordWriter(self.source) as writer:
+            writer.add('BREAKING: ' + story, content_url='https://news.example.com/wire')
+            writer.add('Winter tire prices are up again this year and shoppers are not happy',
+                       content_url='https://news.example.com/prices')
+            writer.add('Winter tire prices are up again this year and shoppers are not happy at all',
+                       content_url='https://news.example.com/prices-copy')
+
+        self.batch_analyze.assert_called_with(['Winter tire prices are up again this year and shoppers are not happy'])
+        self.assertEqual((writer.written, writer.linked), (3, 2))
+        original = SentimentRecord.query.filter_by(content_url='https://news.example.com/original').one()
+        wire = SentimentRecord.query.filter_by(content_url='https://news.example.com/wire').one()
+        copy = SentimentRecord.query.filter_by(content_url='https://news.example.com/prices-copy').one()
+        self.assertEqual((wire.canonical_id, wire.sentiment_label, wire.topics), (original.id, 'positive', []))
+        self.assertEqual(copy.canonical.content_url, 'https://news.example.com/prices')
+        # Only canonical records are indexed
+        self.assertEqual(ContentFingerprint.query.count(), 2)
+
+    def test_orphaned_index_entries_ignored(self):
+        """Test an index entry whose record was deleted does not make posts duplicates of it"""
+        story = 'Winter tire prices are up again this year and shoppers are not happy'
+        with RecordWriter(self.source) as writer:
+            writer.add(story, content_url='https://news.example.com/first')
+            writer.add('Great service at the new store today', content_url='https://news.example.com/later')
+        db.session.execute(SentimentRecord.__table__.delete().where(
+            SentimentRecord.content_url == 'https://news.example.com/first'))
+        db.session.commit()
+
+        with RecordWriter(self.source) as writer:
+            writer.add(story, content_url='https://news.example.com/again')
+
+        self.assertEqual((writer.written, writer.linked), (1, 0))
+        again = SentimentRecord.query.filter_by(content_url='https://news.example.com/again').one()
+        self.assertIsNone(again.canonical_id)
+        self.assertEqual(ContentFingerprint.query.count(), 3)
+
+        # The orphan's lower id must not shadow the live canonical record
+        with RecordWriter(self.source) as writer:
+            writer.add(story, content_url='https://news.example.com/third')
+        third = SentimentRecord.query.filter_by(content_url='https://news.example.com/third').one()
+        self.assertEqual(third.canonical_id, again.id)
+
+    def test_canonical_deleted_during_flush(self):
+        """Test a match whose record vanishes before its sentiment is read is analyzed as a new canonical post"""
+        story = 'Winter tire prices are up again this year and shoppers are not happy'
+        vanished = FingerprintIndex()
+        vanished.add(fingerprint(story), 999)
+        with patch('services.record_writer.load_index', return_value=vanished):
+            with RecordWriter(self.source) as writer:
+                writer.add(story, content_url='https://news.example.com/prices')
+                writer.add(story + ' at all', content_url='https://news.example.com/prices-copy')
+
+        self.assertEqual((writer.written, writer.linked), (2, 1))
+        self.batch_analyze.assert_called_once_with([story])
+        canonical = SentimentRecord.query.filter_by(content_url='https://news.example.com/prices').one()
+        self.assertIsNone(canonical.canonical_id)
+        self.assertEqual(ContentFingerprint.query.one().record_id, canonical.id)
+
+    def test_retries_transient_errors(self):
+        """Test a chunk hitting a transient error is rolled back and retried"""
+        real_commit = db.session.commit
+        failures = [OperationalError('COMMIT', {}, Exception('database is locked'))]
+
+        def flaky_commit():
+            if failures:
+                raise failures.pop()
+            real_commit()
+
+        writer = RecordWriter(self.source, chunk_size=10, retry_delay=0)
+        writer.add('Great service today')
+        writer.add('Long lines at checkout')
+        with patch.object(db.session, 'commit', side_effect=flaky_commit):
+            self.assertEqual(writer.flush(), 2)
+
+        self.assertEqual(self.batch_analyze.call_count, 1)
+        self.assertEqual(SentimentRecord.query.count(), 2)
+
+    def test_permanent_errors_are_raised(self):
+        """Test non-transient errors are not retried"""
+        writer = RecordWriter(self.source, retry_delay=0)
+        writer.add('Great service today')
+        error = DataError('INSERT', {}, Exception('value too long'))
+        with patch.object(db.session, 'commit', side_effect=error) as commit:
+            with self.assertRaises(DataError):
+                writer.flush()
+
+        self.assertEqual(commit.call_count, 1)
+        self.assertEqual(writer.failed, 1)
+        self.assertEqual(SentimentRecord.query.count(), 0)
+
+    def test_transient_errors(self):
+        """Test only lock, deadlock, serialization and lost-connection errors are retried"""
+        class PostgresError(Exception):
+            def __init__(self, pgcode):
+                super().__init__('could not serialize access')
+                self.pgcode = pgcode
+
+        self.assertTrue(is_transient(OperationalError('COMMIT', {}, Exception('database is locked'))))
+        self.assertTrue(is_transient(OperationalError('UPDATE', {}, PostgresError('40001'))))
+        self.assertTrue(is_transient(OperationalError('UPDATE', {}, PostgresError('40P01'))))
+        self.assertTrue(is_transient(DataError('INSERT', {}, Exception('gone'), connection_invalidated=True)))
+        self.assertFalse(is_transient(OperationalError('INSERT', {}, Exception('no such table: sentiment_record'))))
+        self.assertFalse(is_transient(OperationalError('SELECT', {}, PostgresError('42P01'))))
+        self.assertFalse(is_transient(DataError('INSERT', {}, Exception('value too long'))))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, Donor, Donation, Campaign
+from services.donation_rollups import rebuild_rollups
+from services import report_engine
+
+class TestReportEngine(AppTestCase):
+    def setUp(self):
+        """Set up test client, database and an authenticated staff user"""
+        super().setUp()
+        self.headers = self.staff_headers()
+
+        self._create_test_data()
+
+    def _create_test_data(self):
+        """Donors giving across 2023 and 2024"""
+        jane = Donor(first_name='Jane', last_name='Doe', email='jane@example.com', donor_type='individual')
+        bob = Donor(first_name='Bob', last_name='Martin', email='bob@example.com', donor_type='individual')
+        acme = Donor(first_name='Acme', last_name='Corp', email='acme@example.com', donor_type='corporate')
+        self.campaign = Campaign(name='Relay', goal_amount=1000)
+        db.session.add_all([jane, bob, acme, self.campaign])
+        db.session.commit()
+
+        gifts = [
+            (jane, 100, datetime(2023, 6, 1), 'cash', False),
+            (bob, 50, datetime(2023, 7, 1), 'cash', False),
+            (jane, 200, datetime(2024, 1, 15), 'credit card', True),
+            (jane, 200, datetime(2024, 2, 15), 'credit card', True),
+            (acme, 500, datetime(2024, 4, 1), 'cheque', False),
+        ]
+        for donor, amount, when, method, recurring in gifts:
+            db.session.add(Donation(donor_id=donor.id, amount=amount, donation_date=when,
+                                    payment_method=method, is_recurring=recurring, campaign='Relay'))
+        rebuild_rollups()
+        db.session.commit()
+
+    def _generate(self, **params):
+        response = self.client.get('/api/reports/generate', query_string=params, headers=self.headers)
+        return response, json.loads(response.data)
+
+    def test_overview_for_reports_screen(self):
+        """Test the default report has every section the reports screen renders"""
+        response, data = self._generate(reportType='quarterly', startDate='2024-01-01', endDate='2024-12-31')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['summary'], {'totalDonations': 3, 'totalAmount': 900.0, 'averageDonation': 300.0})
+        self.assertEqual(data['donationTrends'], [
+            {'period': '2024-Q1', 'amount': 400.0, 'count': 2},
+            {'period': '2024-Q2', 'amount': 500.0, 'count': 1}
+        ])
+        self.assertEqual(data['topDonors'][0]['name'], 'Acme Corp')
+        self.assertEqual(len(data['donations']), 3)
+        self.assertEqual(data['campaignPerformance'][0]['raised_amount'], 900.0)
+
+    def test_donor_retention(self):
+        """Test new, retained and lapsed donors against the prior period"""
+        _, data = self._generate(report='donor_retention', startDate='2024-01-01', endDate='2024-12-31')
+        self.assertEqual(data['donorSummary'], {
+            'totalDonors': 2,
+            'newDonors': 1,
+            'recurringDonors': 1,
+            'retainedDonors': 1,
+            'lapsedDonors': 1,
+            'priorPeriodDonors': 2,
+            'retentionRate': 50.0
+        })
+
+    def test_donor_type_filter(self):
+        """Test filters apply to every section"""
+        _, data = self._generate(report='payment_method_mix', startDate='2024-01-01',
+                                 endDate='2024-12-31', donorType='corporate')
+        self.assertEqual(data['paymentMethods'], [{'method': 'cheque', 'amount': 500.0, 'count': 1, 'share': 100.0}])
+
+    def test_unknown_campaign_matches_nothing(self):
+        """Test an unknown campaign id empties the rollup totals as well as the raw-donation sections"""
+        bob = Donor.query.filter_by(email='bob@example.com').one()
+        db.session.add(Donation(donor_id=bob.id, amount=50, donation_date=datetime(2024, 5, 1)))
+        rebuild_rollups()
+        db.session.commit()
+        _, data = self._generate(report='donation_summary', startDate='2024-01-01', endDate='2024-12-31',
+                                 campaignId=999)
+        self.assertEqual(data['summary'], {'totalDonations': 0, 'totalAmount': 0, 'averageDonation': 0})
+        self.assertEqual(data['topDonors'], [])
+
+    def test_results_are_cached_by_normalized_params(self):
+        """Test equivalent requests are served from the cache"""
+        with patch.dict(report_engine.REPORTS, {'donation_summary': Mock(
+                wraps=report_engine.REPORTS['donation_summary'])}):
+            builder = report_engine.REPORTS['donation_summary']
+            self._generate(report='donation_summary', startDate='2024-01-01', endDate='2024-12-31')
+            self._generate(report='donation_summary', startDate='2024-01-01T00:00:00', endDate='2024-12-31',
+                           period='monthly')
+            self.assertEqual(builder.call_count, 1)
+
+    def test_unknown_report(self):
+        """Test unknown report names are rejected"""
+        response, data = self._generate(report='everything')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(data['success'])
+
+if __name__ == '__main__':
+    unittest.main()
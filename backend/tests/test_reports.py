@@ -0,0 +1,124 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, Donor, Donation
+from services.donation_rollups import rebuild_rollups
+from services import dashboard
+
+class TestDonationReports(AppTestCase):
+    def setUp(self):
+        """Set up test client, database and an authenticated staff user"""
+        super().setUp()
+        self.headers = self.staff_headers()
+
+        self._create_test_data()
+
+    def _create_test_data(self):
+        """Create two donors with donations inside and outside the report range"""
+        jane = Donor(first_name='Jane', last_name='Doe', email='jane@example.com')
+        bob = Donor(first_name='Bob', last_name='Martin', email='bob@example.com')
+        db.session.add_all([jane, bob])
+        db.session.commit()
+
+        db.session.add_all([
+            Donation(donor_id=jane.id, amount='10.10', donation_date=datetime(2024, 5, 1),
+                     payment_method='credit card', is_recurring=True),
+            Donation(donor_id=jane.id, amount='20.20', donation_date=datetime(2024, 5, 2),
+                     payment_method='credit card'),
+            Donation(donor_id=bob.id, amount='0.05', donation_date=datetime(2024, 5, 3)),
+            Donation(donor_id=bob.id, amount='500.00', donation_date=datetime(2023, 1, 1),
+                     payment_method='cash')
+        ])
+        rebuild_rollups()
+        db.session.commit()
+
+    def test_donation_report_aggregates(self):
+        """Test report metrics are aggregated exactly over the date range"""
+        response = self.client.get(
+            '/admin/reports/donations',
+            query_string={'start_date': '2024-05-01', 'end_date': '2024-05-31'},
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+
+        data = json.loads(response.data)['data']
+        self.assertEqual(data['total_amount'], 30.35)
+        self.assertEqual(data['donation_count'], 3)
+        self.assertEqual(data['average_amount'], 10.12)
+        self.assertEqual(data['donor_count'], 2)
+        self.assertEqual(data['recurring_count'], 1)
+        self.assertEqual(data['payment_methods'], {'credit card': 30.3, 'Unknown': 0.05})
+
+    def test_empty_donation_report(self):
+        """Test an empty range reports zeroes"""
+        response = self.client.get(
+            '/admin/reports/donations',
+            query_string={'start_date': '2020-01-01', 'end_date': '2020-12-31'},
+            headers=self.headers
+        )
+        data = json.loads(response.data)['data']
+        self.assertEqual(data['total_amount'], 0.0)
+        self.assertEqual(data['donation_count'], 0)
+        self.assertEqual(data['payment_methods'], {})
+
+class TestDashboard(AppTestCase):
+    def setUp(self):
+        """Set up test client, database and an authenticated staff user"""
+        super().setUp()
+        self.headers = self.staff_headers()
+        self.donor = Donor(first_name='Jane', last_name='Doe', email='jane@example.com')
+        db.session.add(self.donor)
+        db.session.commit()
+
+    def _donate(self, amount, days_ago=0, **fields):
+        payload = {
+            'donor_id': self.donor.id,
+            'amount': amount,
+            'donation_date': (datetime.utcnow() - timedelta(days=days_ago)).isoformat(),
+            **fields
+        }
+        self.client.post('/api/donations', data=json.dumps(payload),
+                         content_type='application/json', headers=self.headers)
+
+    def _dashboard(self, days=30):
+        response = self.client.get('/api/reports/dashboard', query_string={'days': days}, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data)
+
+    def test_dashboard_metrics(self):
+        """Test the dashboard totals only cover the requested window"""
+        self._donate(100, days_ago=1, payment_method='cash')
+        self._donate(50, days_ago=2, payment_method='credit card')
+        self._donate(999, days_ago=90, payment_method='cash')
+
+        data = self._dashboard(days=30)
+        self.assertEqual(data['totalDonations'], 2)
+        self.assertEqual(data['totalAmount'], 150.0)
+        self.assertEqual(data['totalDonors'], 1)
+        self.assertEqual({t['type']: t['amount'] for t in data['donationsByType']}, {'cash': 100.0, 'credit card': 50.0})
+        self.assertEqual(data['topDonors'][0]['total_amount'], 150.0)
+        self.assertEqual(len(data['recentDonations']), 3)
+
+    def test_dashboard_is_cached_until_donations_change(self):
+        """Test repeated loads reuse the cached metrics and writes invalidate them"""
+        self._donate(100)
+
+        with patch('services.dashboard.compute_dashboard', wraps=dashboard.compute_dashboard) as compute:
+            self.assertEqual(self._dashboard()['totalAmount'], 100.0)
+            self.assertEqual(self._dashboard()['totalAmount'], 100.0)
+            self.assertEqual(compute.call_count, 1)
+
+            self._donate(25)
+            self.assertEqual(self._dashboard()['totalAmount'], 125.0)
+            self.assertEqual(compute.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,22 @@
 import unittest
 import sys
 import os
+import subprocess
+import tempfile
 from datetime import datetime
+from unittest.mock import patch
 
 # Add the parent directory to the path so we can import our modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from services import sentiment_analyzer
 from services.sentiment_analyzer import analyze_text, batch_analyze, extract_topics, preprocess_text
 
 class TestSentimentAnalyzer(unittest.TestCase):
+    def setUp(self):
+        """Start each test with an empty result cache"""
+        sentiment_analyzer.get_result_cache().clear()
+        
     def test_analyze_text_positive(self):
         """Test analyzing positive text"""
         text = "I love shopping at Canadian Tire. Their products are excellent and the staff is very helpful."
@@ -65,6 +73,72 @@ class TestSentimentAnalyzer(unittest.TestCase):
         self.assertTrue(-0.1 <= results[1]['sentiment_score'] <= 0.1)  # Actually neutral
         self.assertTrue(-0.1 <= results[2]['sentiment_score'] <= 0.1)  # Neutral
         
+    def test_batch_analyze_matches_single_analysis(self):
+        """Test the batch engine gives the same results as analyzing texts one by one"""
+        texts = [
+            "Great deals on winter tires! #CanadianTire",
+            "",
+            "The checkout line was slow and the staff were rude @CanadianTire http://ct.ca"
+        ] * 4
+        
+        results, stats = batch_analyze(texts, workers=1, return_stats=True)
+        
+        self.assertEqual(results, [analyze_text(text) for text in texts])
+        self.assertEqual(stats['texts'], 12)
+        self.assertEqual(stats['workers'], 1)
+        self.assertIn('texts_per_second', stats)
+        
+    def test_batch_analyze_process_pool(self):
+        """Test large batches fanned out over a process pool keep their order"""
+        texts = ["I love this store", "I hate this store", "This store sells tires"]
+        with patch('services.sentiment_analyzer.PARALLEL_THRESHOLD', 3), \
+                patch('services.sentiment_analyzer.MIN_CHUNK_SIZE', 1):
+            results, stats = batch_analyze(texts, workers=2, return_stats=True)
+        
+        self.assertEqual(stats['workers'], 2)
+        self.assertEqual([r['sentiment_label'] for r in results], ['positive', 'negative', 'neutral'])
+        
+    def test_result_cache_persists_and_tracks_hits(self):
+        """Test cached results survive a restart and copies of a post hit the cache"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.dict(os.environ, {'SENTIMENT_CACHE_PATH': os.path.join(tmp, 'cache.db')}), \
+                patch.object(sentiment_analyzer, '_result_cache', None):
+            first = analyze_text("Loving the new store layout! http://ct.ca/a")
+            
+            # Simulate a restart by dropping the open cache
+            sentiment_analyzer._result_cache = None
+            with patch.object(sentiment_analyzer, '_analyze_processed') as scorer:
+                copy = analyze_text("Loving the new store layout! @CanadianTire http://ct.ca/b")
+                scorer.assert_not_called()
+            
+            self.assertEqual(copy, first)
+            stats = sentiment_analyzer.cache_stats()['results']
+            self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 0, 1))
+            
+    def test_result_cache_invalidated_by_weight_change(self):
+        """Test changing the scoring weights discards cached results"""
+        analyze_text("The staff were friendly")
+        with patch.dict(sentiment_analyzer.SCORING_WEIGHTS, {'vader': 0.5, 'textblob': 0.5}):
+            analyze_text("The staff were friendly")
+            stats = sentiment_analyzer.cache_stats()['results']
+        self.assertEqual((stats['hits'], stats['misses']), (0, 1))
+        
+    def test_import_does_not_load_nltk(self):
+        """Test importing the module leaves NLTK and TextBlob unloaded until first use"""
+        code = "import sys, services.sentiment_analyzer; print('nltk' in sys.modules, 'textblob' in sys.modules)"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                cwd=os.path.join(os.path.dirname(__file__), '..'))
+        self.assertEqual(output.stdout.strip(), 'False False')
+        
+    def test_warm_up_never_downloads(self):
+        """Test missing NLTK data raises instead of triggering a download"""
+        with patch.object(sentiment_analyzer, '_analyzer', None), \
+                patch('services.sentiment_analyzer.missing_nltk_data', return_value=['wordnet']), \
+                patch('nltk.download') as download:
+            with self.assertRaises(LookupError):
+                sentiment_analyzer.warm_up()
+            download.assert_not_called()
+        
     def test_preprocess_text(self):
         """Test text preprocessing"""
         text = "Check out these AMAZING deals at Canadian Tire!!! #CanadianTire @CanadianTire http://canadiantire.ca"
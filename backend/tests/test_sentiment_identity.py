@@ -0,0 +1,102 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import event
+from app import create_app
+from app_test_case import AppTestCase, TEST_CONFIG
+from models import db, SentimentSource, SentimentRecord, Topic
+from services.sentiment_identity import attach_topics, identity_caches, resolve_source_id, resolve_topics
+
+class TestSentimentIdentity(AppTestCase):
+    def setUp(self):
+        """Set up the app and an empty database"""
+        super().setUp()
+
+        db.session.add(Topic(name='pricing'))
+        db.session.commit()
+
+    def _count_statements(self, work):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            result = work()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        return result, statements
+
+    def test_resolve_topics_in_constant_round_trips(self):
+        """Test existing and new topics resolve in one select, one insert and one re-select"""
+        names = ['pricing', 'tires', 'winter', 'service', 'staff']
+        resolved, statements = self._count_statements(lambda: resolve_topics(names))
+
+        self.assertEqual(sorted(resolved), sorted(names))
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(Topic.query.count(), 5)
+
+        # Everything is now cached
+        again, statements = self._count_statements(lambda: resolve_topics(names))
+        self.assertEqual(again, resolved)
+        self.assertEqual(statements, [])
+
+    def test_rollback_forgets_cached_ids(self):
+        """Test ids learned in a rolled-back transaction are not reused"""
+        topic_ids, _ = identity_caches()
+        resolve_topics(['tires'])
+        self.assertIsNotNone(topic_ids.get('tires'))
+        db.session.rollback()
+        self.assertIsNone(topic_ids.get('tires'))
+        self.assertEqual(Topic.query.filter_by(name='tires').count(), 0)
+
+    def test_each_app_has_its_own_ids(self):
+        """Test a second app and database never see the first one's cached ids"""
+        resolve_topics(['tires'])
+        other = create_app(TEST_CONFIG)
+        with other.app_context():
+            self.assertIsNone(identity_caches()[0].get('tires'))
+        self.assertIsNotNone(identity_caches()[0].get('tires'))
+
+    def test_resolve_source_id_is_idempotent(self):
+        """Test a source is created once and then served from the cache"""
+        first = resolve_source_id('Twitter', 'twitter')
+        second = resolve_source_id('Twitter', 'twitter')
+        db.session.commit()
+
+        self.assertEqual(first, second)
+        source = SentimentSource.query.one()
+        self.assertEqual(source.description, 'Twitter source for Twitter')
+
+    def test_attach_topics_links_many_records(self):
+        """Test topics for several records are linked in one pass"""
+        source = db.session.get(SentimentSource, resolve_source_id('Reddit', 'reddit'))
+        first = SentimentRecord(source=source, content_text='Tires on sale', sentiment_score=0.2)
+        second = SentimentRecord(source=source, content_text='Pricey tires', sentiment_score=-0.3)
+        db.session.add_all([first, second])
+
+        attach_topics([(first, ['tires', 'sale']), (second, ['tires', 'pricing', 'tires'])])
+        db.session.commit()
+
+        self.assertEqual(sorted(first.to_dict()['topics']), ['sale', 'tires'])
+        self.assertEqual(sorted(topic.name for topic in second.topics), ['pricing', 'tires'])
+        self.assertEqual(Topic.query.filter_by(name='tires').one().records.count(), 2)
+
+    def test_save_sentiment_record(self):
+        """Test the collector helper stores a record with its topics"""
+        from services import data_collectors
+
+        analysis = {'sentiment_score': 0.6, 'sentiment_magnitude': 0.9,
+                    'sentiment_label': 'positive', 'topics': ['staff', 'pricing']}
+        with patch.object(data_collectors, 'analyze_text', return_value=analysis):
+            source = data_collectors.get_or_create_source('News Articles', 'news')
+            record = data_collectors.save_sentiment_record(source, 'Helpful staff and fair pricing')
+
+        self.assertEqual(record.source_id, source.id)
+        self.assertEqual(sorted(record.to_dict()['topics']), ['pricing', 'staff'])
+
+if __name__ == '__main__':
+    unittest.main()
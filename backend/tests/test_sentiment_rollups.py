@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+from datetime import date, datetime
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, DailySentimentSummary, DailyTopicCount, SentimentSource, SentimentRecord
+from services.data_collectors import update_daily_summary
+from services.record_writer import RecordWriter
+from services.sentiment_rollups import rebuild_summaries
+
+ANALYSES = {
+    'Love the new store layout': (0.8, 'positive', ['store', 'layout']),
+    'Checkout lines were far too long': (-0.6, 'negative', ['checkout', 'store']),
+    'Picked up winter tires today': (0.0, 'neutral', ['tires']),
+}
+
+def fake_batch_analyze(texts):
+    return [{'sentiment_score': ANALYSES[text][0], 'sentiment_magnitude': 0.5,
+             'sentiment_label': ANALYSES[text][1], 'topics': ANALYSES[text][2]} for text in texts]
+
+class TestSentimentRollups(AppTestCase):
+    def setUp(self):
+        """Set up the app, a source and a stubbed analyzer"""
+        super().setUp()
+
+        self.source = SentimentSource(name='Reddit', type='reddit')
+        db.session.add(self.source)
+        db.session.commit()
+
+        analyzer = patch('services.record_writer.batch_analyze', side_effect=fake_batch_analyze)
+        analyzer.start()
+        self.addCleanup(analyzer.stop)
+
+    def _write(self, *texts):
+        with RecordWriter(self.source) as writer:
+            for text in texts:
+                writer.add(text, content_url=f'https://reddit.com/{len(text)}')
+
+    def _summaries(self):
+        return {
+            s.date: (s.record_count, round(s.average_sentiment, 6), s.positive_count, s.negative_count,
+                     s.neutral_count, s.to_dict()['top_topics'])
+            for s in DailySentimentSummary.query.all()
+        }
+
+    def test_summary_updated_as_records_are_written(self):
+        """Test each flush adds its records to the day without rescanning it"""
+        today = datetime.utcnow().date()
+        self._write('Love the new store layout')
+        self.assertEqual(self._summaries(), {today: (1, 0.8, 1, 0, 0, {'layout': 1, 'store': 1})})
+
+        self._write('Checkout lines were far too long', 'Picked up winter tires today')
+
+        self.assertEqual(self._summaries(), {
+            today: (3, round(0.2 / 3, 6), 1, 1, 1, {'store': 2, 'checkout': 1, 'layout': 1, 'tires': 1})
+        })
+
+    def test_summary_written_before_score_sum_is_merged(self):
+        """Test a day summarized before score_sum existed keeps its average when records are added"""
+        today = datetime.utcnow().date()
+        db.session.add(DailySentimentSummary(date=today, record_count=2, average_sentiment=0.5, score_sum=0,
+                                             positive_count=2))
+        db.session.commit()
+
+        self._write('Checkout lines were far too long')
+        summary = DailySentimentSummary.query.one()
+        self.assertEqual((summary.record_count, round(summary.score_sum, 6)), (3, 0.4))
+        self.assertAlmostEqual(summary.average_sentiment, 0.4 / 3)
+
+    def test_rebuild_repairs_drift(self):
+        """Test one day can be repaired and a full rebuild recomputes every day from raw records"""
+        self._write('Love the new store layout', 'Checkout lines were far too long', 'Picked up winter tires today')
+        SentimentRecord.query.filter_by(sentiment_label='neutral').update(
+            {'analyzed_date': datetime(2024, 5, 1, 12)}, synchronize_session=False)
+        db.session.commit()
+        update_daily_summary(date(2024, 5, 1))
+        today = datetime.utcnow().date()
+        # The neutral record moved days; only the repaired day knows so far
+        self.assertEqual(self._summaries()[date(2024, 5, 1)], (1, 0.0, 0, 0, 1, {'tires': 1}))
+        self.assertEqual(self._summaries()[today][0], 3)
+
+        self.assertEqual(rebuild_summaries(), 2)
+        db.session.commit()
+        rebuilt = self._summaries()
+        self.assertEqual(rebuilt[date(2024, 5, 1)], (1, 0.0, 0, 0, 1, {'tires': 1}))
+        self.assertEqual(rebuilt[today], (2, 0.1, 1, 1, 0, {'store': 2, 'checkout': 1, 'layout': 1}))
+        self.assertEqual(DailyTopicCount.query.count(), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, DailySentimentSummary, SentimentSource, SentimentRecord, Topic, record_topics
+from services.record_writer import RecordWriter
+from services.sentiment_rollups import rebuild_summaries
+
+def fake_batch_analyze(texts):
+    return [{
+        'sentiment_score': -0.5 if 'slow' in text else 0.5,
+        'sentiment_magnitude': 0.5,
+        'sentiment_label': 'negative' if 'slow' in text else 'positive',
+        'topics': ['checkout'] if 'checkout' in text else ['tires']
+    } for text in texts]
+
+class TestSentimentRoutes(AppTestCase):
+    def setUp(self):
+        """Set up test client, a source and records written over two days"""
+        super().setUp()
+
+        self.source = SentimentSource(name='Reddit', type='reddit')
+        db.session.add(self.source)
+        db.session.commit()
+
+        with patch('services.record_writer.batch_analyze', side_effect=fake_batch_analyze):
+            with RecordWriter(self.source) as writer:
+                writer.add('The checkout was slow again this morning', content_url='https://reddit.com/1')
+                writer.add('Great checkout experience with the new app', content_url='https://reddit.com/2')
+                writer.add('Bought winter tires at a fair price', content_url='https://reddit.com/3')
+
+        # Move one record to yesterday, as a collection run then would have written it
+        self.yesterday = datetime.utcnow() - timedelta(days=1)
+        SentimentRecord.query.filter_by(content_url='https://reddit.com/1').update(
+            {'analyzed_date': self.yesterday.replace(hour=9)}, synchronize_session=False)
+        db.session.commit()
+        rebuild_summaries()
+        db.session.commit()
+        self.checkout = Topic.query.filter_by(name='checkout').one()
+
+    def _get(self, url):
+        response = self.client.get(url)
+        return response.status_code, json.loads(response.data)
+
+    def test_source_series_daily_and_hourly(self):
+        """Test a source's records are grouped into daily and hourly buckets"""
+        status, body = self._get(f'/api/sentiment/by-source/{self.source.id}/series?days=7')
+        self.assertEqual(status, 200)
+        self.assertEqual([(b['bucket'], b['record_count'], b['negative_count']) for b in body['data']], [
+            (self.yesterday.date().isoformat(), 1, 1),
+            (datetime.utcnow().date().isoformat(), 2, 0)
+        ])
+
+        status, body = self._get(f'/api/sentiment/by-source/{self.source.id}/series?days=2&bucket=hour')
+        self.assertEqual(body['bucket'], 'hour')
+        self.assertEqual(body['data'][0]['bucket'], self.yesterday.strftime('%Y-%m-%dT09:00:00'))
+        self.assertEqual(body['data'][0]['average_sentiment'], -0.5)
+
+    def test_source_leaves_out_duplicates(self):
+        """Test near-duplicates count in neither the source series nor its records, as in the daily summaries"""
+        with patch('services.record_writer.batch_analyze', side_effect=fake_batch_analyze):
+            with RecordWriter(self.source) as writer:
+                writer.add('RT @shopper: Bought winter tires at a fair price', content_url='https://reddit.com/4')
+        self.assertEqual(writer.linked, 1)
+
+        today = datetime.utcnow().date()
+        status, body = self._get(f'/api/sentiment/by-source/{self.source.id}/series?days=1')
+        summary = DailySentimentSummary.query.filter_by(date=today).one()
+        self.assertEqual([b['record_count'] for b in body['data']], [summary.record_count])
+        self.assertEqual(summary.record_count, 2)
+
+        status, body = self._get(f'/api/sentiment/by-source/{self.source.id}?days=1')
+        self.assertNotIn('https://reddit.com/4', [record['content_url'] for record in body['data']])
+
+    def test_topic_history_read_from_rollup(self):
+        """Test daily topic buckets come from the rollup, not from raw records"""
+        db.session.execute(record_topics.delete())
+        db.session.commit()
+
+        status, body = self._get(f'/api/sentiment/by-topic/{self.checkout.id}/series?days=365')
+        self.assertEqual(status, 200)
+        self.assertEqual([(b['record_count'], b['average_sentiment']) for b in body['data']], [(1, -0.5), (1, 0.5)])
+        # Hourly buckets read raw records, whose links are now gone
+        self.assertEqual(self._get(f'/api/sentiment/by-topic/{self.checkout.id}/series?days=2&bucket=hour')[1]['data'], [])
+
+    def test_topics_and_records(self):
+        """Test the topic list and the newest records for a topic"""
+        status, body = self._get('/api/sentiment/topics')
+        self.assertEqual([(t['name'], t['record_count']) for t in body['data']], [('checkout', 2), ('tires', 1)])
+
+        status, body = self._get(f'/api/sentiment/by-topic/{self.checkout.id}?days=1')
+        self.assertEqual([record['content_url'] for record in body['data']], ['https://reddit.com/2'])
+        self.assertEqual(body['data'][0]['topics'], ['checkout'])
+
+    def test_invalid_parameters(self):
+        """Test unknown buckets, long hourly ranges and unknown ids are rejected"""
+        series = f'/api/sentiment/by-source/{self.source.id}/series'
+        self.assertEqual(self._get(series + '?bucket=week')[0], 400)
+        self.assertEqual(self._get(series + '?bucket=hour&days=90')[0], 400)
+        self.assertEqual(self._get(series + '?days=abc')[0], 400)
+        self.assertEqual(self.client.get('/api/sentiment/by-topic/999/series').status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import json
+from datetime import date, timedelta
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_test_case import AppTestCase
+from models import db, DailyDonationSummary, DailySentimentSummary
+from services.time_series import lttb, minmax, moving_average
+
+class TestDownsampling(unittest.TestCase):
+    def test_moving_average(self):
+        """Test the trailing mean stays empty until the window is full"""
+        self.assertEqual(moving_average([1, 2, 3, 4, 5], 3), [None, None, 2, 3, 4])
+
+    def test_lttb_keeps_ends_and_spikes(self):
+        """Test LTTB keeps the first and last points and a lone spike"""
+        values = [0] * 100
+        values[37] = 50
+        kept = lttb(values, 10)
+        self.assertEqual(len(kept), 10)
+        self.assertEqual((kept[0], kept[-1]), (0, 99))
+        self.assertIn(37, kept)
+        self.assertEqual(kept, sorted(kept))
+
+    def test_minmax_keeps_extremes(self):
+        """Test min/max buckets keep each bucket's lowest and highest point"""
+        values = [5, 1, 9, 5, 5, 5, -3, 5]
+        self.assertEqual(minmax(values, 4), [1, 2, 4, 6])
+        self.assertEqual(minmax(values, 20), list(range(8)))
+
+class TestTrendRoutes(AppTestCase):
+    def setUp(self):
+        """Set up test client and a year of daily rollups"""
+        super().setUp()
+
+        self.start = date(2024, 1, 1)
+        for i in range(366):
+            day = self.start + timedelta(days=i)
+            # Every other day has no donations; both campaigns add up per day
+            if i % 2 == 0:
+                db.session.add(DailyDonationSummary(date=day, campaign='Spring', total_amount=10, donation_count=1))
+                db.session.add(DailyDonationSummary(date=day, campaign='Gala', total_amount=5, donation_count=1))
+            db.session.add(DailySentimentSummary(date=day, record_count=2, score_sum=i / 365,
+                                                 average_sentiment=i / 730))
+        db.session.commit()
+        self.headers = self.staff_headers()
+
+    def _get(self, url, headers=None):
+        response = self.client.get(url, headers=headers)
+        return response.status_code, json.loads(response.data)
+
+    def test_downsampled_to_target(self):
+        """Test a year of days is reduced to the requested number of points"""
+        status, body = self._get('/api/trends/sentiment?start_date=2024-01-01&end_date=2024-12-31'
+                                 '&points=50&method=avg')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['raw_points'], 366)
+        self.assertEqual(len(body['points']), 50)
+        self.assertEqual(body['points'][0]['date'], '2024-01-01')
+        self.assertLess(body['points'][0]['value'], body['points'][-1]['value'])
+
+    def test_moving_average_uses_days_before_range(self):
+        """Test the moving average is full from the first day, using the days before it"""
+        status, body = self._get('/api/trends/donation_amount?start_date=2024-02-01&end_date=2024-02-10'
+                                 '&window=2', headers=self.headers)
+        self.assertEqual(body['raw_points'], 10)
+        # Zero-filled days alternate with 15.00, so every two-day mean is 7.5
+        self.assertEqual({point['moving_average'] for point in body['points']}, {7.5})
+        self.assertEqual(body['summary'], 75.0)
+
+    def test_previous_period_comparison(self):
+        """Test the previous period is summarized and aligned with the current one"""
+        status, body = self._get('/api/trends/donation_count?start_date=2024-03-01&end_date=2024-03-04'
+                                 '&compare=previous', headers=self.headers)
+        comparison = body['comparison']
+        self.assertEqual((comparison['start_date'], comparison['end_date']), ('2024-02-26', '2024-02-29'))
+        self.assertEqual((body['summary'], comparison['summary'], comparison['change']), (4.0, 4.0, 0.0))
+        self.assertEqual(comparison['points'][0]['aligned_date'], '2024-03-01')
+
+    def test_access_and_validation(self):
+        """Test donation series need a login and bad parameters are rejected"""
+        self.assertEqual(self.client.get('/api/trends/donation_amount').status_code, 401)
+        self.assertEqual(self.client.get('/api/trends/sentiment').status_code, 200)
+        self.assertEqual(self.client.get('/api/trends/unknown').status_code, 404)
+        self.assertEqual(self.client.get('/api/trends/sentiment?method=spline').status_code, 400)
+        self.assertEqual(self.client.get('/api/trends/sentiment?start_date=2024-05-01&end_date=2024-04-01').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -55,6 +55,23 @@ export const fetchSentimentBySource = async (sourceId, days = 7) => {
   }
 };
 
+/**
+ * Fetch bucketed sentiment for a specific source
+ * @param {number} sourceId - Source ID
+ * @param {number} days - Number of days to fetch
+ * @param {string} bucket - 'day' or 'hour' (hourly is limited to 31 days)
+ * @returns {Promise<Array>} - Array of {bucket, record_count, average_sentiment, *_count}
+ */
+export const fetchSourceSeries = async (sourceId, days = 7, bucket = 'day') => {
+  try {
+    const response = await apiClient.get(`/sentiment/by-source/${sourceId}/series?days=${days}&bucket=${bucket}`);
+    return response.data.data;
+  } catch (error) {
+    console.error(`Error fetching sentiment series for source ${sourceId}:`, error);
+    throw error;
+  }
+};
+
 /**
  * Fetch all sentiment topics
  * @returns {Promise<Array>} - Array of sentiment topics
@@ -85,6 +102,40 @@ export const fetchSentimentByTopic = async (topicId, days = 7) => {
   }
 };
 
+/**
+ * Fetch bucketed sentiment for a specific topic
+ * @param {number} topicId - Topic ID
+ * @param {number} days - Number of days to fetch
+ * @param {string} bucket - 'day' or 'hour' (hourly is limited to 31 days)
+ * @returns {Promise<Array>} - Array of {bucket, record_count, average_sentiment, *_count}
+ */
+export const fetchTopicSeries = async (topicId, days = 7, bucket = 'day') => {
+  try {
+    const response = await apiClient.get(`/sentiment/by-topic/${topicId}/series?days=${days}&bucket=${bucket}`);
+    return response.data.data;
+  } catch (error) {
+    console.error(`Error fetching sentiment series for topic ${topicId}:`, error);
+    throw error;
+  }
+};
+
+/**
+ * Fetch a downsampled daily trend series
+ * @param {string} series - 'sentiment' or 'sentiment_volume' (donation series need a login)
+ * @param {Object} params - start_date, end_date, points, method ('lttb', 'minmax' or 'avg'),
+ *   window (moving-average days) and compare ('previous' or 'year')
+ * @returns {Promise<Object>} - {points: [{date, value, moving_average}], summary, comparison}
+ */
+export const fetchTrend = async (series, params = {}) => {
+  try {
+    const response = await apiClient.get(`/trends/${series}`, { params });
+    return response.data;
+  } catch (error) {
+    console.error(`Error fetching ${series} trend:`, error);
+    throw error;
+  }
+};
+
 /**
  * Trigger data collection from Twitter
  * @returns {Promise<Object>} - Collection result
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { 
   Box, 
   Typography, 
@@ -14,20 +14,59 @@ import {
   ToggleButton,
   CircularProgress
 } from '@mui/material';
-import { useSentiment } from '../../context/SentimentContext';
+import { fetchTrend } from '../../api/sentimentApi';
 import SentimentChart from '../charts/SentimentChart';
-import { format, subDays, subMonths } from 'date-fns';
+import { format, subDays } from 'date-fns';
+
+// Smoothing per chart type: trailing moving-average window in days
+const WINDOWS = { daily: 0, weekly: 7, monthly: 30 };
+// The server downsamples to at most this many points, whatever the range
+const MAX_POINTS = 365;
 
 const HistoricalTrends = () => {
-  const { latestSentiment, loading, error, setTimeRange } = useSentiment();
   const [timeFrame, setTimeFrame] = useState('30');
   const [chartType, setChartType] = useState('daily');
+  const [trend, setTrend] = useState(null);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    const today = new Date();
+    setLoading(true);
+
+    fetchTrend('sentiment', {
+      start_date: format(subDays(today, parseInt(timeFrame, 10) - 1), 'yyyy-MM-dd'),
+      end_date: format(today, 'yyyy-MM-dd'),
+      points: MAX_POINTS,
+      window: WINDOWS[chartType],
+      compare: 'previous'
+    })
+      .then(data => {
+        if (!cancelled) {
+          setTrend(data);
+          setError(null);
+        }
+      })
+      .catch(() => {
+        if (!cancelled) {
+          setError('Failed to load sentiment trends');
+        }
+      })
+      .finally(() => {
+        if (!cancelled) {
+          setLoading(false);
+        }
+      });
+
+    return () => {
+      cancelled = true;
+    };
+  }, [timeFrame, chartType]);
 
   // Handle time frame change
   const handleTimeFrameChange = (event) => {
-    const newTimeFrame = event.target.value;
-    setTimeFrame(newTimeFrame);
-    setTimeRange(parseInt(newTimeFrame, 10));
+    setTimeFrame(String(event.target.value));
   };
 
   // Handle chart type change
@@ -37,28 +76,23 @@ const HistoricalTrends = () => {
     }
   };
 
-  // Format chart data based on chart type
+  // Points arrive downsampled, with moving averages computed over every day
   const chartData = React.useMemo(() => {
-    if (!latestSentiment || latestSentiment.length === 0) {
+    if (!trend || trend.points.length === 0) {
       return {
         labels: [],
         datasets: []
       };
     }
 
-    // Sort data by date
-    const sortedData = [...latestSentiment].sort((a, b) => 
-      new Date(a.date) - new Date(b.date)
-    );
-
+    const labels = trend.points.map(point => point.date);
     if (chartType === 'daily') {
-      // Daily data (default)
       return {
-        labels: sortedData.map(day => day.date),
+        labels,
         datasets: [
           {
             label: 'Sentiment Score',
-            data: sortedData.map(day => day.average_sentiment),
+            data: trend.points.map(point => point.value),
             borderColor: '#d71920', // Canadian Tire red
             backgroundColor: 'rgba(215, 25, 32, 0.1)',
             fill: true,
@@ -66,83 +100,35 @@ const HistoricalTrends = () => {
           }
         ]
       };
-    } else if (chartType === 'weekly') {
-      // Group by week
-      const weeklyData = {};
-      sortedData.forEach(day => {
-        const date = new Date(day.date);
-        // Get the week start date (Sunday)
-        const weekStart = new Date(date);
-        weekStart.setDate(date.getDate() - date.getDay());
-        const weekKey = format(weekStart, 'yyyy-MM-dd');
-        
-        if (!weeklyData[weekKey]) {
-          weeklyData[weekKey] = {
-            sum: 0,
-            count: 0
-          };
-        }
-        
-        weeklyData[weekKey].sum += day.average_sentiment;
-        weeklyData[weekKey].count++;
-      });
-      
-      const weeks = Object.keys(weeklyData).sort();
-      const averages = weeks.map(week => weeklyData[week].sum / weeklyData[week].count);
-      
-      return {
-        labels: weeks.map(week => `Week of ${format(new Date(week), 'MMM d')}`),
-        datasets: [
-          {
-            label: 'Weekly Average Sentiment',
-            data: averages,
-            borderColor: '#0d5c91', // Blue
-            backgroundColor: 'rgba(13, 92, 145, 0.1)',
-            fill: true,
-            tension: 0.4
-          }
-        ]
-      };
-    } else {
-      // Group by month
-      const monthlyData = {};
-      sortedData.forEach(day => {
-        const date = new Date(day.date);
-        const monthKey = format(date, 'yyyy-MM');
-        
-        if (!monthlyData[monthKey]) {
-          monthlyData[monthKey] = {
-            sum: 0,
-            count: 0
-          };
-        }
-        
-        monthlyData[monthKey].sum += day.average_sentiment;
-        monthlyData[monthKey].count++;
-      });
-      
-      const months = Object.keys(monthlyData).sort();
-      const averages = months.map(month => monthlyData[month].sum / monthlyData[month].count);
-      
-      return {
-        labels: months.map(month => format(new Date(`${month}-01`), 'MMMM yyyy')),
-        datasets: [
-          {
-            label: 'Monthly Average Sentiment',
-            data: averages,
-            borderColor: '#4caf50', // Green
-            backgroundColor: 'rgba(76, 175, 80, 0.1)',
-            fill: true,
-            tension: 0.4
-          }
-        ]
-      };
     }
-  }, [latestSentiment, chartType]);
 
-  // Calculate trend metrics
+    const weekly = chartType === 'weekly';
+    return {
+      labels,
+      datasets: [
+        {
+          label: weekly ? '7-Day Average Sentiment' : '30-Day Average Sentiment',
+          data: trend.points.map(point => point.moving_average),
+          borderColor: weekly ? '#0d5c91' : '#4caf50', // Blue or green
+          backgroundColor: weekly ? 'rgba(13, 92, 145, 0.1)' : 'rgba(76, 175, 80, 0.1)',
+          fill: true,
+          tension: 0.4
+        },
+        {
+          label: 'Daily Sentiment',
+          data: trend.points.map(point => point.value),
+          borderColor: 'rgba(0, 0, 0, 0.2)',
+          fill: false,
+          pointRadius: 0
+        }
+      ]
+    };
+  }, [trend, chartType]);
+
+  // Trend metrics: overall mean and change against the previous period of equal length
   const trendMetrics = React.useMemo(() => {
-    if (!latestSentiment || latestSentiment.length < 2) {
+    const points = trend ? trend.points.filter(point => point.value !== null) : [];
+    if (points.length < 2) {
       return {
         overall: 0,
         start: 0,
@@ -151,27 +137,16 @@ const HistoricalTrends = () => {
         percentChange: 0
       };
     }
-    
-    const sortedData = [...latestSentiment].sort((a, b) => 
-      new Date(a.date) - new Date(b.date)
-    );
-    
-    const firstDay = sortedData[0];
-    const lastDay = sortedData[sortedData.length - 1];
-    const overall = sortedData.reduce((sum, day) => sum + day.average_sentiment, 0) / sortedData.length;
-    const change = lastDay.average_sentiment - firstDay.average_sentiment;
-    const percentChange = firstDay.average_sentiment !== 0 
-      ? (change / Math.abs(firstDay.average_sentiment)) * 100 
-      : 0;
-    
+
+    const comparison = trend.comparison || {};
     return {
-      overall,
-      start: firstDay.average_sentiment,
-      end: lastDay.average_sentiment,
-      change,
-      percentChange
+      overall: trend.summary || 0,
+      start: points[0].value,
+      end: points[points.length - 1].value,
+      change: comparison.change || 0,
+      percentChange: comparison.change_percent || 0
     };
-  }, [latestSentiment]);
+  }, [trend]);
 
   if (loading) {
     return (
@@ -281,7 +256,7 @@ const HistoricalTrends = () => {
                 
                 <Box>
                   <Typography variant="body2" color="text.secondary">
-                    Change
+                    Change vs Previous {timeFrame} Days
                   </Typography>
                   <Typography 
                     variant="h6" 
@@ -22,7 +22,7 @@ import {
 } from '@mui/material';
 import { Twitter, Reddit, Newspaper } from '@mui/icons-material';
 import { useSentiment } from '../../context/SentimentContext';
-import { fetchSentimentBySource } from '../../api/sentimentApi';
+import { fetchSentimentBySource, fetchSourceSeries } from '../../api/sentimentApi';
 import SentimentChart from '../charts/SentimentChart';
 import { format } from 'date-fns';
 
@@ -30,6 +30,7 @@ const SentimentBySource = () => {
   const { sentimentSources, timeRange, loading: contextLoading } = useSentiment();
   const [selectedSource, setSelectedSource] = useState(null);
   const [sourceData, setSourceData] = useState([]);
+  const [seriesData, setSeriesData] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
 
@@ -45,8 +46,14 @@ const SentimentBySource = () => {
     const fetchData = async () => {
       setLoading(true);
       try {
-        const data = await fetchSentimentBySource(selectedSource, timeRange);
-        setSourceData(data);
+        // The trend comes from server-side daily aggregates over every record;
+        // the raw records only fill the recent mentions table
+        const [series, records] = await Promise.all([
+          fetchSourceSeries(selectedSource, timeRange),
+          fetchSentimentBySource(selectedSource, timeRange)
+        ]);
+        setSeriesData(series);
+        setSourceData(records);
         setError(null);
       } catch (err) {
         console.error('Error fetching source data:', err);
@@ -61,37 +68,19 @@ const SentimentBySource = () => {
 
   // Format chart data
   const chartData = React.useMemo(() => {
-    if (!sourceData || sourceData.length === 0) {
+    if (!seriesData || seriesData.length === 0) {
       return {
         labels: [],
         datasets: []
       };
     }
 
-    // Group by date
-    const groupedByDate = sourceData.reduce((acc, record) => {
-      const date = record.analyzed_date.split('T')[0];
-      if (!acc[date]) {
-        acc[date] = [];
-      }
-      acc[date].push(record);
-      return acc;
-    }, {});
-
-    // Calculate average sentiment for each date
-    const dates = Object.keys(groupedByDate).sort();
-    const sentiments = dates.map(date => {
-      const records = groupedByDate[date];
-      const sum = records.reduce((acc, record) => acc + record.sentiment_score, 0);
-      return sum / records.length;
-    });
-
     return {
-      labels: dates,
+      labels: seriesData.map(point => point.bucket),
       datasets: [
         {
           label: 'Sentiment Score',
-          data: sentiments,
+          data: seriesData.map(point => point.average_sentiment),
           borderColor: '#d71920', // Canadian Tire red
           backgroundColor: 'rgba(215, 25, 32, 0.1)',
           fill: true,
@@ -99,7 +88,7 @@ const SentimentBySource = () => {
         }
       ]
     };
-  }, [sourceData]);
+  }, [seriesData]);
 
   // Get source icon
   const getSourceIcon = (type) => {
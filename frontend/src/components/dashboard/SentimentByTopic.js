@@ -20,7 +20,7 @@ import {
 } from '@mui/material';
 import { Tag } from '@mui/icons-material';
 import { useSentiment } from '../../context/SentimentContext';
-import { fetchSentimentByTopic } from '../../api/sentimentApi';
+import { fetchSentimentByTopic, fetchTopicSeries } from '../../api/sentimentApi';
 import SentimentChart from '../charts/SentimentChart';
 import { format } from 'date-fns';
 
@@ -28,6 +28,7 @@ const SentimentByTopic = () => {
   const { sentimentTopics, timeRange, loading: contextLoading } = useSentiment();
   const [selectedTopic, setSelectedTopic] = useState(null);
   const [topicData, setTopicData] = useState([]);
+  const [seriesData, setSeriesData] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
 
@@ -43,8 +44,14 @@ const SentimentByTopic = () => {
     const fetchData = async () => {
       setLoading(true);
       try {
-        const data = await fetchSentimentByTopic(selectedTopic, timeRange);
-        setTopicData(data);
+        // The trend and distribution come from server-side daily aggregates over
+        // every record; the raw records only fill the recent mentions list
+        const [series, records] = await Promise.all([
+          fetchTopicSeries(selectedTopic, timeRange),
+          fetchSentimentByTopic(selectedTopic, timeRange)
+        ]);
+        setSeriesData(series);
+        setTopicData(records);
         setError(null);
       } catch (err) {
         console.error('Error fetching topic data:', err);
@@ -59,37 +66,19 @@ const SentimentByTopic = () => {
 
   // Format chart data
   const chartData = React.useMemo(() => {
-    if (!topicData || topicData.length === 0) {
+    if (!seriesData || seriesData.length === 0) {
       return {
         labels: [],
         datasets: []
       };
     }
 
-    // Group by date
-    const groupedByDate = topicData.reduce((acc, record) => {
-      const date = record.analyzed_date.split('T')[0];
-      if (!acc[date]) {
-        acc[date] = [];
-      }
-      acc[date].push(record);
-      return acc;
-    }, {});
-
-    // Calculate average sentiment for each date
-    const dates = Object.keys(groupedByDate).sort();
-    const sentiments = dates.map(date => {
-      const records = groupedByDate[date];
-      const sum = records.reduce((acc, record) => acc + record.sentiment_score, 0);
-      return sum / records.length;
-    });
-
     return {
-      labels: dates,
+      labels: seriesData.map(point => point.bucket),
       datasets: [
         {
           label: 'Sentiment Score',
-          data: sentiments,
+          data: seriesData.map(point => point.average_sentiment),
           borderColor: '#d71920', // Canadian Tire red
           backgroundColor: 'rgba(215, 25, 32, 0.1)',
           fill: true,
@@ -97,21 +86,22 @@ const SentimentByTopic = () => {
         }
       ]
     };
-  }, [topicData]);
+  }, [seriesData]);
 
   // Calculate sentiment distribution
   const sentimentDistribution = React.useMemo(() => {
-    if (!topicData || topicData.length === 0) {
-      return { positive: 0, neutral: 0, negative: 0 };
-    }
-
-    return topicData.reduce((acc, record) => {
-      if (record.sentiment_score > 0.05) acc.positive++;
-      else if (record.sentiment_score < -0.05) acc.negative++;
-      else acc.neutral++;
+    return (seriesData || []).reduce((acc, point) => {
+      acc.positive += point.positive_count;
+      acc.neutral += point.neutral_count;
+      acc.negative += point.negative_count;
+      acc.total += point.record_count;
       return acc;
-    }, { positive: 0, neutral: 0, negative: 0 });
-  }, [topicData]);
+    }, { positive: 0, neutral: 0, negative: 0, total: 0 });
+  }, [seriesData]);
+
+  const share = (count) => (
+    sentimentDistribution.total ? Math.round((count / sentimentDistribution.total) * 100) : 0
+  );
 
   // Get sentiment color
   const getSentimentColor = (score) => {
@@ -197,7 +187,7 @@ const SentimentByTopic = () => {
                         {sentimentDistribution.positive}
                       </Typography>
                       <Typography variant="body2" color="text.secondary">
-                        ({Math.round((sentimentDistribution.positive / topicData.length) * 100)}%)
+                        ({share(sentimentDistribution.positive)}%)
                       </Typography>
                     </Box>
                   </Box>
@@ -209,7 +199,7 @@ const SentimentByTopic = () => {
                         {sentimentDistribution.neutral}
                       </Typography>
                       <Typography variant="body2" color="text.secondary">
-                        ({Math.round((sentimentDistribution.neutral / topicData.length) * 100)}%)
+                        ({share(sentimentDistribution.neutral)}%)
                       </Typography>
                     </Box>
                   </Box>
@@ -221,7 +211,7 @@ const SentimentByTopic = () => {
                         {sentimentDistribution.negative}
                       </Typography>
                       <Typography variant="body2" color="text.secondary">
-                        ({Math.round((sentimentDistribution.negative / topicData.length) * 100)}%)
+                        ({share(sentimentDistribution.negative)}%)
                       </Typography>
                     </Box>
                   </Box>
@@ -3,6 +3,7 @@ import { render, screen, waitFor, fireEvent } from '@testing-library/react';
 import '@testing-library/jest-dom';
 import SentimentBySource from '../components/dashboard/SentimentBySource';
 import { SentimentProvider } from '../context/SentimentContext';
+import { fetchSourceSeries } from '../api/sentimentApi';
 
 // Mock the API service
 jest.mock('../api/sentimentApi', () => ({
@@ -11,6 +12,14 @@ jest.mock('../api/sentimentApi', () => ({
     { id: 2, name: 'Reddit', type: 'reddit' },
     { id: 3, name: 'News API', type: 'news' }
   ])),
+  // Daily aggregates over every record; the chart plots these
+  fetchSourceSeries: jest.fn((sourceId) => Promise.resolve(sourceId === 1 ? [
+    { bucket: '2025-07-07', record_count: 40, average_sentiment: 0.25, positive_count: 20, negative_count: 8, neutral_count: 12 },
+    { bucket: '2025-07-08', record_count: 55, average_sentiment: 0.4, positive_count: 30, negative_count: 5, neutral_count: 20 }
+  ] : [
+    { bucket: '2025-07-08', record_count: 3, average_sentiment: -0.7, positive_count: 0, negative_count: 3, neutral_count: 0 }
+  ])),
+  // Latest raw records for the recent mentions table
   fetchSentimentBySource: jest.fn((sourceId) => {
     // Return different mock data based on the source ID
     if (sourceId === 1) {
@@ -64,7 +73,9 @@ jest.mock('../api/sentimentApi', () => ({
 
 // Mock chart.js
 jest.mock('react-chartjs-2', () => ({
-  Line: () => <div data-testid="line-chart">Line Chart</div>
+  Line: ({ data }) => (
+    <div data-testid="line-chart">{data.datasets.map(dataset => dataset.data.join(',')).join(';')}</div>
+  )
 }));
 
 // Mock date-fns format to avoid timezone issues in tests
@@ -107,6 +118,13 @@ describe('SentimentBySource Component', () => {
     });
   });
 
+  test('plots bucketed averages from the series endpoint', async () => {
+    await waitFor(() => {
+      expect(screen.getByTestId('line-chart')).toHaveTextContent('0.25,0.4');
+    });
+    expect(fetchSourceSeries).toHaveBeenCalledWith(1, expect.anything());
+  });
+
   test('displays recent mentions table', async () => {
     await waitFor(() => {
       expect(screen.getByText('Recent Mentions')).toBeInTheDocument();